@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la détection d'erreurs (erreurs.yaml) sur un corpus de pages HTML.
+
+Mesure, hors ligne, le débit (pages/s) et la latence par page :
+- de la recherche des motifs sur le HTML
+- du scan des sélecteurs dans une page headless locale (si Playwright est installé)
+
+Les résultats sont sauvegardés en JSON (avec le commit courant) pour être comparés
+d'un commit à l'autre :
+
+    python benchmarks/bench_detection.py --sortie avant.json
+    python benchmarks/bench_detection.py --comparer avant.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import yaml
+
+RACINE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RACINE))
+
+from detection_erreurs import DetecteurErreursPage  # noqa: E402
+
+REPERTOIRE_CORPUS = Path(__file__).resolve().parent / "corpus"
+FICHIER_ATTENDUS = REPERTOIRE_CORPUS / "attendus.yaml"
+
+
+def charger_corpus() -> Dict[str, str]:
+    """Charge les pages HTML du corpus (nom de fichier -> contenu)"""
+    return {chemin.name: chemin.read_text(encoding="utf-8") for chemin in sorted(REPERTOIRE_CORPUS.glob("*.html"))}
+
+
+def commit_courant() -> str:
+    """Identifiant du commit courant (ou 'inconnu' hors dépôt git)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RACINE, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+
+
+def statistiques(latences: List[float]) -> Dict:
+    """Statistiques de latence en millisecondes"""
+    latences_ms = sorted(latence * 1000 for latence in latences)
+    return {
+        "min_ms": round(latences_ms[0], 4),
+        "p50_ms": round(statistics.median(latences_ms), 4),
+        "p95_ms": round(latences_ms[min(len(latences_ms) - 1, int(len(latences_ms) * 0.95))], 4),
+        "max_ms": round(latences_ms[-1], 4),
+    }
+
+
+def mesurer(pages: Dict[str, object], fonction: Callable, repetitions: int, echauffement: int = 2) -> Dict:
+    """
+    Mesure une fonction d'analyse appliquée à chaque page du corpus.
+
+    Returns:
+        dict: débit global, statistiques globales et par page
+    """
+    par_page = {}
+    toutes_latences = []
+
+    for nom, page in pages.items():
+        for _ in range(echauffement):
+            fonction(page)
+
+        latences = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            fonction(page)
+            latences.append(time.perf_counter() - debut)
+
+        par_page[nom] = statistiques(latences)
+        toutes_latences.extend(latences)
+
+    return {
+        "pages_par_seconde": round(len(toutes_latences) / sum(toutes_latences), 1),
+        **statistiques(toutes_latences),
+        "par_page": par_page,
+    }
+
+
+def verifier_attendus(detecteur: DetecteurErreursPage, corpus: Dict[str, str]) -> List[str]:
+    """Compare les types détectés avec la référence du corpus"""
+    with open(FICHIER_ATTENDUS, encoding="utf-8") as fichier:
+        attendus = yaml.safe_load(fichier) or {}
+
+    ecarts = []
+    for nom, html in corpus.items():
+        erreur = detecteur.analyser_texte(html)
+        obtenu = erreur["type"] if erreur else None
+        if nom in attendus and attendus[nom] != obtenu:
+            ecarts.append(f"{nom}: attendu={attendus[nom]} obtenu={obtenu}")
+    return ecarts
+
+
+def bench_motifs(detecteur: DetecteurErreursPage, corpus: Dict[str, str], repetitions: int) -> Dict:
+    """Benchmark de la recherche des motifs sur le HTML brut"""
+    return mesurer(corpus, detecteur.analyser_texte, repetitions)
+
+
+def bench_selecteurs(
+    detecteur: DetecteurErreursPage, corpus: Dict[str, str], repetitions: int, navigateur: str
+) -> Optional[Dict]:
+    """Benchmark du scan des sélecteurs dans une page headless (aucun accès réseau)"""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        print("⚠️ Playwright non installé - benchmark des sélecteurs ignoré")
+        return None
+
+    with sync_playwright() as playwright:
+        browser = getattr(playwright, navigateur).launch(headless=True)
+        context = browser.new_context()
+        # Hors ligne : toutes les ressources externes (css, images...) sont bloquées
+        context.route("**/*", lambda route: route.abort())
+        page = context.new_page()
+
+        def scanner(html: str):
+            page.set_content(html, wait_until="domcontentloaded")
+            return detecteur.scanner_selecteurs(page)
+
+        # Le chargement du contenu est mesuré à part pour isoler le coût du scan
+        chargement = mesurer(corpus, lambda html: page.set_content(html, wait_until="domcontentloaded"), repetitions)
+        scan_complet = mesurer(corpus, scanner, repetitions)
+
+        context.close()
+        browser.close()
+
+    return {"navigateur": navigateur, "chargement": chargement, "chargement_et_scan": scan_complet}
+
+
+def afficher(resultats: Dict) -> None:
+    """Affiche un résumé des résultats"""
+    print(f"📊 Benchmark détection d'erreurs - commit {resultats['commit']} ({resultats['repetitions']} répétitions)")
+    for nom_bench in ("motifs", "selecteurs"):
+        bench = resultats.get(nom_bench)
+        if not bench:
+            continue
+        mesures = bench if nom_bench == "motifs" else bench["chargement_et_scan"]
+        print(f"\n== {nom_bench} ==")
+        print(
+            f"  {mesures['pages_par_seconde']} pages/s - p50 {mesures['p50_ms']} ms - p95 {mesures['p95_ms']} ms"
+        )
+        for page, stats in mesures["par_page"].items():
+            print(f"  {page:<40} p50 {stats['p50_ms']:>10} ms  p95 {stats['p95_ms']:>10} ms")
+
+    for ecart in resultats["ecarts_attendus"]:
+        print(f"⚠️ Écart de détection: {ecart}")
+
+
+def comparer(resultats: Dict, reference: Dict) -> None:
+    """Affiche l'évolution des indicateurs par rapport à un résultat de référence"""
+    print(f"\n🔍 Comparaison avec le commit {reference.get('commit')}")
+    for nom_bench in ("motifs", "selecteurs"):
+        actuel, ancien = resultats.get(nom_bench), reference.get(nom_bench)
+        if not actuel or not ancien:
+            continue
+        if nom_bench == "selecteurs":
+            actuel, ancien = actuel["chargement_et_scan"], ancien["chargement_et_scan"]
+        for indicateur in ("pages_par_seconde", "p50_ms", "p95_ms"):
+            variation = (actuel[indicateur] - ancien[indicateur]) / ancien[indicateur] * 100 if ancien[indicateur] else 0
+            print(f"  {nom_bench}.{indicateur}: {ancien[indicateur]} -> {actuel[indicateur]} ({variation:+.1f} %)")
+
+
+def main():
+    """Point d'entrée du benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark de la détection d'erreurs")
+    parser.add_argument("-n", "--repetitions", type=int, default=50, help="Répétitions par page")
+    parser.add_argument("--navigateur", default="chromium", help="Navigateur pour le scan des sélecteurs")
+    parser.add_argument("--sans-navigateur", action="store_true", help="Ne pas mesurer le scan des sélecteurs")
+    parser.add_argument("--sortie", help="Fichier JSON où enregistrer les résultats")
+    parser.add_argument("--comparer", help="Fichier JSON de référence à comparer")
+    args = parser.parse_args()
+
+    detecteur = DetecteurErreursPage()
+    corpus = charger_corpus()
+
+    resultats = {
+        "commit": commit_courant(),
+        "date": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "repetitions": args.repetitions,
+        "pages": len(corpus),
+        "ecarts_attendus": verifier_attendus(detecteur, corpus),
+        "motifs": bench_motifs(detecteur, corpus, args.repetitions),
+    }
+    if not args.sans_navigateur:
+        resultats["selecteurs"] = bench_selecteurs(detecteur, corpus, args.repetitions, args.navigateur)
+
+    afficher(resultats)
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as fichier:
+            comparer(resultats, json.load(fichier))
+
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as fichier:
+            json.dump(resultats, fichier, ensure_ascii=False, indent=2)
+        print(f"\n✅ Résultats enregistrés: {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
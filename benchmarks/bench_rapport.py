@@ -0,0 +1,186 @@
+"""
+bench_rapport.py
+
+Benchmark de la finalisation du rapport d'exécution (scenario.json et payload API).
+
+Compare, sur une exécution synthétique de N étapes avec leurs sections
+(repartition, reseau, ressources) :
+- ancien : rapport reconstruit trois fois, json.dump indenté dans le fichier
+  puis json.dumps indenté de tout le payload pour le log
+- encodeur : rapport construit une fois, encodage compact (orjson s'il est installé)
+
+Usage :
+    python benchmarks/bench_rapport.py -e 200 -n 50 --sortie resultats.json
+    python benchmarks/bench_rapport.py --comparer resultats_reference.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict
+
+RACINE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RACINE))
+
+from bench_detection import commit_courant, statistiques  # noqa: E402
+from encodage_rapport import construire_rapport, ecrire_json, encoder_json, orjson  # noqa: E402
+from enregistrements import EnregistrementEtape, StatutEtape, encoder_etape  # noqa: E402
+
+
+class ExecutionSynthetique:
+    """Attributs d'une exécution finalisée utilisés par construire_rapport"""
+
+    def __init__(self, nb_etapes: int):
+        self.config = {"identifiant": "bench_rapport", "nom_scenario": "Scénario de référence"}
+        self.date = datetime.now()
+        self.status = self.status_initial = 0
+        self.commentaire = self.commentaire_initial = "Scénario exécuté avec succès"
+        self.injecteur = "injecteur-bench"
+        self.navigateur = "chromium"
+        self.interface_ip = "10.0.0.1"
+        self.etapes = [self._etape(ordre) for ordre in range(nb_etapes)]
+        self.nb_etapes = nb_etapes
+        self.duree = round(sum(etape.duree for etape in self.etapes), 3)
+
+    @staticmethod
+    def _etape(ordre: int) -> EnregistrementEtape:
+        etape = EnregistrementEtape(
+            f"Étape {ordre} - consultation du dossier",
+            ordre=ordre,
+            duree=1.234 + ordre % 7 / 10,
+            status=StatutEtape.SUCCES,
+            url=f"https://application.exemple.fr/dossiers/{ordre}?onglet=synthese",
+        )
+        etape["repartition"] = {"serveur": 0.512, "reseau": 0.081, "client": 0.641}
+        etape["reseau"] = {
+            "requetes": 42,
+            "octets": 1_254_331,
+            "plus_lentes": [
+                {"url": f"https://application.exemple.fr/api/ressource/{numero}", "duree": 0.12 * numero}
+                for numero in range(5)
+            ],
+        }
+        etape["ressources"] = {
+            "echantillons": 5,
+            **{
+                mesure: {"min": 0.125, "moy": 0.4, "max": 0.875}
+                for mesure in ("cpu", "cpu_navigateurs", "rss_navigateurs_mo", "descripteurs")
+            },
+            "octets_recus": 1_048_576,
+            "octets_emis": 65_536,
+        }
+        return etape
+
+    def briques(self):
+        return [encoder_etape(etape) for etape in self.etapes]
+
+
+def finalisation_ancienne(execution: ExecutionSynthetique, chemin: str) -> int:
+    """Chemin historique : trois constructions, fichier et log indentés"""
+    rapport = construire_rapport(execution)
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        json.dump(construire_rapport(execution), fichier, ensure_ascii=False, indent=4)
+    log = json.dumps(construire_rapport(execution), indent=4, ensure_ascii=False)
+    return len(rapport) + len(log)
+
+
+def finalisation_encodeur(execution: ExecutionSynthetique, chemin: str) -> int:
+    """Chemin actuel : une construction, encodage compact"""
+    rapport = construire_rapport(execution)
+    ecrire_json(chemin, rapport)
+    return len(rapport)
+
+
+def mesurer(fonction: Callable, repetitions: int, echauffement: int = 2) -> Dict:
+    for _ in range(echauffement):
+        fonction()
+    latences = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        latences.append(time.perf_counter() - debut)
+    return statistiques(latences)
+
+
+def bench(nb_etapes: int, repetitions: int) -> Dict:
+    execution = ExecutionSynthetique(nb_etapes)
+    rapport = construire_rapport(execution)
+    resultats = {}
+    with tempfile.TemporaryDirectory() as repertoire:
+        chemin = os.path.join(repertoire, "scenario.json")
+        resultats["finalisation_ancienne"] = mesurer(lambda: finalisation_ancienne(execution, chemin), repetitions)
+        resultats["finalisation_encodeur"] = mesurer(lambda: finalisation_encodeur(execution, chemin), repetitions)
+    resultats["encodage_indente"] = mesurer(lambda: encoder_json(rapport, indente=True), repetitions)
+    resultats["encodage_compact"] = mesurer(lambda: encoder_json(rapport), repetitions)
+    resultats["taille_octets"] = {
+        "indente": len(encoder_json(rapport, indente=True)),
+        "compact": len(encoder_json(rapport)),
+    }
+    return resultats
+
+
+def afficher(resultats: Dict) -> None:
+    """Affiche un résumé des résultats"""
+    print(
+        f"📊 Benchmark rapport d'exécution - commit {resultats['commit']} "
+        f"({resultats['etapes']} étapes, {resultats['repetitions']} répétitions, orjson: {resultats['orjson']})"
+    )
+    for nom, mesures in resultats["mesures"].items():
+        if nom == "taille_octets":
+            continue
+        print(f"  {nom:<24} p50 {mesures['p50_ms']:>10} ms  p95 {mesures['p95_ms']:>10} ms")
+    tailles = resultats["mesures"]["taille_octets"]
+    print(f"  taille indentée {tailles['indente']} octets - compacte {tailles['compact']} octets")
+
+
+def comparer(resultats: Dict, reference: Dict) -> None:
+    """Affiche l'évolution des indicateurs par rapport à un résultat de référence"""
+    print(f"\n🔍 Comparaison avec le commit {reference.get('commit')}")
+    for nom, actuel in resultats["mesures"].items():
+        ancien = reference.get("mesures", {}).get(nom)
+        if not ancien or nom == "taille_octets":
+            continue
+        for indicateur in ("p50_ms", "p95_ms"):
+            variation = (actuel[indicateur] - ancien[indicateur]) / ancien[indicateur] * 100 if ancien[indicateur] else 0
+            print(f"  {nom}.{indicateur}: {ancien[indicateur]} -> {actuel[indicateur]} ({variation:+.1f} %)")
+
+
+def main():
+    """Point d'entrée du benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark de la finalisation du rapport d'exécution")
+    parser.add_argument("-e", "--etapes", type=int, default=200, help="Nombre d'étapes de l'exécution synthétique")
+    parser.add_argument("-n", "--repetitions", type=int, default=50, help="Répétitions par mesure")
+    parser.add_argument("--sortie", help="Fichier JSON où enregistrer les résultats")
+    parser.add_argument("--comparer", help="Fichier JSON de référence à comparer")
+    args = parser.parse_args()
+
+    resultats = {
+        "commit": commit_courant(),
+        "date": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "orjson": orjson is not None,
+        "etapes": args.etapes,
+        "repetitions": args.repetitions,
+        "mesures": bench(args.etapes, args.repetitions),
+    }
+
+    afficher(resultats)
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as fichier:
+            comparer(resultats, json.load(fichier))
+
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as fichier:
+            json.dump(resultats, fichier, ensure_ascii=False, indent=2)
+        print(f"\n✅ Résultats enregistrés: {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
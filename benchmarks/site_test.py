@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Site de test local pour vérifier le mode charge (run_scenario.py --charge).
+
+Pages servies :
+- /            : page d'accueil avec un formulaire de connexion
+- /connexion   : POST du formulaire, redirection vers /recherche
+- /recherche   : page de résultats (latence simulée)
+- /erreur      : erreur 500 (page d'erreur Tomcat du corpus)
+
+La latence de chaque réponse est tirée entre --latence-min et --latence-max (ms).
+
+Usage :
+    python benchmarks/site_test.py --port 8765 --latence-min 50 --latence-max 400
+"""
+
+import argparse
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CORPUS = Path(__file__).parent / "corpus"
+
+PAGE_ACCUEIL = """<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Site de test</title></head>
+<body>
+<h1>Site de test</h1>
+<form method="post" action="/connexion">
+  <label>Identifiant <input name="identifiant" id="identifiant"></label>
+  <label>Mot de passe <input name="mot_de_passe" id="mot_de_passe" type="password"></label>
+  <button type="submit">Se connecter</button>
+</form>
+</body></html>
+"""
+
+PAGE_RECHERCHE = """<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Résultats</title></head>
+<body>
+<h1>Résultats de la recherche</h1>
+<table id="resultats">{lignes}</table>
+<a href="/">Déconnexion</a>
+</body></html>
+"""
+
+
+class GestionnaireSiteTest(BaseHTTPRequestHandler):
+    latence_min = 0.0
+    latence_max = 0.0
+
+    def _attendre(self) -> None:
+        time.sleep(random.uniform(self.latence_min, self.latence_max) / 1000)
+
+    def _repondre(self, status: int, contenu: str, entetes: dict = None) -> None:
+        corps = contenu.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corps)))
+        for nom, valeur in (entetes or {}).items():
+            self.send_header(nom, valeur)
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_GET(self):
+        self._attendre()
+        if self.path == "/":
+            self._repondre(200, PAGE_ACCUEIL)
+        elif self.path.startswith("/recherche"):
+            lignes = "".join(f"<tr><td>Dossier {i}</td></tr>" for i in range(random.randint(5, 50)))
+            self._repondre(200, PAGE_RECHERCHE.format(lignes=lignes))
+        elif self.path == "/erreur":
+            self._repondre(500, (CORPUS / "erreur_500_tomcat.html").read_text(encoding="utf-8"))
+        else:
+            self._repondre(404, "<h1>404 Not Found</h1>")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._attendre()
+        if self.path == "/connexion":
+            self._repondre(303, "", {"Location": "/recherche"})
+        else:
+            self._repondre(404, "<h1>404 Not Found</h1>")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Site de test local pour le mode charge")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latence-min", type=float, default=20, help="Latence minimale (ms)")
+    parser.add_argument("--latence-max", type=float, default=200, help="Latence maximale (ms)")
+    args = parser.parse_args()
+
+    GestionnaireSiteTest.latence_min = args.latence_min
+    GestionnaireSiteTest.latence_max = max(args.latence_min, args.latence_max)
+
+    serveur = ThreadingHTTPServer(("127.0.0.1", args.port), GestionnaireSiteTest)
+    print(f"Site de test sur http://127.0.0.1:{args.port}/")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Endpoint de progression local pour tester le flux de progression (progression.py).
+
+Reçoit les lots POST (config progression_url = http://127.0.0.1:8766/progression),
+affiche un résumé de chaque lot et peut les enregistrer (une ligne JSON par lot).
+La latence et un taux d'échec (503) simulent un endpoint lent ou indisponible
+pour vérifier que les tests ne sont jamais ralentis.
+
+Usage :
+    python benchmarks/stub_progression.py --port 8766 --latence 500 --echecs 0.2 --sortie lots.ndjson
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class GestionnaireProgression(BaseHTTPRequestHandler):
+    latence = 0.0
+    taux_echec = 0.0
+    sortie = None
+    verrou = threading.Lock()
+
+    def _repondre(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        corps = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latence / 1000)
+        if self.path != "/progression":
+            self._repondre(404)
+            return
+        if random.random() < self.taux_echec:
+            self._repondre(503)
+            return
+
+        lot = json.loads(corps)
+        evenements = lot.get("evenements", [])
+        en_cours = lot.get("etape_en_cours") or {}
+        resume = ", ".join(f"{evenement['type']}:{evenement.get('nom', '')}" for evenement in evenements)
+        print(
+            f"[{lot.get('envoi')}] {lot.get('scenario')} - {len(evenements)} événement(s) {resume}"
+            + (f" - en cours: {en_cours['nom']} depuis {en_cours['depuis']}" if en_cours else "")
+        )
+        if self.sortie:
+            with self.verrou, open(self.sortie, "a", encoding="utf-8") as fichier:
+                fichier.write(json.dumps(lot, ensure_ascii=False) + "\n")
+        self._repondre(204)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint de progression local")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latence", type=float, default=0, help="Latence de chaque réponse (ms)")
+    parser.add_argument("--echecs", type=float, default=0, help="Proportion de lots refusés (503)")
+    parser.add_argument("--sortie", help="Fichier NDJSON où enregistrer les lots reçus")
+    args = parser.parse_args()
+
+    GestionnaireProgression.latence = args.latence
+    GestionnaireProgression.taux_echec = args.echecs
+    GestionnaireProgression.sortie = args.sortie
+
+    serveur = ThreadingHTTPServer(("127.0.0.1", args.port), GestionnaireProgression)
+    print(f"Endpoint de progression sur http://127.0.0.1:{args.port}/progression")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
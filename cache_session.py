@@ -0,0 +1,169 @@
+"""
+cache_session.py
+
+Cache des sessions authentifiées (storage state Playwright : cookies + localStorage).
+
+La clé du cache est (utilisateur_isac, plateforme, url_initiale). Une session en
+cache non expirée est chargée à la création du contexte du scénario
+(`browser.new_context(storage_state=...)`, voir `options_session`). L'étape
+d'identification (`identification_avec_cache`) la réutilise si une requête sonde
+légère confirme qu'elle est toujours acceptée par le portail ; sinon
+l'identification complète est rejouée et la nouvelle session est mise en cache.
+
+Configuration (clés optionnelles de la config scénario) :
+- cache_session : active le cache (défaut False)
+- cache_session_duree : durée de validité en secondes (défaut 1800)
+- cache_session_url_sonde : URL de la sonde (défaut url_initiale)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAUT_DUREE_VALIDITE = 1800
+SOUS_REPERTOIRE_CACHE = "cache_sessions"
+COMMENTAIRE_SESSION_REUTILISEE = "Session réutilisée"
+
+
+
+class CacheSession:
+    """Stockage sur disque des storage states, un fichier JSON par clé"""
+
+    def __init__(self, repertoire: str, duree_validite: float = DEFAUT_DUREE_VALIDITE):
+        self.repertoire = Path(repertoire)
+        self.duree_validite = duree_validite
+
+    @staticmethod
+    def cle(utilisateur_isac: str, plateforme: str, url_initiale: str) -> str:
+        """Clé du cache (hash, pour ne pas exposer l'utilisateur dans les noms de fichiers)"""
+        brut = f"{utilisateur_isac}|{plateforme}|{url_initiale}"
+        return hashlib.sha256(brut.encode("utf-8")).hexdigest()[:32]
+
+    def _chemin(self, cle: str) -> Path:
+        return self.repertoire / f"{cle}.json"
+
+    def lire(self, cle: str) -> Optional[Dict]:
+        """Storage state en cache, ou None s'il est absent ou expiré"""
+        chemin = self._chemin(cle)
+        try:
+            age = time.time() - chemin.stat().st_mtime
+            if age > self.duree_validite:
+                LOGGER.info("[CacheSession] Session expirée (âge %.0fs)", age)
+                return None
+            with open(chemin, encoding="utf-8") as fichier:
+                return json.load(fichier)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            LOGGER.warning("[CacheSession] ⚠️ Session en cache illisible: %s", e)
+            return None
+
+    def enregistrer(self, cle: str, storage_state: Dict) -> None:
+        """Enregistre un storage state (écriture atomique, fichier lisible par le seul propriétaire)"""
+        self.repertoire.mkdir(parents=True, exist_ok=True)
+        chemin = self._chemin(cle)
+        temporaire = chemin.with_suffix(f".{os.getpid()}.tmp")
+
+        descripteur = os.open(temporaire, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descripteur, "w", encoding="utf-8") as fichier:
+            json.dump(storage_state, fichier)
+        os.replace(temporaire, chemin)
+
+    def invalider(self, cle: str) -> None:
+        """Supprime une session du cache"""
+        try:
+            self._chemin(cle).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def cache_et_cle(config: Dict) -> Tuple[CacheSession, str]:
+    """Cache des sessions du scénario et clé de sa session"""
+    cache = CacheSession(
+        f"{config['output_path']}/{SOUS_REPERTOIRE_CACHE}",
+        config.get("cache_session_duree", DEFAUT_DUREE_VALIDITE),
+    )
+    cle = cache.cle(config.get("utilisateur_isac", ""), config.get("plateforme", ""), config.get("url_initiale", ""))
+    return cache, cle
+
+
+def options_session(config: Dict) -> Dict:
+    """
+    Options de création du contexte chargeant la session en cache
+    (cookies et localStorage, une seule fois) ; {} si le cache est désactivé ou vide.
+    """
+    if not config.get("cache_session") or not config.get("output_path"):
+        return {}
+    cache, cle = cache_et_cle(config)
+    storage_state = cache.lire(cle)
+    if storage_state is None:
+        return {}
+    LOGGER.info("[options_session] Contexte créé avec la session en cache")
+    return {"storage_state": storage_state}
+
+
+def valider_session(context, url_sonde: str) -> bool:
+    """
+    Sonde légère : la session est valide si l'URL répond sans redirection vers l'authentification.
+    """
+    try:
+        reponse = context.request.get(url_sonde, max_redirects=0, timeout=10000)
+    except Exception as e:
+        LOGGER.info("[valider_session] Sonde en échec: %s", e)
+        return False
+
+    LOGGER.debug("[valider_session] Sonde %s => %d", url_sonde, reponse.status)
+    return 200 <= reponse.status < 300
+
+
+def identification_avec_cache(page, etape, config: Dict, identification: Callable[[], None]) -> bool:
+    """
+    Identification sur le portail en réutilisant une session en cache si possible.
+
+    Args:
+        page: Page du scénario (son contexte a été créé avec options_session)
+        etape: Etape en cours (marquée "Session réutilisée" le cas échéant)
+        config: Configuration du scénario
+        identification: Identification complète par l'interface (repli)
+
+    Returns:
+        bool: True si une session en cache a été réutilisée
+    """
+    if not config.get("cache_session") or not config.get("output_path"):
+        identification()
+        return False
+
+    url_initiale = config.get("url_initiale", "")
+    cache, cle = cache_et_cle(config)
+    context = page.context
+
+    # Session chargée à la création du contexte : la sonde partage ses cookies
+    if cache.lire(cle) is not None:
+        if valider_session(context, config.get("cache_session_url_sonde") or url_initiale):
+            page.goto(url_initiale)
+            etape.etape["session_reutilisee"] = True
+            etape.set_commentaire(COMMENTAIRE_SESSION_REUTILISEE)
+            LOGGER.info("[identification_avec_cache] ♻️ %s", COMMENTAIRE_SESSION_REUTILISEE)
+            return True
+
+        LOGGER.info("[identification_avec_cache] Session en cache refusée - identification complète")
+        cache.invalider(cle)
+        context.clear_cookies()
+        # localStorage de la session refusée, chargé avec le contexte
+        page.goto(url_initiale)
+        page.evaluate("() => window.localStorage.clear()")
+
+    identification()
+    etape.etape["session_reutilisee"] = False
+
+    try:
+        cache.enregistrer(cle, context.storage_state())
+    except Exception as e:
+        LOGGER.warning("[identification_avec_cache] ⚠️ Mise en cache de la session impossible: %s", e)
+    return False
@@ -0,0 +1,204 @@
+"""
+charge.py
+
+Mode charge : un scénario exécuté par N utilisateurs virtuels simultanés.
+
+- Montée en charge linéaire : l'utilisateur i démarre à i * rampe / N secondes.
+- Chaque utilisateur virtuel enchaîne des itérations du scénario jusqu'à la fin
+  de la durée totale, séparées par un temps de réflexion aléatoire.
+- Les utilisateurs virtuels sont des tâches du moteur asyncio (moteur_async.py) :
+  quelques navigateurs partagés dans ce processus, un contexte neuf par
+  itération. Seul le coût des scénarios est mesuré, pas le démarrage de
+  processus ou de navigateurs.
+- Chaque utilisateur virtuel a sa configuration (identifiants de son fichier
+  utilisateur ISAC, config/utilisateurs), sans captures ni rapports par itération.
+- Les durées des étapes sont lues dans les rapports des itérations : percentiles
+  par étape et débit (itérations / étapes par intervalle) sur la durée du tir.
+
+Le rapport est écrit dans <repertoire>/charge.json.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from moteur_async import DEFAUT_CONTEXTES_PAR_NAVIGATEUR, MoteurAsync, ScenarioAsync
+from timeouts_adaptatifs import percentile
+
+LOGGER = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 95, 99)
+DEFAUT_INTERVALLE_DEBIT = 10
+
+
+def lister_utilisateurs(repertoire: Path) -> List[str]:
+    """Noms des fichiers utilisateurs ISAC en clair (.conf) du répertoire"""
+    return sorted(fichier.stem for fichier in repertoire.glob("*.conf"))
+
+
+class Echantillons:
+    """Mesures des itérations du tir"""
+
+    def __init__(self):
+        # (instant de fin relatif au début du tir, utilisateur virtuel, status, étapes)
+        self.iterations: List[Tuple[float, int, int, List[Dict]]] = []
+
+    def ajouter(self, instant: float, utilisateur: int, status: int, etapes: List[Dict]) -> None:
+        self.iterations.append((instant, utilisateur, status, etapes))
+
+
+class InjectionCharge:
+    """
+    Tir de charge d'un scénario.
+
+    Args:
+        fichier_scenario: fichier pytest du scénario
+        configs: configuration de chaque utilisateur virtuel (une par utilisateur)
+        duree: durée totale du tir (secondes, montée en charge comprise)
+        rampe: durée de la montée en charge (secondes)
+        reflexion: bornes (min, max) du temps de réflexion entre deux itérations (secondes)
+        repertoire: répertoire de sortie du tir
+        navigateur: firefox, chromium ou msedge
+        options_lancement: options passées à launch() (headless...)
+    """
+
+    def __init__(
+        self,
+        fichier_scenario: Path,
+        configs: List[Dict],
+        duree: float,
+        rampe: float = 0,
+        reflexion: Tuple[float, float] = (0, 0),
+        repertoire: Optional[Path] = None,
+        intervalle_debit: float = DEFAUT_INTERVALLE_DEBIT,
+        navigateur: str = "firefox",
+        options_lancement: Optional[Dict] = None,
+    ):
+        self.fichier_scenario = fichier_scenario
+        # Ni captures ni rapports par itération : seules les durées sont relevées
+        self.configs = [{**config, "screenshot_dir": None, "report_dir": None} for config in configs]
+        self.utilisateurs_virtuels = len(configs)
+        self.duree = duree
+        self.rampe = min(rampe, duree)
+        self.reflexion = reflexion
+        self.repertoire = repertoire or Path(
+            os.environ.get("SIMU_OUTPUT", "/tmp"),
+            "charge",
+            fichier_scenario.stem,
+            datetime.now().strftime("%Y-%m-%d_%H-%M-%S"),
+        )
+        self.intervalle_debit = intervalle_debit
+        self.navigateur = navigateur
+        self.options_lancement = options_lancement or {}
+        self.echantillons = Echantillons()
+
+    async def _utilisateur(self, numero: int, moteur: MoteurAsync, debut_tir: float, echeance: float) -> None:
+        """Enchaîne les itérations d'un utilisateur virtuel jusqu'à l'échéance du tir"""
+        await asyncio.sleep(numero * self.rampe / self.utilisateurs_virtuels)
+        while time.monotonic() < echeance:
+            scenario = ScenarioAsync(self.fichier_scenario, self.configs[numero])
+            try:
+                rapport = await scenario.executer(moteur)
+            except Exception as e:
+                LOGGER.warning("[InjectionCharge] Utilisateur virtuel %d, itération en erreur: %s", numero, e)
+                rapport = scenario.rapport()
+                rapport["status"] = 3
+            self.echantillons.ajouter(
+                time.monotonic() - debut_tir,
+                numero,
+                rapport["status"],
+                [
+                    {"nom": brique.get("nom"), "duree": float(brique.get("duree", 0)), "status": brique.get("status", 3)}
+                    for brique in rapport["briques"]
+                ],
+            )
+
+            restant = echeance - time.monotonic()
+            if restant <= 0:
+                return
+            await asyncio.sleep(min(random.uniform(*self.reflexion), restant))
+
+    async def _tir(self, debut: float) -> None:
+        moteur = MoteurAsync(
+            navigateur=self.navigateur,
+            nb_navigateurs=max(1, -(-self.utilisateurs_virtuels // DEFAUT_CONTEXTES_PAR_NAVIGATEUR)),
+            scenarios_simultanes=self.utilisateurs_virtuels,
+            options_lancement=self.options_lancement,
+        )
+        await moteur.demarrer()
+        try:
+            echeance = debut + self.duree
+            await asyncio.gather(
+                *(self._utilisateur(numero, moteur, debut, echeance) for numero in range(self.utilisateurs_virtuels))
+            )
+        finally:
+            await moteur.arreter()
+
+    def executer(self) -> Dict:
+        """Lance le tir et retourne le rapport (également écrit dans charge.json)"""
+        self.repertoire.mkdir(parents=True, exist_ok=True)
+        LOGGER.info(
+            "[InjectionCharge] %d utilisateurs virtuels, rampe %ss, durée %ss -> %s",
+            self.utilisateurs_virtuels, self.rampe, self.duree, self.repertoire,
+        )
+        debut = time.monotonic()
+        try:
+            asyncio.run(self._tir(debut))
+        except KeyboardInterrupt:
+            # Tir interrompu : rapport des itérations terminées
+            LOGGER.warning("[InjectionCharge] Tir interrompu")
+
+        rapport = self.rapport(time.monotonic() - debut)
+        with open(self.repertoire / "charge.json", "w", encoding="utf-8") as fichier:
+            json.dump(rapport, fichier, ensure_ascii=False, indent=4)
+        return rapport
+
+    def rapport(self, duree_reelle: float) -> Dict:
+        """Percentiles par étape et débit par intervalle"""
+        durees_etapes: Dict[str, List[float]] = defaultdict(list)
+        erreurs_etapes: Dict[str, int] = defaultdict(int)
+        nb_intervalles = max(1, int(duree_reelle // self.intervalle_debit) + 1)
+        debit = [{"debut": i * self.intervalle_debit, "iterations": 0, "etapes": 0, "erreurs": 0}
+                 for i in range(nb_intervalles)]
+
+        for instant, _, status, etapes in self.echantillons.iterations:
+            intervalle = debit[min(int(instant // self.intervalle_debit), nb_intervalles - 1)]
+            intervalle["iterations"] += 1
+            intervalle["etapes"] += len(etapes)
+            if status != 0:
+                intervalle["erreurs"] += 1
+            for etape in etapes:
+                durees_etapes[etape["nom"]].append(etape["duree"])
+                if etape["status"] != 0:
+                    erreurs_etapes[etape["nom"]] += 1
+
+        etapes = {
+            nom: {
+                "nombre": len(durees),
+                "erreurs": erreurs_etapes[nom],
+                **{f"p{rang}": round(percentile(durees, rang), 3) for rang in PERCENTILES},
+                "max": round(max(durees), 3),
+            }
+            for nom, durees in durees_etapes.items()
+        }
+        iterations = len(self.echantillons.iterations)
+        return {
+            "scenario": self.fichier_scenario.stem,
+            "utilisateurs_virtuels": self.utilisateurs_virtuels,
+            "rampe": self.rampe,
+            "duree": round(duree_reelle, 3),
+            "reflexion": list(self.reflexion),
+            "iterations": iterations,
+            "iterations_en_erreur": sum(1 for _, _, status, _ in self.echantillons.iterations if status != 0),
+            "iterations_par_minute": round(iterations * 60 / duree_reelle, 2) if duree_reelle else 0,
+            "intervalle_debit": self.intervalle_debit,
+            "etapes": etapes,
+            "debit": debit,
+        }
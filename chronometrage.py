@@ -0,0 +1,161 @@
+"""
+chronometrage.py
+
+Répartition du temps d'une étape entre :
+- attente_locators : attentes d'éléments (expect(...), wait_for, wait_for_selector)
+- actions : actions utilisateur (goto, click, fill, press...)
+- attente_reseau : attentes réseau (wait_for_load_state, wait_for_url, wait_for_response...)
+- harnais : travail du simulateur (captures d'écran, détection d'erreurs, mesures)
+- autre : reste de la durée de l'étape (code du scénario, évaluations...)
+
+Les méthodes de l'API sync de Playwright sont instrumentées au niveau des classes
+(`instrumenter_playwright`). Seul l'appel le plus externe est compté : une capture
+d'écran prise pendant une action n'est pas comptée deux fois. L'horloge utilisée
+est monotone (time.perf_counter).
+"""
+
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+ATTENTE_LOCATORS = "attente_locators"
+ACTIONS = "actions"
+ATTENTE_RESEAU = "attente_reseau"
+HARNAIS = "harnais"
+AUTRE = "autre"
+CATEGORIES = (ATTENTE_LOCATORS, ACTIONS, ATTENTE_RESEAU, HARNAIS)
+
+# Méthodes instrumentées par classe de l'API sync Playwright
+METHODES_INSTRUMENTEES = {
+    "Locator": {
+        ATTENTE_LOCATORS: ("wait_for",),
+        ACTIONS: (
+            "click", "dblclick", "fill", "press", "press_sequentially", "type", "check", "uncheck",
+            "select_option", "hover", "set_input_files", "clear", "focus", "tap", "drag_to",
+        ),
+        HARNAIS: ("screenshot",),
+    },
+    "Page": {
+        ATTENTE_LOCATORS: ("wait_for_selector",),
+        ACTIONS: ("goto", "reload", "go_back", "go_forward", "click", "fill", "press", "set_content"),
+        ATTENTE_RESEAU: ("wait_for_load_state", "wait_for_url", "wait_for_response", "wait_for_request"),
+        HARNAIS: ("screenshot",),
+    },
+    "Frame": {
+        ATTENTE_LOCATORS: ("wait_for_selector",),
+        ACTIONS: ("goto", "click", "fill", "press"),
+        ATTENTE_RESEAU: ("wait_for_load_state", "wait_for_url"),
+    },
+}
+
+_instrumentation_faite = False
+
+_chronometre_courant: ContextVar[Optional["Chronometre"]] = ContextVar("chronometre_courant", default=None)
+
+
+class Chronometre:
+    """Cumul des durées par catégorie pour une étape"""
+
+    __slots__ = ("cumuls", "_profondeur")
+
+    def __init__(self):
+        self.cumuls = dict.fromkeys(CATEGORIES, 0.0)
+        self._profondeur = 0
+
+    def repartition(self, duree_totale: float) -> Dict[str, float]:
+        """Répartition de la durée de l'étape (secondes, précision milliseconde)"""
+        repartition = {categorie: round(cumul, 3) for categorie, cumul in self.cumuls.items()}
+        repartition[AUTRE] = round(max(0.0, duree_totale - sum(self.cumuls.values())), 3)
+        return repartition
+
+
+def activer_chronometre(chronometre: Chronometre):
+    """Rend un chronomètre courant ; retourne le jeton à passer à desactiver_chronometre"""
+    return _chronometre_courant.set(chronometre)
+
+
+def desactiver_chronometre(jeton) -> None:
+    """Restaure le chronomètre courant précédent"""
+    _chronometre_courant.reset(jeton)
+
+
+@contextmanager
+def mesurer(categorie: str):
+    """Compte la durée du bloc dans la catégorie (sauf s'il est imbriqué dans un bloc déjà mesuré)"""
+    chronometre = _chronometre_courant.get()
+    if chronometre is None or chronometre._profondeur:
+        yield
+        return
+
+    chronometre._profondeur += 1
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        chronometre.cumuls[categorie] += time.perf_counter() - debut
+        chronometre._profondeur -= 1
+
+
+def chronometrer(categorie: str) -> Callable:
+    """Décorateur : compte la durée de chaque appel de la fonction dans la catégorie"""
+
+    def decorateur(fonction: Callable) -> Callable:
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            chronometre = _chronometre_courant.get()
+            if chronometre is None or chronometre._profondeur:
+                return fonction(*args, **kwargs)
+
+            chronometre._profondeur += 1
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                chronometre.cumuls[categorie] += time.perf_counter() - debut
+                chronometre._profondeur -= 1
+
+        enveloppe.__chronometre__ = True
+        return enveloppe
+
+    return decorateur
+
+
+def instrumenter_playwright() -> None:
+    """
+    Instrumente les classes de l'API sync de Playwright (idempotent).
+
+    Les assertions `expect(locator)` (LocatorAssertions.to_*) sont comptées en
+    attente de locators.
+    """
+    global _instrumentation_faite
+    if _instrumentation_faite:
+        return
+
+    from playwright.sync_api import Frame, Locator, Page
+    from playwright.sync_api._generated import LocatorAssertions
+
+    classes = {"Locator": Locator, "Page": Page, "Frame": Frame}
+    for nom_classe, methodes in METHODES_INSTRUMENTEES.items():
+        for categorie, noms in methodes.items():
+            for nom in noms:
+                _instrumenter(classes[nom_classe], nom, categorie)
+
+    for nom in dir(LocatorAssertions):
+        if nom.startswith(("to_", "not_to_")):
+            _instrumenter(LocatorAssertions, nom, ATTENTE_LOCATORS)
+
+    _instrumentation_faite = True
+    LOGGER.debug("[instrumenter_playwright] API Playwright instrumentée")
+
+
+def _instrumenter(classe, nom: str, categorie: str) -> None:
+    """Remplace une méthode de classe par sa version chronométrée"""
+    methode = getattr(classe, nom, None)
+    if methode is None or getattr(methode, "__chronometre__", False):
+        return
+    setattr(classe, nom, chronometrer(categorie)(methode))
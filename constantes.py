@@ -37,6 +37,12 @@ PLATEFORME_TEST = "test"
 PLATEFORME_PROD = "prod"
 PLATEFORMES_VALIDES = [PLATEFORME_DEV, PLATEFORME_TEST, PLATEFORME_PROD]
 
+# Politiques de la sonde de disponibilité (clé de config "preflight")
+PREFLIGHT_DESACTIVE = "desactive"
+PREFLIGHT_AVERTIR = "avertir"
+PREFLIGHT_BLOQUER = "bloquer"
+PREFLIGHT_VALIDES = [PREFLIGHT_DESACTIVE, PREFLIGHT_AVERTIR, PREFLIGHT_BLOQUER]
+
 # Valeurs par défaut des chemins
 DEFAUT_SIMU_PATH = "/opt/simulateur_v6"
 DEFAUT_SCENARIOS_PATH = "/opt/scenarios_v6"
@@ -55,9 +61,10 @@ PHASE_CONFIG_BASE = 2
 PHASE_API = 3
 PHASE_PLANNING = 4
 
-# Phases post-API (5-6)
+# Phases post-API (5-7)
 PHASE_CONFIG_FINALE = 5
 PHASE_REPERTOIRES = 6
+PHASE_DISPONIBILITE = 7
 
 # Noms des phases (pour logs)
 NOMS_PHASES = {
@@ -66,7 +73,8 @@ NOMS_PHASES = {
     3: "LECTURE_API",
     4: "VERIFICATION_PLANNING",
     5: "CONFIGURATION_FINALE",
-    6: "CREATION_REPERTOIRES"
+    6: "CREATION_REPERTOIRES",
+    7: "VERIFICATION_DISPONIBILITE"
 }
 
 # Descriptions des phases
@@ -76,12 +84,13 @@ DESCRIPTIONS_PHASES = {
     3: "Lecture des données API avec l'identifiant", 
     4: "Vérification du planning d'exécution",
     5: "Finalisation de la configuration avec les données API",
-    6: "Création des répertoires de sortie"
+    6: "Création des répertoires de sortie",
+    7: "Sonde HTTP de disponibilité de l'application (preflight)"
 }
 
 # Séparation pré/post API
 PHASES_PRE_API = [1, 2, 3, 4]
-PHASES_POST_API = [5, 6]
+PHASES_POST_API = [5, 6, 7]
 TOUTES_PHASES = PHASES_PRE_API + PHASES_POST_API
 
 @classmethod
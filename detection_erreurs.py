@@ -0,0 +1,161 @@
+"""
+detection_erreurs.py
+
+Détection des pages d'erreur à partir des motifs d'erreurs.yaml.
+
+Deux analyses complémentaires :
+- recherche des motifs (codes HTTP puis messages par type) dans le HTML de la page
+- scan des sélecteurs d'erreur visibles dans le DOM (un seul aller-retour navigateur)
+
+Les pages d'erreur réseau du navigateur (about:neterror de Firefox, page neterror de
+Chromium) sont reconnues avant les motifs, quelle que soit la langue du navigateur :
+leur texte ("dnsNotFound", "Impossible de se connecter"...) ne doit pas être pris
+pour une erreur applicative.
+"""
+
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+from chronometrage import HARNAIS, chronometrer
+from detection_reseau import FICHIER_ERREURS_DEFAUT, charger_descriptions_codes, classifier_status
+
+LOGGER = logging.getLogger(__name__)
+
+# Longueur maximale du texte remonté par élément lors du scan des sélecteurs
+LONGUEUR_MAX_TEXTE_SELECTEUR = 500
+
+# Page d'erreur réseau du navigateur : <body class="neterror dnsNotFound"> (Firefox),
+# <body class="neterror"> avec un code ERR_* (Chromium)
+MOTIF_PAGE_NETERROR = re.compile(r"<body[^>]*\sclass=\"neterror(?:\s+(\w+))?[^\"]*\"", re.IGNORECASE)
+MOTIF_CODE_CHROMIUM = re.compile(r"\b(ERR_[A-Z_]+)\b")
+
+# Script exécuté dans la page : textes des éléments visibles correspondant aux sélecteurs
+SCRIPT_SCAN_SELECTEURS = """
+([selecteurs, longueurMax]) => {
+    const resultats = [];
+    for (const selecteur of selecteurs) {
+        let elements;
+        try {
+            elements = document.querySelectorAll(selecteur);
+        } catch (e) {
+            continue;
+        }
+        for (const el of elements) {
+            if (!el.offsetParent && el.tagName !== 'BODY') continue;
+            const texte = (el.innerText || '').trim();
+            if (texte) resultats.push([selecteur, texte.slice(0, longueurMax)]);
+        }
+    }
+    return resultats;
+}
+"""
+
+
+class DetecteurErreursPage:
+    """
+    Analyse d'une page selon la section `detection_erreurs` d'erreurs.yaml.
+
+    Les expressions régulières sont compilées une seule fois à la création.
+    """
+
+    def __init__(self, chemin_fichier: Path = FICHIER_ERREURS_DEFAUT):
+        with open(chemin_fichier, encoding="utf-8") as fichier:
+            contenu = yaml.safe_load(fichier) or {}
+
+        detection = contenu.get("detection_erreurs", {})
+        self.descriptions_codes = charger_descriptions_codes(str(chemin_fichier))
+        self.descriptions_types: Dict[str, str] = contenu.get("descriptions_types", {})
+
+        self.motifs_codes = [re.compile(motif, re.IGNORECASE) for motif in detection.get("codes_http", [])]
+        self.motifs_messages = [
+            (type_erreur, re.compile(motif, re.IGNORECASE))
+            for type_erreur, motifs in detection.get("messages_erreur", {}).items()
+            for motif in motifs
+        ]
+        self.selecteurs: List[str] = detection.get("selecteurs", [])
+
+        LOGGER.debug(
+            "[DetecteurErreursPage] %d motifs de codes, %d motifs de messages, %d sélecteurs",
+            len(self.motifs_codes),
+            len(self.motifs_messages),
+            len(self.selecteurs),
+        )
+
+    def analyser_texte(self, texte: str) -> Optional[Dict]:
+        """
+        Recherche la première erreur dans un texte (HTML ou texte visible).
+
+        Les pages d'erreur réseau du navigateur sont prioritaires, puis les codes
+        HTTP explicites, puis les messages génériques.
+
+        Returns:
+            Optional[dict]: {"code", "type", "description", "motif"} ou None
+            (+ "erreur_navigateur" pour une page d'erreur réseau)
+        """
+        erreur = self.analyser_page_neterror(texte)
+        if erreur is not None:
+            return erreur
+
+        for motif in self.motifs_codes:
+            correspondance = motif.search(texte)
+            if correspondance:
+                erreur = classifier_status(int(correspondance.group(1)), self.descriptions_codes)
+                erreur["motif"] = motif.pattern
+                return erreur
+
+        for type_erreur, motif in self.motifs_messages:
+            if motif.search(texte):
+                return {
+                    "code": None,
+                    "type": type_erreur,
+                    "description": self.descriptions_types.get(type_erreur, type_erreur),
+                    "motif": motif.pattern,
+                }
+
+        return None
+
+    def analyser_page_neterror(self, texte: str) -> Optional[Dict]:
+        """Erreur réseau si le texte est une page d'erreur réseau du navigateur, sinon None"""
+        correspondance = MOTIF_PAGE_NETERROR.search(texte)
+        if correspondance is None:
+            return None
+
+        erreur_navigateur = correspondance.group(1)
+        if erreur_navigateur is None:
+            code_chromium = MOTIF_CODE_CHROMIUM.search(texte)
+            erreur_navigateur = code_chromium.group(1) if code_chromium else None
+        return {
+            "code": None,
+            "type": "reseau",
+            "description": self.descriptions_types.get("reseau", "reseau"),
+            "motif": MOTIF_PAGE_NETERROR.pattern,
+            "erreur_navigateur": erreur_navigateur,
+        }
+
+    @chronometrer(HARNAIS)
+    def scanner_selecteurs(self, page) -> Optional[Dict]:
+        """
+        Analyse le texte des éléments d'erreur visibles de la page Playwright.
+
+        Returns:
+            Optional[dict]: première erreur trouvée (avec le sélecteur) ou None
+        """
+        elements = page.evaluate(SCRIPT_SCAN_SELECTEURS, [self.selecteurs, LONGUEUR_MAX_TEXTE_SELECTEUR])
+        for selecteur, texte in elements:
+            erreur = self.analyser_texte(texte)
+            if erreur is not None:
+                erreur["selecteur"] = selecteur
+                return erreur
+        return None
+
+    @chronometrer(HARNAIS)
+    def analyser_page(self, page) -> Optional[Dict]:
+        """Analyse complète d'une page : motifs sur le HTML puis scan des sélecteurs"""
+        erreur = self.analyser_texte(page.content())
+        if erreur is not None:
+            return erreur
+        return self.scanner_selecteurs(page)
@@ -0,0 +1,272 @@
+"""
+detection_reseau.py
+
+Détection des erreurs réseau à partir des événements Playwright.
+
+Les réponses 4xx/5xx et les requêtes en échec sont classifiées avec la table
+`descriptions_codes` d'erreurs.yaml. Une erreur sur la frame principale (ou sur
+une URL déclarée critique dans la configuration) passe l'étape en erreur avec
+un commentaire classifié. La page, partagée par les étapes du scénario, n'est
+jamais fermée : les assertions `expect(...)` de l'étape attendent par tranches
+(`attente_interruptible`) et lèvent ErreurReseauCritique dès l'erreur, sans
+attendre la fin de leur timeout.
+"""
+
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+import yaml
+
+LOGGER = logging.getLogger(__name__)
+
+FICHIER_ERREURS_DEFAUT = Path(__file__).with_name("erreurs.yaml")
+
+# Statut d'une étape en erreur (cf. Etape.finalise)
+STATUS_ERREUR = 2
+
+# Nombre maximal d'erreurs conservées par étape dans le rapport
+MAX_ERREURS_CONSERVEES = 50
+
+# Durée maximale d'une tranche d'attente entre deux vérifications (ms)
+TRANCHE_ATTENTE_MS = 500
+
+
+class ErreurReseauCritique(Exception):
+    """Erreur réseau bloquante détectée pendant une étape"""
+    pass
+
+
+@lru_cache(maxsize=4)
+def charger_descriptions_codes(chemin_fichier: str = str(FICHIER_ERREURS_DEFAUT)) -> Dict[int, str]:
+    """
+    Charge la table `descriptions_codes` d'erreurs.yaml (une seule lecture par fichier).
+
+    Returns:
+        Dict[int, str]: code HTTP -> description
+    """
+    try:
+        with open(chemin_fichier, encoding="utf-8") as fichier:
+            contenu = yaml.safe_load(fichier) or {}
+    except (OSError, yaml.YAMLError) as e:
+        LOGGER.warning("[charger_descriptions_codes] ⚠️ Lecture impossible de %s: %s", chemin_fichier, e)
+        return {}
+
+    return {int(code): description for code, description in contenu.get("descriptions_codes", {}).items()}
+
+
+def classifier_status(status: int, descriptions_codes: Dict[int, str]) -> Dict:
+    """
+    Classifie un code HTTP selon les types d'erreurs.yaml ("4xx" / "5xx").
+
+    Returns:
+        dict: {"code", "type", "description"}
+    """
+    type_erreur = "5xx" if status >= 500 else "4xx"
+    description = descriptions_codes.get(status)
+    if description is None:
+        description = "Erreur serveur" if status >= 500 else "Erreur client"
+    return {"code": status, "type": type_erreur, "description": description}
+
+
+class DetecteurErreursReseau:
+    """
+    Écoute les événements `response` et `requestfailed` d'une page Playwright.
+
+    Configuration (clé optionnelle de la config scénario) :
+    - urls_critiques : liste de regex d'URL dont l'échec est bloquant
+    """
+
+    def __init__(self, page, config: Dict, descriptions_codes: Optional[Dict[int, str]] = None):
+        self.page = page
+        self.descriptions_codes = (
+            descriptions_codes if descriptions_codes is not None else charger_descriptions_codes()
+        )
+        self.urls_critiques = [re.compile(motif) for motif in config.get("urls_critiques") or []]
+
+        self.erreurs: List[Dict] = []
+        self.erreur_critique: Optional[Dict] = None
+        self._attache = False
+
+    # === ABONNEMENT AUX ÉVÉNEMENTS ===
+
+    def attacher(self) -> None:
+        """Abonne le détecteur aux événements réseau de la page"""
+        if self._attache:
+            return
+        self.page.on("response", self._sur_reponse)
+        self.page.on("requestfailed", self._sur_echec_requete)
+        self._attache = True
+
+    def detacher(self) -> None:
+        """Désabonne le détecteur (sans erreur si la page est déjà fermée)"""
+        if not self._attache:
+            return
+        try:
+            self.page.remove_listener("response", self._sur_reponse)
+            self.page.remove_listener("requestfailed", self._sur_echec_requete)
+        except Exception as e:
+            LOGGER.debug("[DetecteurErreursReseau.detacher] Désabonnement impossible: %s", e)
+        self._attache = False
+
+    def reinitialiser(self) -> None:
+        """Remet à zéro les erreurs collectées (début d'étape)"""
+        self.erreurs = []
+        self.erreur_critique = None
+
+    # === HANDLERS ===
+
+    def _sur_reponse(self, response) -> None:
+        """Handler `response` : seules les réponses >= 400 sont traitées"""
+        status = response.status
+        if status < 400:
+            return
+
+        request = response.request
+        erreur = classifier_status(status, self.descriptions_codes)
+        erreur["url"] = response.url
+        erreur["critique"] = self._est_critique(request)
+        self._conserver(erreur)
+
+        LOGGER.debug(
+            "[DetecteurErreursReseau] Réponse %d (%s) sur %s", status, erreur["description"], response.url
+        )
+
+        if status >= 500 and erreur["critique"]:
+            self._declencher(erreur)
+
+    def _sur_echec_requete(self, request) -> None:
+        """Handler `requestfailed` : échec au niveau réseau (DNS, connexion, TLS...)"""
+        erreur = {
+            "code": None,
+            "type": "reseau",
+            "description": request.failure or "Échec réseau",
+            "url": request.url,
+            "critique": self._est_critique(request),
+        }
+        self._conserver(erreur)
+
+        LOGGER.debug("[DetecteurErreursReseau] Requête en échec (%s) sur %s", erreur["description"], request.url)
+
+        if erreur["critique"]:
+            self._declencher(erreur)
+
+    def _conserver(self, erreur: Dict) -> None:
+        """Conserve l'erreur pour le rapport dans la limite de MAX_ERREURS_CONSERVEES"""
+        if len(self.erreurs) < MAX_ERREURS_CONSERVEES:
+            self.erreurs.append(erreur)
+
+    def _est_critique(self, request) -> bool:
+        """Une requête est critique si c'est une navigation de la frame principale ou une URL configurée"""
+        try:
+            if request.is_navigation_request() and request.frame.parent_frame is None:
+                return True
+        except Exception:
+            # Requêtes de service worker : pas de frame associée
+            pass
+
+        url = request.url
+        return any(motif.search(url) for motif in self.urls_critiques)
+
+    def _declencher(self, erreur: Dict) -> None:
+        """Enregistre la première erreur bloquante de l'étape"""
+        if self.erreur_critique is not None:
+            return
+
+        self.erreur_critique = erreur
+        LOGGER.error("[DetecteurErreursReseau] ❌ %s", self.message(erreur))
+
+    # === RÉSULTATS ===
+
+    @staticmethod
+    def message(erreur: Dict) -> str:
+        """Commentaire d'étape correspondant à une erreur"""
+        if erreur["code"] is None:
+            return f"Erreur réseau ({erreur['description']}) sur {erreur['url']}"
+        return f"Erreur {erreur['code']} ({erreur['description']}) sur {erreur['url']}"
+
+    def verifier(self) -> None:
+        """
+        Lève ErreurReseauCritique si une erreur bloquante a été détectée.
+
+        Raises:
+            ErreurReseauCritique
+        """
+        if self.erreur_critique is not None:
+            raise ErreurReseauCritique(self.message(self.erreur_critique))
+
+
+# === ATTENTES INTERRUPTIBLES ===
+
+
+# Détecteur de l'étape en cours
+_detecteur_courant: ContextVar[Optional[DetecteurErreursReseau]] = ContextVar("detecteur_courant", default=None)
+
+
+def attente_interruptible(attendre: Callable[[float], Any], timeout_ms: float) -> Any:
+    """
+    Exécute une attente Playwright par tranches de TRANCHE_ATTENTE_MS au plus.
+
+    Entre deux tranches, le détecteur de l'étape est vérifié : une erreur bloquante
+    interrompt l'attente (la page reste utilisable, aucune attente n'est annulée).
+
+    Args:
+        attendre: attente appelée avec le timeout de la tranche (ms), lève AssertionError à son expiration
+        timeout_ms: timeout total de l'attente
+
+    Raises:
+        ErreurReseauCritique: erreur bloquante détectée pendant l'attente
+    """
+    detecteur = _detecteur_courant.get()
+    if detecteur is None:
+        return attendre(timeout_ms)
+
+    fin = time.monotonic() + timeout_ms / 1000
+    while True:
+        detecteur.verifier()
+        restant_ms = (fin - time.monotonic()) * 1000
+        tranche_ms = max(1.0, min(TRANCHE_ATTENTE_MS, restant_ms))
+        try:
+            return attendre(tranche_ms)
+        except AssertionError:
+            if tranche_ms >= restant_ms:
+                detecteur.verifier()
+                raise
+
+
+# === FIXTURE PYTEST ===
+
+
+@pytest.fixture(scope="function", autouse=True)
+def detecteur_reseau(execution, etape, request):
+    """
+    Surveille les erreurs réseau pendant une étape (étapes utilisant `page`).
+
+    En cas d'erreur bloquante, l'étape est passée en erreur avec le commentaire
+    classifié et les erreurs collectées sont ajoutées au rapport de l'étape.
+    """
+    if "page" not in request.fixturenames:
+        yield None
+        return
+
+    page = request.getfixturevalue("page")
+    detecteur = DetecteurErreursReseau(page, execution.config)
+    detecteur.attacher()
+    jeton = _detecteur_courant.set(detecteur)
+
+    yield detecteur
+
+    _detecteur_courant.reset(jeton)
+    detecteur.detacher()
+
+    if detecteur.erreurs:
+        etape.etape["erreurs_reseau"] = detecteur.erreurs
+
+    if detecteur.erreur_critique is not None:
+        etape.set_status(STATUS_ERREUR)
+        etape.set_commentaire(detecteur.message(detecteur.erreur_critique))
@@ -0,0 +1,317 @@
+"""
+echantillonneur.py
+
+Échantillonnage en tâche de fond des ressources de l'injecteur pendant l'exécution.
+
+Toutes les 250 ms (par défaut) :
+- cpu : utilisation CPU de l'hôte (0 à 1)
+- cpu_navigateurs : CPU consommé par l'arborescence du processus courant (en cœurs)
+- rss_navigateurs_mo : RSS de cette arborescence
+- descripteurs : fichiers ouverts par cette arborescence
+- memoire_disponible_mo : mémoire disponible de l'hôte
+- octets_recus / octets_emis : compteurs réseau de l'hôte (hors loopback)
+
+C'est la seule source de mesure de la charge de l'injecteur :
+- chaque étape reçoit un résumé `ressources` : min/moy/max des quatre premières
+  mesures et volume réseau échangé pendant l'étape (plusieurs étapes peuvent
+  être résumées en même temps, cas du moteur async)
+- le gouverneur de concurrence lit le dernier relevé (`dernier_releve`)
+
+L'arborescence de processus n'est recalculée que toutes les 2 secondes pour
+limiter le coût de l'échantillonnage.
+
+Les échantillons bruts peuvent être écrits dans report_dir/ressources.bin :
+en-tête MAGIC + version, puis des enregistrements FORMAT_ENREGISTREMENT
+(voir `lire_echantillons`).
+"""
+
+import logging
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+
+import pytest
+
+from pool_navigateurs import descendants
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAUT_PERIODE = 0.25
+PERIODE_ARBORESCENCE = 2.0
+NOM_FICHIER_BINAIRE = "ressources.bin"
+MAGIC = b"SIMR"
+VERSION = 1
+# instant (s depuis le début), cpu, cpu_navigateurs, rss (Mo), descripteurs, octets reçus, octets émis
+FORMAT_ENREGISTREMENT = struct.Struct("<dfffIQQ")
+MESURES_RESUMEES = ("cpu", "cpu_navigateurs", "rss_navigateurs_mo", "descripteurs")
+
+_TICKS_PAR_SECONDE = os.sysconf("SC_CLK_TCK")
+_TAILLE_PAGE = os.sysconf("SC_PAGE_SIZE")
+
+
+# === MESURES (LINUX /proc) ===
+
+
+def lire_cpu() -> Tuple[int, int]:
+    """Compteurs cumulés (total, inactif) de /proc/stat, en jiffies"""
+    champs = [int(valeur) for valeur in Path("/proc/stat").read_text().split("\n", 1)[0].split()[1:]]
+    # idle + iowait
+    return sum(champs), champs[3] + (champs[4] if len(champs) > 4 else 0)
+
+
+def memoire_disponible_mo() -> float:
+    """MemAvailable de /proc/meminfo en Mo"""
+    for ligne in Path("/proc/meminfo").read_text().splitlines():
+        if ligne.startswith("MemAvailable:"):
+            return int(ligne.split()[1]) / 1024
+    return 0.0
+
+
+class MesureurCpu:
+    """Utilisation CPU (0 à 1) entre deux appels successifs"""
+
+    __slots__ = ("_precedent",)
+
+    def __init__(self):
+        self._precedent = lire_cpu()
+
+    def utilisation(self) -> float:
+        total, inactif = lire_cpu()
+        total_precedent, inactif_precedent = self._precedent
+        self._precedent = (total, inactif)
+        ecart = total - total_precedent
+        if ecart <= 0:
+            return 0.0
+        return 1 - (inactif - inactif_precedent) / ecart
+
+
+def lire_octets_reseau() -> Tuple[int, int]:
+    """Octets (reçus, émis) cumulés de toutes les interfaces sauf loopback"""
+    recus = emis = 0
+    for ligne in Path("/proc/net/dev").read_text().splitlines()[2:]:
+        interface, _, valeurs = ligne.partition(":")
+        if interface.strip() == "lo":
+            continue
+        champs = valeurs.split()
+        recus += int(champs[0])
+        emis += int(champs[8])
+    return recus, emis
+
+
+def lire_processus(pids: Set[int]) -> Tuple[int, float, int]:
+    """(ticks CPU cumulés, RSS en Mo, descripteurs ouverts) d'un ensemble de processus"""
+    ticks = pages = descripteurs = 0
+    for pid in pids:
+        try:
+            champs = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+            # utime et stime : champs 14 et 15 de stat (11 et 12 après le nom)
+            ticks += int(champs[11]) + int(champs[12])
+            pages += int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+            descripteurs += len(os.listdir(f"/proc/{pid}/fd"))
+        except (OSError, IndexError, ValueError):
+            continue
+    return ticks, pages * _TAILLE_PAGE / (1024 * 1024), descripteurs
+
+
+class ResumeRessources:
+    """Min/moy/max des mesures et volume réseau sur une période (une étape)"""
+
+    __slots__ = ("minimums", "maximums", "sommes", "nombre", "reseau_debut", "reseau_fin")
+
+    def __init__(self, reseau: Tuple[int, int]):
+        self.minimums = dict.fromkeys(MESURES_RESUMEES, float("inf"))
+        self.maximums = dict.fromkeys(MESURES_RESUMEES, float("-inf"))
+        self.sommes = dict.fromkeys(MESURES_RESUMEES, 0.0)
+        self.nombre = 0
+        self.reseau_debut = self.reseau_fin = reseau
+
+    def ajouter(self, mesures: Dict[str, float], reseau: Tuple[int, int]) -> None:
+        for nom in MESURES_RESUMEES:
+            valeur = mesures[nom]
+            if valeur < self.minimums[nom]:
+                self.minimums[nom] = valeur
+            if valeur > self.maximums[nom]:
+                self.maximums[nom] = valeur
+            self.sommes[nom] += valeur
+        self.nombre += 1
+        self.reseau_fin = reseau
+
+    def resume(self) -> Dict:
+        resume: Dict = {"echantillons": self.nombre}
+        if self.nombre:
+            for nom in MESURES_RESUMEES:
+                resume[nom] = {
+                    "min": round(self.minimums[nom], 3),
+                    "moy": round(self.sommes[nom] / self.nombre, 3),
+                    "max": round(self.maximums[nom], 3),
+                }
+        resume["octets_recus"] = self.reseau_fin[0] - self.reseau_debut[0]
+        resume["octets_emis"] = self.reseau_fin[1] - self.reseau_debut[1]
+        return resume
+
+
+class Echantillonneur(threading.Thread):
+    """Thread d'échantillonnage des ressources (un par exécution)"""
+
+    def __init__(self, periode: float = DEFAUT_PERIODE, chemin_binaire: Optional[str] = None):
+        super().__init__(name="echantillonneur_ressources", daemon=True)
+        self.periode = periode
+        self.chemin_binaire = chemin_binaire
+        self._arret = threading.Event()
+        self._verrou = threading.Lock()
+        # Résumés des étapes en cours
+        self._resumes: List[ResumeRessources] = []
+        self._dernieres_mesures: Dict[str, float] = {}
+        self._dernier_reseau: Tuple[int, int] = (0, 0)
+        self._fichier: Optional[BinaryIO] = None
+        self._mesureur_cpu = MesureurCpu()
+        self._pids: Set[int] = set()
+        self._instant_pids = float("-inf")
+        self._ticks_precedents: Optional[Tuple[float, int]] = None
+        self._debut = time.perf_counter()
+
+    def _mesurer(self) -> Tuple[Dict[str, float], Tuple[int, int]]:
+        maintenant = time.perf_counter()
+        if maintenant - self._instant_pids >= PERIODE_ARBORESCENCE:
+            self._pids = descendants(os.getpid())
+            self._instant_pids = maintenant
+
+        ticks, rss_mo, descripteurs = lire_processus(self._pids)
+        cpu_navigateurs = 0.0
+        if self._ticks_precedents is not None:
+            instant_precedent, ticks_precedents = self._ticks_precedents
+            ecart = maintenant - instant_precedent
+            # Un processus disparu fait baisser le cumul : l'écart est ignoré
+            if ecart > 0 and ticks >= ticks_precedents:
+                cpu_navigateurs = (ticks - ticks_precedents) / _TICKS_PAR_SECONDE / ecart
+        self._ticks_precedents = (maintenant, ticks)
+
+        mesures = {
+            "cpu": self._mesureur_cpu.utilisation(),
+            "cpu_navigateurs": cpu_navigateurs,
+            "rss_navigateurs_mo": rss_mo,
+            "descripteurs": descripteurs,
+            "memoire_disponible_mo": memoire_disponible_mo(),
+        }
+        return mesures, lire_octets_reseau()
+
+    def run(self) -> None:
+        while not self._arret.wait(self.periode):
+            try:
+                mesures, reseau = self._mesurer()
+            except OSError as e:
+                LOGGER.debug("[Echantillonneur] Mesure impossible: %s", e)
+                continue
+
+            with self._verrou:
+                self._dernieres_mesures = mesures
+                self._dernier_reseau = reseau
+                for resume in self._resumes:
+                    resume.ajouter(mesures, reseau)
+            if self._fichier is not None:
+                self._fichier.write(
+                    FORMAT_ENREGISTREMENT.pack(
+                        time.perf_counter() - self._debut,
+                        mesures["cpu"],
+                        mesures["cpu_navigateurs"],
+                        mesures["rss_navigateurs_mo"],
+                        mesures["descripteurs"],
+                        *reseau,
+                    )
+                )
+
+    def demarrer(self) -> "Echantillonneur":
+        try:
+            self._dernier_reseau = lire_octets_reseau()
+        except OSError:
+            pass
+        if self.chemin_binaire:
+            try:
+                self._fichier = open(self.chemin_binaire, "wb")
+                self._fichier.write(MAGIC + struct.pack("<H", VERSION))
+            except OSError as e:
+                LOGGER.warning("[Echantillonneur] ⚠️ Fichier %s non créé: %s", self.chemin_binaire, e)
+                self._fichier = None
+        self.start()
+        return self
+
+    def arreter(self) -> None:
+        self._arret.set()
+        self.join(timeout=2 * self.periode + 1)
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
+
+    def debuter_etape(self) -> ResumeRessources:
+        """Démarre le résumé d'une étape (sans lecture de /proc : compteurs réseau du dernier échantillon)"""
+        with self._verrou:
+            resume = ResumeRessources(self._dernier_reseau)
+            self._resumes.append(resume)
+        return resume
+
+    def resume_etape(self, resume: ResumeRessources) -> Dict:
+        """Termine le résumé d'une étape"""
+        with self._verrou:
+            self._resumes.remove(resume)
+        return resume.resume()
+
+    def dernier_releve(self) -> Dict[str, float]:
+        """Mesures du dernier échantillon ({} avant le premier)"""
+        with self._verrou:
+            return dict(self._dernieres_mesures)
+
+
+def lire_echantillons(chemin: str) -> Iterator[Dict[str, float]]:
+    """Relit un fichier ressources.bin"""
+    noms = ("instant", "cpu", "cpu_navigateurs", "rss_navigateurs_mo", "descripteurs", "octets_recus", "octets_emis")
+    with open(chemin, "rb") as fichier:
+        entete = fichier.read(len(MAGIC) + 2)
+        if entete[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{chemin} n'est pas un fichier d'échantillons de ressources")
+        version = struct.unpack("<H", entete[len(MAGIC):])[0]
+        if version != VERSION:
+            raise ValueError(f"Version {version} non supportée")
+        contenu = fichier.read()
+    taille = FORMAT_ENREGISTREMENT.size
+    for debut in range(0, len(contenu) - taille + 1, taille):
+        yield dict(zip(noms, FORMAT_ENREGISTREMENT.unpack_from(contenu, debut)))
+
+
+# === FIXTURES PYTEST ===
+
+
+@pytest.fixture(scope="session")
+def echantillonneur_ressources(execution) -> Optional[Echantillonneur]:
+    """
+    Échantillonneur de l'exécution.
+
+    Config : echantillonnage_ressources (défaut True), echantillonnage_periode (défaut 0.25 s),
+    echantillonnage_binaire (défaut False, écrit report_dir/ressources.bin).
+    """
+    config = execution.config
+    if not config.get("echantillonnage_ressources", True):
+        yield None
+        return
+
+    chemin_binaire = None
+    if config.get("echantillonnage_binaire") and config.get("report_dir"):
+        chemin_binaire = f"{config['report_dir']}/{NOM_FICHIER_BINAIRE}"
+
+    echantillonneur = Echantillonneur(config.get("echantillonnage_periode", DEFAUT_PERIODE), chemin_binaire).demarrer()
+    yield echantillonneur
+    echantillonneur.arreter()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def ressources_etape(echantillonneur_ressources, etape):
+    """Résumé des ressources de l'injecteur pendant l'étape"""
+    if echantillonneur_ressources is None:
+        yield
+        return
+
+    resume = echantillonneur_ressources.debuter_etape()
+    yield
+    etape.etape["ressources"] = echantillonneur_ressources.resume_etape(resume)
@@ -0,0 +1,54 @@
+"""
+encodage_rapport.py
+
+Construction et encodage JSON du rapport d'une exécution (scenario.json et inscription API).
+
+- `construire_rapport` : le dictionnaire du rapport, construit une seule fois
+  (statut et commentaire remplaçables pour un rapport d'erreur de finalisation)
+- `encoder_json` : orjson s'il est installé, sinon json ; compact par défaut,
+  indenté seulement sur demande (config rapport_indente)
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+INDENTATION = 4
+
+
+def construire_rapport(execution, status: Optional[int] = None, commentaire: Optional[str] = None) -> Dict[str, Any]:
+    """Rapport d'une exécution finalisée au format scenario.json"""
+    status = execution.status if status is None else status
+    return {
+        "identifiant": execution.config.get("identifiant", ""),
+        "scenario": execution.config.get("nom_scenario", ""),
+        "date": execution.date.isoformat(),
+        "duree": execution.duree,
+        "status": status,
+        "nb_scene": execution.nb_etapes,
+        "commentaire": execution.commentaire if commentaire is None else commentaire,
+        "injecteur": execution.injecteur,
+        "navigateur": execution.navigateur,
+        "interface_ip": execution.interface_ip,
+        "status_initial": execution.status_initial if commentaire is None else status,
+        "commentaire_initial": execution.commentaire_initial if commentaire is None else commentaire,
+        "briques": execution.briques(),
+    }
+
+
+def encoder_json(donnees: Any, indente: bool = False) -> bytes:
+    """JSON UTF-8 (caractères non ASCII conservés)"""
+    if indente:
+        return json.dumps(donnees, ensure_ascii=False, indent=INDENTATION).encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(donnees)
+    return json.dumps(donnees, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def ecrire_json(chemin: str, donnees: Any, indente: bool = False) -> None:
+    with open(chemin, "wb") as fichier:
+        fichier.write(encoder_json(donnees, indente))
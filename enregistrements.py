@@ -0,0 +1,104 @@
+"""
+enregistrements.py
+
+Enregistrement typé d'une étape et encodage au format JSON existant (briques).
+
+Les champs de base (nom, ordre, date, duree, status, url, commentaire) sont des
+slots typés : durée numérique (secondes), statut `StatutEtape`. Les sections
+optionnelles ajoutées par les fixtures (repartition, reseau, mesures...) sont
+rangées dans `sections`, créé au premier ajout. L'accès par clé
+(`etape.etape["reseau"] = ...`) reste possible pour les deux.
+"""
+
+from datetime import datetime
+from enum import IntEnum
+from typing import Any, Dict, Iterable, Optional, Union
+
+
+class StatutEtape(IntEnum):
+    """Statuts d'une étape (valeurs ISAC)"""
+
+    SUCCES = 0
+    AVERTISSEMENT = 1
+    ERREUR = 2
+    INCONNU = 3
+
+
+CHAMPS_ETAPE = ("nom", "ordre", "date", "duree", "status", "url", "commentaire")
+_CHAMPS = frozenset(CHAMPS_ETAPE)
+
+
+class EnregistrementEtape:
+    """Données d'une étape"""
+
+    __slots__ = CHAMPS_ETAPE + ("sections",)
+
+    def __init__(
+        self,
+        nom: str,
+        ordre: Optional[int] = None,
+        date: Optional[datetime] = None,
+        duree: float = 0.0,
+        status: Union[StatutEtape, int] = StatutEtape.INCONNU,
+        url: str = "",
+        commentaire: str = "",
+    ):
+        self.nom = nom
+        self.ordre = ordre
+        self.date = date or datetime.now()
+        self.duree = duree
+        self.status = StatutEtape(status)
+        self.url = url
+        self.commentaire = commentaire
+        self.sections: Optional[Dict[str, Any]] = None
+
+    # === ACCÈS PAR CLÉ (compatibilité avec l'ancien dictionnaire) ===
+
+    def __getitem__(self, cle: str) -> Any:
+        if cle in _CHAMPS:
+            return getattr(self, cle)
+        if self.sections is not None and cle in self.sections:
+            return self.sections[cle]
+        raise KeyError(cle)
+
+    def __setitem__(self, cle: str, valeur: Any) -> None:
+        if cle == "status":
+            self.status = StatutEtape(valeur)
+        elif cle in _CHAMPS:
+            setattr(self, cle, valeur)
+        else:
+            if self.sections is None:
+                self.sections = {}
+            self.sections[cle] = valeur
+
+    def __contains__(self, cle: str) -> bool:
+        return cle in _CHAMPS or (self.sections is not None and cle in self.sections)
+
+    def get(self, cle: str, defaut: Any = None) -> Any:
+        try:
+            return self[cle]
+        except KeyError:
+            return defaut
+
+    def update(self, valeurs: Union[Dict[str, Any], Iterable]) -> None:
+        for cle, valeur in dict(valeurs).items():
+            self[cle] = valeur
+
+    def __repr__(self) -> str:
+        return f"EnregistrementEtape({encoder_etape(self)!r})"
+
+
+def encoder_etape(etape: EnregistrementEtape) -> Dict[str, Any]:
+    """Brique au format JSON existant"""
+    donnees = {
+        "nom": etape.nom,
+        "ordre": "" if etape.ordre is None else etape.ordre,
+        "date": etape.date.isoformat(),
+        "duree": etape.duree,
+        "status": int(etape.status),
+        "url": etape.url,
+        "commentaire": etape.commentaire,
+    }
+    if etape.sections:
+        donnees.update(etape.sections)
+    return donnees
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+entrepot.py
+
+Ingestion en masse des rapports d'exécution (output_path/rapports) dans un entrepôt PostgreSQL.
+
+L'arborescence rapports/<application>/<scenario>/<date>/<heure>/scenario.json
+est parcourue de façon incrémentale : seuls les rapports modifiés après la
+marque d'ingestion (mtime, chemin du dernier rapport ingéré) sont lus, les
+répertoires de dates antérieures à la veille de la marque ne sont pas parcourus. Les
+rapports sont chargés par lots avec COPY dans des tables temporaires puis
+insérés dans les tables normalisées ; la marque est mise à jour dans la même
+transaction que le lot (une interruption ne perd ni ne duplique de rapport).
+La marque ne dépasse jamais un rapport illisible : il est relu à l'ingestion
+suivante, les rapports suivants déjà chargés sont ignorés (chemin unique).
+
+Tables :
+- executions : une ligne par rapport (chemin unique)
+- etapes : une ligne par brique, sections optionnelles en JSONB
+- ingestion_marques : marque d'ingestion par racine
+
+Usage :
+    python entrepot.py --host localhost --database resultats --user simu --racine /var/simulateur_v6/rapports
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+LOGGER = logging.getLogger(__name__)
+
+NOM_RAPPORT = "scenario.json"
+TAILLE_LOT = 2000
+LECTEURS = 8
+# Un rapport modifié depuis moins longtemps peut être en cours d'écriture
+DELAI_STABILITE = 2.0
+
+CHAMPS_EXECUTION = (
+    "chemin", "application", "identifiant", "scenario", "date", "duree", "status",
+    "commentaire", "injecteur", "navigateur", "nb_etapes", "mtime",
+)
+CHAMPS_ETAPE = ("chemin", "ordre", "nom", "date", "duree", "status", "url", "commentaire", "sections")
+CHAMPS_BASE_BRIQUE = frozenset(("nom", "ordre", "date", "duree", "status", "url", "commentaire"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id BIGSERIAL PRIMARY KEY,
+    chemin TEXT NOT NULL UNIQUE,
+    application TEXT,
+    identifiant TEXT,
+    scenario TEXT NOT NULL,
+    date TIMESTAMP NOT NULL,
+    duree DOUBLE PRECISION,
+    status SMALLINT,
+    commentaire TEXT,
+    injecteur TEXT,
+    navigateur TEXT,
+    nb_etapes INTEGER,
+    mtime DOUBLE PRECISION NOT NULL
+);
+CREATE TABLE IF NOT EXISTS etapes (
+    execution_id BIGINT NOT NULL REFERENCES executions (id) ON DELETE CASCADE,
+    ordre INTEGER,
+    nom TEXT NOT NULL,
+    date TIMESTAMP,
+    duree DOUBLE PRECISION,
+    status SMALLINT,
+    url TEXT,
+    commentaire TEXT,
+    sections JSONB
+);
+CREATE TABLE IF NOT EXISTS ingestion_marques (
+    racine TEXT PRIMARY KEY,
+    mtime DOUBLE PRECISION NOT NULL,
+    chemin TEXT NOT NULL,
+    maj TIMESTAMP NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_executions_scenario_date ON executions (scenario, date);
+CREATE INDEX IF NOT EXISTS idx_executions_application_date ON executions (application, date);
+CREATE INDEX IF NOT EXISTS idx_etapes_execution ON etapes (execution_id);
+CREATE INDEX IF NOT EXISTS idx_etapes_nom_date ON etapes (nom, date);
+"""
+
+TABLES_TEMPORAIRES = """
+CREATE TEMP TABLE IF NOT EXISTS tmp_executions (
+    chemin TEXT, application TEXT, identifiant TEXT, scenario TEXT, date TIMESTAMP, duree DOUBLE PRECISION,
+    status SMALLINT, commentaire TEXT, injecteur TEXT, navigateur TEXT, nb_etapes INTEGER, mtime DOUBLE PRECISION
+) ON COMMIT DELETE ROWS;
+CREATE TEMP TABLE IF NOT EXISTS tmp_etapes (
+    chemin TEXT, ordre INTEGER, nom TEXT, date TIMESTAMP, duree DOUBLE PRECISION,
+    status SMALLINT, url TEXT, commentaire TEXT, sections JSONB
+) ON COMMIT DELETE ROWS;
+"""
+
+INSERTION_LOT = f"""
+WITH inserees AS (
+    INSERT INTO executions ({", ".join(CHAMPS_EXECUTION)})
+    SELECT {", ".join(CHAMPS_EXECUTION)} FROM tmp_executions
+    ON CONFLICT (chemin) DO NOTHING
+    RETURNING id, chemin
+)
+INSERT INTO etapes (execution_id, {", ".join(CHAMPS_ETAPE[1:])})
+SELECT inserees.id, {", ".join(f"e.{champ}" for champ in CHAMPS_ETAPE[1:])}
+FROM tmp_etapes e JOIN inserees ON inserees.chemin = e.chemin
+"""
+
+MAJ_MARQUE = """
+INSERT INTO ingestion_marques (racine, mtime, chemin) VALUES (%s, %s, %s)
+ON CONFLICT (racine) DO UPDATE SET mtime = EXCLUDED.mtime, chemin = EXCLUDED.chemin, maj = now()
+"""
+
+_ECHAPPEMENTS_COPY = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+# === FORMAT TEXTE DE COPY ===
+
+
+def valeur_copy(valeur) -> str:
+    """Valeur au format texte de COPY (\\N pour NULL, chaîne vide conservée)"""
+    if valeur is None:
+        return "\\N"
+    if isinstance(valeur, (dict, list)):
+        valeur = json.dumps(valeur, ensure_ascii=False, separators=(",", ":"))
+    return str(valeur).translate(_ECHAPPEMENTS_COPY)
+
+
+def ligne_copy(valeurs) -> str:
+    return "\t".join(valeur_copy(valeur) for valeur in valeurs) + "\n"
+
+
+def _entier(valeur) -> Optional[int]:
+    try:
+        return int(valeur)
+    except (TypeError, ValueError):
+        return None
+
+
+def _reel(valeur) -> Optional[float]:
+    try:
+        return float(valeur)
+    except (TypeError, ValueError):
+        return None
+
+
+def lignes_rapport(chemin: str, application: str, mtime: float, rapport: Dict) -> Tuple[str, List[str]]:
+    """Ligne COPY de l'exécution et lignes COPY de ses étapes"""
+    briques = rapport.get("briques") or []
+    execution = ligne_copy((
+        chemin,
+        application,
+        rapport.get("identifiant"),
+        rapport.get("scenario") or Path(chemin).parents[2].name,
+        rapport.get("date") or datetime.fromtimestamp(mtime).isoformat(),
+        _reel(rapport.get("duree")),
+        _entier(rapport.get("status")),
+        rapport.get("commentaire"),
+        rapport.get("injecteur"),
+        rapport.get("navigateur"),
+        _entier(rapport.get("nb_scene", len(briques))),
+        mtime,
+    ))
+    etapes = []
+    for brique in briques:
+        sections = {cle: valeur for cle, valeur in brique.items() if cle not in CHAMPS_BASE_BRIQUE}
+        etapes.append(ligne_copy((
+            chemin,
+            _entier(brique.get("ordre")),
+            brique.get("nom", ""),
+            # Colonnes non texte : une valeur vide est NULL
+            brique.get("date") or None,
+            _reel(brique.get("duree")),
+            _entier(brique.get("status")),
+            brique.get("url"),
+            brique.get("commentaire"),
+            sections or None,
+        )))
+    return execution, etapes
+
+
+# === PARCOURS INCRÉMENTAL ===
+
+
+def rapports_a_ingerer(racine: Path, marque: Optional[Tuple[float, str]]) -> List[Tuple[float, str, str]]:
+    """
+    Rapports postérieurs à la marque, triés par (mtime, chemin).
+
+    Returns:
+        list: (mtime, chemin, application)
+    """
+    limite = time.time() - DELAI_STABILITE
+    # Répertoires <date> antérieurs à la veille de la marque : rapports déjà ingérés
+    # (la veille reste parcourue pour une exécution commencée avant minuit)
+    jour_marque = (datetime.fromtimestamp(marque[0]) - timedelta(days=1)).date().isoformat() if marque else ""
+    candidats = []
+    for application in _sous_repertoires(racine):
+        for scenario in _sous_repertoires(application):
+            for jour in _sous_repertoires(scenario):
+                if jour.name < jour_marque:
+                    continue
+                for heure in _sous_repertoires(jour):
+                    try:
+                        mtime = os.stat(os.path.join(heure.path, NOM_RAPPORT)).st_mtime
+                    except OSError:
+                        continue
+                    chemin = os.path.join(heure.path, NOM_RAPPORT)
+                    if mtime > limite or (marque and (mtime, chemin) <= marque):
+                        continue
+                    candidats.append((mtime, chemin, application.name))
+    candidats.sort()
+    return candidats
+
+
+def _sous_repertoires(repertoire) -> Iterator[os.DirEntry]:
+    try:
+        with os.scandir(repertoire) as entrees:
+            yield from [entree for entree in entrees if entree.is_dir(follow_symlinks=False)]
+    except OSError as e:
+        LOGGER.warning("[rapports_a_ingerer] ⚠️ Répertoire illisible %s: %s", getattr(repertoire, "path", repertoire), e)
+
+
+def _lire(chemin: str) -> Optional[Dict]:
+    try:
+        with open(chemin, "rb") as fichier:
+            contenu = fichier.read()
+        return orjson.loads(contenu) if orjson is not None else json.loads(contenu)
+    except (OSError, ValueError) as e:
+        LOGGER.warning("[entrepot] ⚠️ Rapport illisible ignoré %s: %s", chemin, e)
+        return None
+
+
+# === INGESTION ===
+
+
+class EntrepotResultats:
+    """Chargement des rapports dans l'entrepôt (connexion psycopg2)"""
+
+    def __init__(self, connexion):
+        self.connexion = connexion
+
+    def creer_schema(self) -> None:
+        with self.connexion, self.connexion.cursor() as curseur:
+            curseur.execute(SCHEMA)
+
+    def marque(self, racine: str) -> Optional[Tuple[float, str]]:
+        with self.connexion, self.connexion.cursor() as curseur:
+            curseur.execute("SELECT mtime, chemin FROM ingestion_marques WHERE racine = %s", (racine,))
+            ligne = curseur.fetchone()
+        return (ligne[0], ligne[1]) if ligne else None
+
+    def _charger_lot(
+        self,
+        racine: str,
+        lot: List[Tuple[float, str, str]],
+        rapports: List[Optional[Dict]],
+        marque_bloquee: bool = False,
+    ) -> Tuple[int, bool]:
+        """
+        Charge un lot ; la marque avance jusqu'au dernier rapport qui précède le
+        premier rapport illisible (de ce lot ou d'un lot précédent).
+
+        Returns:
+            tuple: (étapes insérées, marque bloquée par un rapport illisible)
+        """
+        executions = io.StringIO()
+        etapes = io.StringIO()
+        nouvelle_marque = None
+        for (mtime, chemin, application), rapport in zip(lot, rapports):
+            if rapport is None:
+                marque_bloquee = True
+                continue
+            ligne_execution, lignes_etapes = lignes_rapport(chemin, application, mtime, rapport)
+            executions.write(ligne_execution)
+            etapes.writelines(lignes_etapes)
+            if not marque_bloquee:
+                nouvelle_marque = (mtime, chemin)
+        executions.seek(0)
+        etapes.seek(0)
+
+        with self.connexion, self.connexion.cursor() as curseur:
+            curseur.execute(TABLES_TEMPORAIRES)
+            curseur.copy_expert(f"COPY tmp_executions ({', '.join(CHAMPS_EXECUTION)}) FROM STDIN", executions)
+            curseur.copy_expert(f"COPY tmp_etapes ({', '.join(CHAMPS_ETAPE)}) FROM STDIN", etapes)
+            curseur.execute(INSERTION_LOT)
+            nb_etapes = curseur.rowcount
+            if nouvelle_marque is not None:
+                curseur.execute(MAJ_MARQUE, (racine, *nouvelle_marque))
+        return nb_etapes, marque_bloquee
+
+    def ingerer(self, racine: Path, taille_lot: int = TAILLE_LOT, depuis_zero: bool = False) -> Dict:
+        """
+        Ingère les rapports de racine postérieurs à la marque.
+
+        Returns:
+            dict: rapports lus, étapes insérées, durée et débit (rapports/s)
+        """
+        debut = time.perf_counter()
+        cle = str(racine.resolve())
+        marque = None if depuis_zero else self.marque(cle)
+        candidats = rapports_a_ingerer(racine.resolve(), marque)
+        LOGGER.info("[EntrepotResultats] %d rapport(s) à ingérer depuis %s", len(candidats), marque)
+
+        nb_etapes = 0
+        nb_illisibles = 0
+        marque_bloquee = False
+        with ThreadPoolExecutor(max_workers=LECTEURS) as lecteurs:
+            for indice in range(0, len(candidats), taille_lot):
+                lot = candidats[indice:indice + taille_lot]
+                rapports = list(lecteurs.map(_lire, (chemin for _, chemin, _ in lot)))
+                nb_illisibles += rapports.count(None)
+                etapes_lot, marque_bloquee = self._charger_lot(cle, lot, rapports, marque_bloquee)
+                nb_etapes += etapes_lot
+
+        if nb_illisibles:
+            LOGGER.warning(
+                "[EntrepotResultats] ⚠️ %d rapport(s) illisible(s) : marque arrêtée avant le premier", nb_illisibles
+            )
+        duree = time.perf_counter() - debut
+        return {
+            "rapports": len(candidats),
+            "illisibles": nb_illisibles,
+            "etapes": nb_etapes,
+            "duree": round(duree, 3),
+            "rapports_par_seconde": round(len(candidats) / duree, 1) if duree else 0,
+        }
+
+
+def main():
+    """Point d'entrée de l'ingestion"""
+    parser = argparse.ArgumentParser(description="Ingestion des rapports d'exécution dans PostgreSQL")
+    parser.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    parser.add_argument("--database", default=os.environ.get("PGDATABASE", "resultats"))
+    parser.add_argument("--user", default=os.environ.get("PGUSER", "simulateur"))
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD"))
+    parser.add_argument(
+        "--racine",
+        default=os.path.join(os.environ.get("SIMU_OUTPUT", "/tmp"), "rapports"),
+        help="Répertoire des rapports (défaut $SIMU_OUTPUT/rapports)",
+    )
+    parser.add_argument("--lot", type=int, default=TAILLE_LOT, help="Rapports par transaction")
+    parser.add_argument("--depuis-zero", action="store_true", help="Ignore la marque d'ingestion")
+    parser.add_argument("--schema-seulement", action="store_true", help="Crée les tables et index puis s'arrête")
+    args = parser.parse_args()
+
+    from postgresql import connect_db
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    racine = Path(args.racine)
+    if not racine.is_dir() and not args.schema_seulement:
+        print(f"Répertoire introuvable: {racine}")
+        sys.exit(1)
+
+    connexion = connect_db(args.host, args.database, args.user, args.password)
+    try:
+        entrepot = EntrepotResultats(connexion)
+        entrepot.creer_schema()
+        if args.schema_seulement:
+            print("✅ Schéma créé")
+            return
+        resultat = entrepot.ingerer(racine, args.lot, args.depuis_zero)
+        print(
+            f"✅ {resultat['rapports']} rapport(s), {resultat['etapes']} étape(s) en {resultat['duree']}s "
+            f"({resultat['rapports_par_seconde']} rapports/s)"
+        )
+    finally:
+        connexion.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,14 +7,19 @@ Cette classe se concentre sur l’exécution des tests et la finalisation.
 “””
 
 import os
-import json
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional
 import pytest
 
-from src.utils.utils import contexte_actuel
 from src.utils.api import inscrire_resultats_api
+from enregistrements import EnregistrementEtape, encoder_etape
+from journal_execution import ouvrir_journal
+from progression import ouvrir_flux_progression
+from historique import enregistrer_execution
+from regressions import DetecteurRegressions, creer_detecteur
+from encodage_rapport import construire_rapport, ecrire_json, encoder_json
+from traces import demarrer_traces, fermer_span, ouvrir_span, terminer_traces, tracer
 from .initialisation import initialiser_scenario
 
 LOGGER = logging.getLogger(**name**)
@@ -28,12 +33,12 @@ L'initialisation est déléguée au module d'initialisation.
 Cette classe se concentre sur l'exécution des tests et la finalisation.
 """
 
+@tracer()
 def __init__(self) -> None:
     """
     Initialise l'execution en utilisant le module d'initialisation.
     """
-    methode_name = contexte_actuel(self)
-    LOGGER.debug("[%s] ---- DEBUT ----", methode_name)
+    methode_name = "Execution.__init__"
     
     # Date de début
     self.date = datetime.now()
@@ -42,6 +47,8 @@ def __init__(self) -> None:
     # Le module d'initialisation gère toute la logique de démarrage
     # et les erreurs avec inscription API appropriée
     self.config, self.donnees_scenario_api = initialiser_scenario()
+    # Traces par spans (config traces), déjà actives si SIMULATEUR_TRACES est défini
+    demarrer_traces(self.config)
     
     # === ATTRIBUTS D'EXÉCUTION ===
     self.duree = 0
@@ -57,9 +64,26 @@ def __init__(self) -> None:
     # Statuts initiaux
     self.status_initial = 3
     
-    # Liste des étapes d'exécution
-    self.etapes: List[Dict] = []
+    # Étapes d'exécution : journalisées dans report_dir/journal.ndjson au fil de l'eau,
+    # conservées en mémoire seulement sans journal (pas de report_dir ou écriture impossible)
+    self.etapes: List[EnregistrementEtape] = []
+    self.nb_etapes = 0
+    self.duree_etapes = 0.0
+    self.derniere_etape: Optional[EnregistrementEtape] = None
     self.compteur_etape = 0
+    entete = {
+        "identifiant": self.config.get("identifiant", ""),
+        "scenario": self.config.get("nom_scenario", ""),
+        "date": self.date.isoformat(),
+        "injecteur": self.injecteur,
+        "navigateur": self.navigateur,
+        "interface_ip": self.interface_ip,
+    }
+    self.journal = ouvrir_journal(self.config, entete)
+    # Progression en direct vers ISAC (config progression_url)
+    self.progression = ouvrir_flux_progression(self.config, entete)
+    # Références de durées des étapes (historique local) pour détecter les régressions
+    self.regressions = creer_detecteur(self.config)
     
     # URL initiale pour les rapports
     self.url_initiale_header = ""
@@ -68,7 +92,6 @@ def __init__(self) -> None:
     self.elts_flous = []
     
     LOGGER.info("[%s] ✅ Execution initialisée et prête pour les tests", methode_name)
-    LOGGER.debug("[%s] ----  FIN  ----", methode_name)
 
 def __str__(self) -> str:
     """Représentation textuelle de l'exécution"""
@@ -82,76 +105,99 @@ status: {self.status}
 commentaire: {self.commentaire}
 injecteur: {self.injecteur}
 navigateur: {self.navigateur}
-etapes: {len(self.etapes)} étape(s)
+etapes: {self.nb_etapes} étape(s)
 scenario: {self.config.get(‘nom_scenario’, ‘N/A’)}
 “””
 
 ```
-def ajoute_etape(self, etape: Dict) -> None:
+@tracer()
+def ajoute_etape(self, etape: EnregistrementEtape) -> None:
     """Ajoute une étape à la liste des étapes."""
-    methode_name = contexte_actuel(self)
-    LOGGER.debug("[%s] ---- DEBUT ----", methode_name)
+    methode_name = "Execution.ajoute_etape"
     
-    self.etapes.append(etape)
+    if self.regressions is not None:
+        self.regressions.verifier(etape)
+
+    self.nb_etapes += 1
+    self.duree_etapes += etape.duree
+    self.derniere_etape = etape
+
+    if self.journal is not None:
+        try:
+            self.journal.ajouter_etape(encoder_etape(etape))
+            etape = None
+        except (OSError, ValueError) as e:
+            LOGGER.warning("[%s] ⚠️ Écriture du journal impossible, étape gardée en mémoire: %s", methode_name, e)
+    if etape is not None:
+        self.etapes.append(etape)
+    if self.progression is not None:
+        self.progression.fin_etape(self.derniere_etape)
     
-    LOGGER.debug("[%s] Étape ajoutée: %s", methode_name, etape.get("nom", "N/A"))
-    LOGGER.debug("[%s] Total étapes: %d", methode_name, len(self.etapes))
-    LOGGER.debug("[%s] ----  FIN  ----", methode_name)
+    LOGGER.debug("[%s] Étape ajoutée: %s", methode_name, self.derniere_etape.nom)
+    LOGGER.debug("[%s] Total étapes: %d", methode_name, self.nb_etapes)
 
+@tracer()
 def finalise(self):
     """Finalise le scénario, calcule la durée totale et agrège les statuts."""
-    methode_name = contexte_actuel(self)
-    LOGGER.debug("[%s] ---- DEBUT ----", methode_name)
+    methode_name = "Execution.finalise"
 
     # Calcul de la durée totale
-    if self.etapes:
-        self.duree = sum([float(etape["duree"]) for etape in self.etapes])
+    if self.derniere_etape is not None:
+        self.duree = round(self.duree_etapes, 3)
         
         # Le statut final est celui de la dernière étape
-        derniere_etape = self.etapes[-1]
-        self.status = derniere_etape["status"]
-        self.commentaire = derniere_etape["commentaire"]
+        self.status = int(self.derniere_etape.status)
+        self.commentaire = self.derniere_etape.commentaire
         
-        # Statuts initiaux = finaux (pour compatibilité)
-        self.status_initial = self.status
-        self.commentaire_initial = self.commentaire
+        # Statuts initiaux = statut fonctionnel, avant escalade des régressions de durée
+        # (la dernière étape a déjà pu passer en AVERTISSEMENT en escalade "etape")
+        self.status_initial, self.commentaire_initial = DetecteurRegressions.statut_initial(self.derniere_etape)
+        if self.regressions is not None:
+            self.status, self.commentaire = self.regressions.escalader(self.status, self.commentaire)
         
         LOGGER.info("[%s] Finalisation: %d étapes, statut=%s, durée=%.3fs", 
-                   methode_name, len(self.etapes), self.status, self.duree)
+                   methode_name, self.nb_etapes, self.status, self.duree)
     else:
         LOGGER.warning("[%s] Aucune étape exécutée", methode_name)
-        
-    LOGGER.debug("[%s] ----  FIN  ----", methode_name)
 
-def save_to_json(self, filepath: str) -> dict:
-    """Enregistre le scénario sous forme de fichier JSON."""
-    methode_name = contexte_actuel(self)
-    LOGGER.debug("[%s] ---- DEBUT ----", methode_name)
+def briques(self) -> List[Dict]:
+    """Étapes au format JSON des rapports (relues depuis le journal)"""
+    briques = self.journal.briques() if self.journal is not None else []
+    briques.extend(encoder_etape(etape) for etape in self.etapes)
+    return briques
+
+def terminer_journal(self) -> None:
+    """Marque le journal comme finalisé (l'exécution ne sera pas récupérée comme orpheline)"""
+    if self.journal is not None:
+        try:
+            self.journal.terminer(self.status)
+        except OSError as e:
+            LOGGER.warning("[Execution.terminer_journal] ⚠️ Fin du journal non écrite: %s", e)
+
+def arreter_progression(self) -> None:
+    """Envoie la fin de l'exécution au flux de progression et l'arrête"""
+    if self.progression is not None:
+        self.progression.arreter(self.status)
+        self.progression = None
+
+def rapport(self) -> dict:
+    """Rapport de l'exécution (construit une fois par appel)"""
+    return construire_rapport(self)
+
+@tracer()
+def save_to_json(self, filepath: str, data: Optional[dict] = None) -> dict:
+    """Enregistre le scénario sous forme de fichier JSON (compact sauf config rapport_indente)."""
+    methode_name = "Execution.save_to_json"
     
-    data = {
-        "identifiant": self.config.get("identifiant", ""),
-        "scenario": self.config.get("nom_scenario", ""),
-        "date": self.date.isoformat(),
-        "duree": self.duree,
-        "status": self.status,
-        "nb_scene": len(self.etapes),
-        "commentaire": self.commentaire,
-        "injecteur": self.injecteur,
-        "navigateur": self.navigateur,
-        "interface_ip": self.interface_ip,
-        "status_initial": self.status_initial,
-        "commentaire_initial": self.commentaire_initial,
-        "briques": self.etapes,
-    }
+    if data is None:
+        data = self.rapport()
     
     try:
-        with open(filepath, "w", encoding="utf-8") as file:
-            json.dump(data, file, ensure_ascii=False, indent=4)
+        ecrire_json(filepath, data, indente=self.config.get("rapport_indente", False))
         LOGGER.info("[%s] Rapport JSON sauvegardé: %s", methode_name, filepath)
     except Exception as e:
         LOGGER.error("[%s] Erreur sauvegarde JSON: %s", methode_name, e)
 
-    LOGGER.debug("[%s] ----  FIN  ----", methode_name)
     return data
 ```
 
@@ -166,45 +212,34 @@ Crée un scénario unique pour tous les tests et le finalise à la fin.
 L'initialisation est gérée automatiquement par le module d'initialisation
 avec gestion des erreurs et inscription API appropriée.
 """
-fixture_name = contexte_actuel()
-LOGGER.debug("[Fixture SETUP %s] ----  DEBUT  ----", fixture_name)
+fixture_name = "execution"
+# Traces dès le démarrage si SIMULATEUR_TRACES est défini (initialisation comprise)
+demarrer_traces()
 
 # Création de l'exécution (initialisation automatique via le module)
 execution_scenario = Execution()
-
-LOGGER.debug("[Fixture SETUP %s] ----   FIN   ----", fixture_name)
+span_tests = ouvrir_span("Fixture execution.tests")
 
 # Retourne l'instance d'exécution pour tous les tests
 yield execution_scenario
 
 # === FINALISATION AUTOMATIQUE ===
-LOGGER.debug("[Fixture FINAL %s] ----  DEBUT  ----", fixture_name)
+fermer_span(span_tests)
+span_finalisation = ouvrir_span("Fixture execution.finalisation")
 
 try:
     # Finalise le scénario après tous les tests
     execution_scenario.finalise()
 
-    # Génération du rapport JSON
+    # Rapport construit une seule fois (fichier, inscription et log)
+    json_execution = execution_scenario.rapport()
+    nom_rapport_json = None
     if execution_scenario.config.get("report_dir"):
         nom_rapport_json = f"{execution_scenario.config.get('report_dir')}/scenario.json"
-        json_execution = execution_scenario.save_to_json(nom_rapport_json)
-    else:
-        # Pas de répertoire de rapport - créer quand même les données
-        json_execution = {
-            "identifiant": execution_scenario.config.get("identifiant", ""),
-            "scenario": execution_scenario.config.get("nom_scenario", ""),
-            "date": execution_scenario.date.isoformat(),
-            "duree": execution_scenario.duree,
-            "status": execution_scenario.status,
-            "nb_scene": len(execution_scenario.etapes),
-            "commentaire": execution_scenario.commentaire,
-            "injecteur": execution_scenario.injecteur,
-            "navigateur": execution_scenario.navigateur,
-            "interface_ip": execution_scenario.interface_ip,
-            "status_initial": execution_scenario.status_initial,
-            "commentaire_initial": execution_scenario.commentaire_initial,
-            "briques": execution_scenario.etapes,
-        }
+        execution_scenario.save_to_json(nom_rapport_json, json_execution)
+
+    # Historique local des durées (output_path/historique.sqlite)
+    enregistrer_execution(execution_scenario.config, json_execution, nom_rapport_json)
 
     # Inscription des résultats
     if execution_scenario.config.get("inscription"):
@@ -221,10 +256,21 @@ try:
             execution_scenario.config.get("inscription"),
         )
         LOGGER.info(
-            "[Fixture FINAL %s] json scénario => \n%s",
+            "[Fixture FINAL %s] Scénario %s : status=%s, %d étape(s), durée=%.3fs",
             fixture_name,
-            json.dumps(json_execution, ensure_ascii=False, indent=4),
+            json_execution["scenario"],
+            json_execution["status"],
+            json_execution["nb_scene"],
+            json_execution["duree"],
         )
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(
+                "[Fixture FINAL %s] json scénario => %s",
+                fixture_name,
+                encoder_json(json_execution).decode("utf-8"),
+            )
+
+    execution_scenario.terminer_journal()
 
 except Exception as e:
     LOGGER.error("[Fixture FINAL %s] Erreur lors de la finalisation: %s", fixture_name, e)
@@ -232,21 +278,9 @@ except Exception as e:
     # Même en cas d'erreur de finalisation, essayer d'inscrire un résultat d'erreur
     try:
         if execution_scenario.config.get("inscription"):
-            json_erreur = {
-                "identifiant": execution_scenario.config.get("identifiant", ""),
-                "scenario": execution_scenario.config.get("nom_scenario", ""),
-                "date": execution_scenario.date.isoformat(),
-                "duree": execution_scenario.duree,
-                "status": 2,  # Erreur
-                "nb_scene": len(execution_scenario.etapes),
-                "commentaire": f"Erreur lors de la finalisation: {e}",
-                "injecteur": execution_scenario.injecteur,
-                "navigateur": execution_scenario.navigateur,
-                "interface_ip": execution_scenario.interface_ip,
-                "status_initial": 2,
-                "commentaire_initial": f"Erreur lors de la finalisation: {e}",
-                "briques": execution_scenario.etapes,
-            }
+            json_erreur = construire_rapport(
+                execution_scenario, status=2, commentaire=f"Erreur lors de la finalisation: {e}"
+            )
             
             inscrire_resultats_api(
                 execution_scenario.config.get("url_base_api_injecteur"),
@@ -256,5 +290,12 @@ except Exception as e:
     except:
         LOGGER.error("[Fixture FINAL %s] Échec inscription erreur de finalisation", fixture_name)
 
-LOGGER.debug("[Fixture FINAL %s] ----   FIN   ----", fixture_name)
+    # Journal terminé même sans inscription : l'exécution n'est pas une orpheline à récupérer
+    execution_scenario.terminer_journal()
+
+execution_scenario.arreter_progression()
+
+fermer_span(span_finalisation)
+# Trace de l'exécution (report_dir/trace.json)
+terminer_traces(execution_scenario.config.get("report_dir"))
 ```
\ No newline at end of file
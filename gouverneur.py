@@ -0,0 +1,133 @@
+"""
+gouverneur.py
+
+Régulation du nombre de scénarios exécutés simultanément selon la charge de l'hôte.
+
+Une surcharge de l'injecteur ralentit les navigateurs et produit des timeouts
+remontés à tort comme des erreurs applicatives. Le gouverneur lit périodiquement
+le dernier relevé de l'échantillonneur de ressources (utilisation CPU, mémoire
+disponible et RSS des navigateurs) puis ajuste la limite de concurrence :
+- surcharge : réduction multiplicative (limite * 0.75, au moins le minimum)
+- hôte disponible : augmentation d'une unité (au plus le maximum)
+
+La charge de l'injecteur pendant chaque étape est enregistrée par
+l'échantillonneur (`ressources`, voir echantillonneur.py).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, Optional
+
+from echantillonneur import Echantillonneur
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAUT_PERIODE = 2.0
+DEFAUT_CPU_HAUT = 0.85
+DEFAUT_CPU_BAS = 0.60
+DEFAUT_MEMOIRE_MIN_MO = 1024
+FACTEUR_REDUCTION = 0.75
+
+
+# === GOUVERNEUR ===
+
+
+class GouverneurConcurrence:
+    """
+    Limite de concurrence ajustée selon la charge de l'hôte (à utiliser dans une boucle asyncio).
+
+    Args:
+        minimum / maximum: bornes de la limite
+        initial: limite de départ (défaut : nombre de processeurs, borné)
+        cpu_haut / cpu_bas: seuils d'utilisation CPU de réduction / d'augmentation
+        memoire_min_mo: mémoire disponible minimale
+        rss_max_mo: RSS maximale des navigateurs (None = pas de limite)
+        periode: intervalle entre deux ajustements (secondes)
+    """
+
+    def __init__(
+        self,
+        minimum: int = 1,
+        maximum: int = 30,
+        initial: Optional[int] = None,
+        cpu_haut: float = DEFAUT_CPU_HAUT,
+        cpu_bas: float = DEFAUT_CPU_BAS,
+        memoire_min_mo: float = DEFAUT_MEMOIRE_MIN_MO,
+        rss_max_mo: Optional[float] = None,
+        periode: float = DEFAUT_PERIODE,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limite = min(self.maximum, max(self.minimum, initial or os.cpu_count() or 1))
+        self.cpu_haut = cpu_haut
+        self.cpu_bas = cpu_bas
+        self.memoire_min_mo = memoire_min_mo
+        self.rss_max_mo = rss_max_mo
+        self.periode = periode
+        self.actifs = 0
+        self.dernier_releve: Dict[str, float] = {}
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _surcharge(self, releve: Dict[str, float]) -> Optional[str]:
+        if releve["cpu"] >= self.cpu_haut:
+            return f"CPU {releve['cpu']:.0%}"
+        if releve["memoire_disponible_mo"] < self.memoire_min_mo:
+            return f"mémoire disponible {releve['memoire_disponible_mo']:.0f} Mo"
+        if self.rss_max_mo is not None and releve["rss_navigateurs_mo"] > self.rss_max_mo:
+            return f"RSS navigateurs {releve['rss_navigateurs_mo']:.0f} Mo"
+        return None
+
+    def ajuster(self, releve: Dict[str, float]) -> int:
+        """Nouvelle limite d'après un relevé de charge"""
+        self.dernier_releve = releve
+        limite_precedente = self.limite
+        raison = self._surcharge(releve)
+        if raison is not None:
+            self.limite = max(self.minimum, int(self.limite * FACTEUR_REDUCTION))
+        elif releve["cpu"] < self.cpu_bas and self.actifs >= self.limite:
+            # N'augmente que si la limite actuelle est effectivement atteinte
+            self.limite = min(self.maximum, self.limite + 1)
+
+        if self.limite != limite_precedente:
+            LOGGER.info(
+                "[GouverneurConcurrence] Limite %d -> %d (%s)",
+                limite_precedente, self.limite, raison or f"CPU {releve['cpu']:.0%}",
+            )
+        return self.limite
+
+    def _condition_boucle(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquerir(self) -> None:
+        condition = self._condition_boucle()
+        async with condition:
+            await condition.wait_for(lambda: self.actifs < self.limite)
+            self.actifs += 1
+
+    async def liberer(self) -> None:
+        condition = self._condition_boucle()
+        async with condition:
+            self.actifs -= 1
+            condition.notify_all()
+
+    async def __aenter__(self):
+        await self.acquerir()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.liberer()
+
+    async def surveiller(self, echantillonneur: Echantillonneur) -> None:
+        """Boucle d'ajustement sur les relevés de l'échantillonneur (tâche annulée en fin d'exécution)"""
+        condition = self._condition_boucle()
+        while True:
+            await asyncio.sleep(self.periode)
+            releve = echantillonneur.dernier_releve()
+            if not releve:
+                continue
+            self.ajuster(releve)
+            async with condition:
+                condition.notify_all()
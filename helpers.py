@@ -184,6 +184,7 @@ table.add_row("INSCRIPTION", "false", "Désactive l'enregistrement dans l'API")
 table.add_row("NAVIGATEUR", "firefox", "Type de navigateur (firefox, chromium)")
 table.add_row("HEADLESS", "true", "Mode headless (true/false)")
 table.add_row("URL_API", "http://...", "URL de l'API (si LECTURE=true)")
+table.add_row("UTILISATEUR_ISAC", "utilisateur_1", "Fichier de config/utilisateurs (prioritaire sur la config scénario)")
 
 console.print(table)
 console.print()
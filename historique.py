@@ -0,0 +1,299 @@
+"""
+historique.py
+
+Historique local des durées d'étapes (base SQLite de l'injecteur : output_path/historique.sqlite).
+
+Chaque exécution finalisée y inscrit ses étapes (durée en ms, statut, instant).
+Les requêtes donnent, par scénario et par étape, les percentiles des durées
+sur une fenêtre glissante ("24h", "7j"...). Les scenario.json existants sous
+rapports/ peuvent être importés (`importer_rapports`, un rapport n'est importé
+qu'une fois).
+
+La table references_durees garde, par étape, la médiane et la MAD des
+dernières durées sans erreur, recalculées à chaque inscription : la
+détection des régressions (regressions.py) n'a qu'une lecture à faire.
+
+Base en mode WAL : plusieurs scénarios peuvent écrire en même temps, les
+requêtes ne bloquent pas les écritures.
+
+Configuration (config scénario) :
+- historique_durees : inscription des exécutions (défaut True, nécessite output_path)
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from timeouts_adaptatifs import percentile
+
+LOGGER = logging.getLogger(__name__)
+
+NOM_BASE = "historique.sqlite"
+PERCENTILES = (50, 95, 99)
+DEFAUT_FENETRE = "7j"
+# Nombre de dernières durées d'une étape servant à sa référence (médiane / MAD)
+TAILLE_REFERENCE = 100
+ATTENTE_VERROU_MS = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY,
+    identifiant TEXT,
+    scenario TEXT NOT NULL,
+    instant REAL NOT NULL,
+    duree_ms REAL,
+    status INTEGER,
+    chemin TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS etapes (
+    execution_id INTEGER NOT NULL REFERENCES executions(id),
+    scenario TEXT NOT NULL,
+    etape TEXT NOT NULL,
+    ordre INTEGER,
+    instant REAL NOT NULL,
+    duree_ms REAL NOT NULL,
+    status INTEGER
+);
+CREATE TABLE IF NOT EXISTS references_durees (
+    scenario TEXT NOT NULL,
+    etape TEXT NOT NULL,
+    mediane_ms REAL NOT NULL,
+    mad_ms REAL NOT NULL,
+    nombre INTEGER NOT NULL,
+    maj REAL NOT NULL,
+    PRIMARY KEY (scenario, etape)
+);
+CREATE INDEX IF NOT EXISTS idx_executions_scenario_instant ON executions (scenario, instant);
+CREATE INDEX IF NOT EXISTS idx_etapes_scenario_etape_instant ON etapes (scenario, etape, instant);
+"""
+
+_UNITES_FENETRE = {"m": "minutes", "h": "hours", "j": "days", "d": "days", "s": "weeks"}
+
+
+def parser_fenetre(fenetre: str) -> timedelta:
+    """Fenêtre glissante : nombre + unité (m minutes, h heures, j jours, s semaines)"""
+    correspondance = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([mhjds])\s*", fenetre.lower())
+    if not correspondance:
+        raise ValueError(f"Fenêtre invalide: {fenetre} (exemples : 30m, 24h, 7j, 4s)")
+    return timedelta(**{_UNITES_FENETRE[correspondance.group(2)]: float(correspondance.group(1))})
+
+
+def _instant(date: str) -> float:
+    """Date ISO d'un rapport en timestamp (maintenant si absente ou illisible)"""
+    try:
+        return datetime.fromisoformat(date).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+def _ordre(valeur) -> Optional[int]:
+    try:
+        return int(valeur)
+    except (TypeError, ValueError):
+        return None
+
+
+class HistoriqueDurees:
+    """Base SQLite des durées d'étapes"""
+
+    def __init__(self, chemin: str):
+        self.chemin = Path(chemin)
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self.connexion = sqlite3.connect(str(self.chemin), timeout=ATTENTE_VERROU_MS / 1000)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("PRAGMA synchronous=NORMAL")
+        self.connexion.executescript(SCHEMA)
+
+    def fermer(self) -> None:
+        self.connexion.close()
+
+    def __enter__(self) -> "HistoriqueDurees":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fermer()
+
+    # === ÉCRITURE ===
+
+    def _inserer(self, rapport: Dict, chemin: Optional[str]) -> bool:
+        instant = _instant(rapport.get("date"))
+        curseur = self.connexion.execute(
+            "INSERT OR IGNORE INTO executions (identifiant, scenario, instant, duree_ms, status, chemin) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                str(rapport.get("identifiant", "")),
+                rapport.get("scenario", ""),
+                instant,
+                float(rapport.get("duree") or 0) * 1000,
+                rapport.get("status"),
+                chemin,
+            ),
+        )
+        if not curseur.rowcount:
+            return False
+        execution_id = curseur.lastrowid
+        self.connexion.executemany(
+            "INSERT INTO etapes (execution_id, scenario, etape, ordre, instant, duree_ms, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    execution_id,
+                    rapport.get("scenario", ""),
+                    brique.get("nom", ""),
+                    _ordre(brique.get("ordre")),
+                    _instant(brique.get("date")) if brique.get("date") else instant,
+                    float(brique.get("duree") or 0) * 1000,
+                    brique.get("status"),
+                )
+                for brique in rapport.get("briques", [])
+            ],
+        )
+        return True
+
+    def inscrire_execution(self, rapport: Dict, chemin: Optional[str] = None) -> bool:
+        """
+        Inscrit une exécution (rapport au format scenario.json).
+
+        Returns:
+            bool: False si le rapport (même chemin) était déjà inscrit
+        """
+        with self.connexion:
+            return self._inserer(rapport, chemin)
+
+    def importer_rapports(self, racine: Path) -> int:
+        """Importe les scenario.json de racine qui ne sont pas encore dans la base"""
+        connus = {ligne[0] for ligne in self.connexion.execute("SELECT chemin FROM executions WHERE chemin IS NOT NULL")}
+        importes = 0
+        etapes_importees: Dict[str, set] = {}
+        with self.connexion:
+            for fichier in racine.rglob("scenario.json"):
+                chemin = str(fichier.resolve())
+                if chemin in connus:
+                    continue
+                try:
+                    rapport = json.loads(fichier.read_bytes())
+                except (OSError, ValueError) as e:
+                    LOGGER.warning("[HistoriqueDurees] ⚠️ Rapport illisible ignoré %s: %s", fichier, e)
+                    continue
+                if self._inserer(rapport, chemin):
+                    importes += 1
+                    etapes_importees.setdefault(rapport.get("scenario", ""), set()).update(
+                        brique.get("nom", "") for brique in rapport.get("briques", [])
+                    )
+        for scenario, etapes in etapes_importees.items():
+            self.mettre_a_jour_references(scenario, etapes)
+        return importes
+
+    def mettre_a_jour_references(self, scenario: str, etapes: Iterable[str], taille: int = TAILLE_REFERENCE) -> None:
+        """Recalcule la référence des étapes : médiane et MAD des `taille` dernières durées sans erreur"""
+        maintenant = time.time()
+        references = []
+        for etape in set(etapes):
+            durees = self.durees(scenario, etape, taille, succes_seulement=True)
+            if not durees:
+                continue
+            mediane = statistics.median(durees)
+            mad = statistics.median(abs(duree - mediane) for duree in durees)
+            references.append((scenario, etape, mediane, mad, len(durees), maintenant))
+        with self.connexion:
+            self.connexion.executemany(
+                "INSERT OR REPLACE INTO references_durees (scenario, etape, mediane_ms, mad_ms, nombre, maj) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                references,
+            )
+
+    # === REQUÊTES ===
+
+    def references(self, scenario: str) -> Dict[str, Tuple[float, float, int]]:
+        """Références des étapes d'un scénario : {étape: (médiane ms, MAD ms, nombre)}"""
+        return {
+            etape: (mediane, mad, nombre)
+            for etape, mediane, mad, nombre in self.connexion.execute(
+                "SELECT etape, mediane_ms, mad_ms, nombre FROM references_durees WHERE scenario = ?", (scenario,)
+            )
+        }
+
+
+    def scenarios(self) -> List[Tuple[str, int, float]]:
+        """(scénario, nombre d'exécutions, instant de la dernière) par scénario"""
+        return self.connexion.execute(
+            "SELECT scenario, COUNT(*), MAX(instant) FROM executions GROUP BY scenario ORDER BY scenario"
+        ).fetchall()
+
+    def durees(self, scenario: str, etape: str, limite: int, succes_seulement: bool = False) -> List[float]:
+        """Dernières durées (ms) d'une étape, de la plus récente à la plus ancienne"""
+        filtre = " AND status IN (0, 1)" if succes_seulement else ""
+        return [
+            ligne[0]
+            for ligne in self.connexion.execute(
+                f"SELECT duree_ms FROM etapes WHERE scenario = ? AND etape = ?{filtre} ORDER BY instant DESC LIMIT ?",
+                (scenario, etape, limite),
+            )
+        ]
+
+    def percentiles(
+        self,
+        scenario: str,
+        fenetre: Optional[timedelta] = None,
+        etape: Optional[str] = None,
+        rangs: Sequence[int] = PERCENTILES,
+    ) -> Dict[str, Dict]:
+        """
+        Percentiles des durées (ms) par étape sur la fenêtre glissante.
+
+        Returns:
+            dict: {étape: {"nombre", "erreurs", "p50", "p95", "p99", "max"}}
+        """
+        fenetre = fenetre or parser_fenetre(DEFAUT_FENETRE)
+        requete = "SELECT etape, duree_ms, status FROM etapes WHERE scenario = ? AND instant >= ?"
+        parametres: list = [scenario, time.time() - fenetre.total_seconds()]
+        if etape is not None:
+            requete += " AND etape = ?"
+            parametres.append(etape)
+
+        durees_etapes: Dict[str, List[float]] = {}
+        erreurs_etapes: Dict[str, int] = {}
+        ordre_etapes: Dict[str, int] = {}
+        for nom, duree_ms, status in self.connexion.execute(requete + " ORDER BY instant", parametres):
+            durees_etapes.setdefault(nom, []).append(duree_ms)
+            ordre_etapes.setdefault(nom, len(ordre_etapes))
+            if status not in (0, 1):
+                erreurs_etapes[nom] = erreurs_etapes.get(nom, 0) + 1
+
+        return {
+            nom: {
+                "nombre": len(durees),
+                "erreurs": erreurs_etapes.get(nom, 0),
+                **{f"p{rang}": round(percentile(durees, rang), 1) for rang in rangs},
+                "max": round(max(durees), 1),
+            }
+            for nom, durees in sorted(durees_etapes.items(), key=lambda element: ordre_etapes[element[0]])
+        }
+
+
+def chemin_base(output_path: str) -> Path:
+    return Path(output_path) / NOM_BASE
+
+
+def enregistrer_execution(config: Dict, rapport: Dict, chemin_rapport: Optional[str] = None) -> None:
+    """
+    Inscrit une exécution finalisée dans l'historique local et met à jour les
+    références de ses étapes (erreurs journalisées, jamais levées).
+    """
+    if not config.get("historique_durees", True) or not config.get("output_path"):
+        return
+    try:
+        with HistoriqueDurees(chemin_base(config["output_path"])) as historique:
+            if historique.inscrire_execution(rapport, str(Path(chemin_rapport).resolve()) if chemin_rapport else None):
+                historique.mettre_a_jour_references(
+                    rapport.get("scenario", ""), (brique.get("nom", "") for brique in rapport.get("briques", []))
+                )
+    except (OSError, sqlite3.Error) as e:
+        LOGGER.warning("[enregistrer_execution] ⚠️ Historique des durées non mis à jour: %s", e)
+
@@ -9,16 +9,19 @@ import os
 import json
 import logging
 import pytest
+import yaml
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
-from src.utils.utils import contexte_actuel
 from src.utils.api import lecture_api_scenario, inscrire_resultats_api
 from src.utils.planning_execution import verifier_planning_execution
+from src.utils.decrypt import decryptage_utilisateur
 from .environnement import Environnement
 from .configuration import Configuration
 from src.utils.constantes import ConstantesSimulateur
+from preflight import message_erreur, verifier_disponibilite
+from traces import tracer
 
 LOGGER = logging.getLogger(**name**)
 
@@ -34,6 +37,14 @@ class ErreurPostAPI(ErreurInitialisation):
 “”“Erreurs après API - exit 2, inscription obligatoire avec status=3”””
 pass
 
+class ErreurDisponibilite(ErreurPostAPI):
+    """Application indisponible (preflight) - exit 2, inscription avec status=2 et erreur classifiée"""
+
+    def __init__(self, erreurs):
+        self.erreurs = erreurs
+        super().__init__(message_erreur(erreurs[0]))
+
+
 class InitialisateurScenario:
 “””
 Gestionnaire d’initialisation séquentiel pour les scénarios.
@@ -54,6 +65,7 @@ def __init__(self):
     self.api_chargee_avec_succes = False
     self.date_debut = datetime.now()
     
+@tracer()
 def initialiser(self) -> Tuple[Dict, Dict]:
     """
     Lance l'initialisation séquentielle complète.
@@ -64,14 +76,14 @@ def initialiser(self) -> Tuple[Dict, Dict]:
     Raises:
         SystemExit: Avec code 1 (pré-API) ou 2 (post-API)
     """
-    methode_name = contexte_actuel(self)
+    methode_name = "InitialisateurScenario.initialiser"
     LOGGER.info("[%s] ========== INITIALISATION SCÉNARIO ==========", methode_name)
     
     try:
         # === PHASES 1-4 : PRÉ-API (pas d'inscription en cas d'erreur) ===
         self._executer_phases_pre_api()
         
-        # === PHASES 5-6 : POST-API (inscription obligatoire en cas d'erreur) ===
+        # === PHASES 5-7 : POST-API (inscription obligatoire en cas d'erreur) ===
         self._executer_phases_post_api()
         
         LOGGER.info("[%s] ✅ Initialisation complète réussie", methode_name)
@@ -81,6 +93,10 @@ def initialiser(self) -> Tuple[Dict, Dict]:
         self._gerer_erreur_pre_api(e)
         pytest.exit(1)
         
+    except ErreurDisponibilite as e:
+        self._gerer_erreur_disponibilite(e)
+        pytest.exit(2)
+        
     except ErreurPostAPI as e:
         self._gerer_erreur_post_api(e)
         pytest.exit(2)
@@ -94,6 +110,7 @@ def initialiser(self) -> Tuple[Dict, Dict]:
             self._gerer_erreur_pre_api(ErreurPreAPI(f"Erreur inattendue: {e}"))
             pytest.exit(1)
 
+@tracer()
 def _executer_phases_pre_api(self):
     """Exécute les phases 1-4 sans inscription API possible"""
     self._phase_1_environnement()
@@ -101,17 +118,20 @@ def _executer_phases_pre_api(self):
     self._phase_3_api_lecture()
     self._phase_4_verification_planning()
     
+@tracer()
 def _executer_phases_post_api(self):
-    """Exécute les phases 5-6 avec inscription API obligatoire si erreur"""
+    """Exécute les phases 5-7 avec inscription API obligatoire si erreur"""
     self._phase_5_configuration_finale()
     self._phase_6_repertoires()
+    self._phase_7_verification_disponibilite()
 
 # === PHASES PRÉ-API ===
 
+@tracer()
 def _phase_1_environnement(self):
     """Phase 1: Chargement et validation de l'environnement"""
     self.phase_courante = "CHARGEMENT_ENVIRONNEMENT"
-    methode_name = contexte_actuel(self)
+    methode_name = "InitialisateurScenario._phase_1_environnement"
     LOGGER.info("[%s] === PHASE 1: ENVIRONNEMENT ===", methode_name)
 
     try:
@@ -122,25 +142,33 @@ def _phase_1_environnement(self):
     except Exception as e:
         raise ErreurPreAPI(f"Échec chargement environnement: {e}") from e
 
+@tracer()
 def _phase_2_configuration_base(self):
     """Phase 2: Chargement de la configuration de base (pour avoir l'identifiant)"""
     self.phase_courante = "CONFIGURATION_BASE"
-    methode_name = contexte_actuel(self)
+    methode_name = "InitialisateurScenario._phase_2_configuration_base"
     LOGGER.info("[%s] === PHASE 2: CONFIGURATION BASE ===", methode_name)
 
     try:
         config_manager = Configuration(environnement=self.environnement)
         self.config = config_manager.creer_configuration()
+
+        # Utilisateur ISAC imposé par l'environnement (prioritaire sur la config scénario)
+        utilisateur_isac = os.getenv("UTILISATEUR_ISAC")
+        if utilisateur_isac:
+            self.config.update(charger_utilisateur_isac(self.config, utilisateur_isac))
+            LOGGER.info("[%s] Utilisateur ISAC (env): %s", methode_name, utilisateur_isac)
         
         LOGGER.info("[%s] ✅ Configuration de base créée (identifiant disponible)", methode_name)
         
     except Exception as e:
         raise ErreurPreAPI(f"Échec création configuration de base: {e}") from e
 
+@tracer()
 def _phase_3_api_lecture(self):
     """Phase 3: Lecture des données API avec l'identifiant du scénario"""
     self.phase_courante = "LECTURE_API"
-    methode_name = contexte_actuel(self)
+    methode_name = "InitialisateurScenario._phase_3_api_lecture"
     LOGGER.info("[%s] === PHASE 3: API LECTURE ===", methode_name)
 
     if not self.environnement.get("lecture", True):
@@ -164,10 +192,11 @@ def _phase_3_api_lecture(self):
     except Exception as e:
         raise ErreurPreAPI(f"Échec lecture API: {e}") from e
 
+@tracer()
 def _phase_4_verification_planning(self):
     """Phase 4: Vérification du planning d'exécution"""
     self.phase_courante = "VERIFICATION_PLANNING"
-    methode_name = contexte_actuel(self)
+    methode_name = "InitialisateurScenario._phase_4_verification_planning"
     LOGGER.info("[%s] === PHASE 4: PLANNING ===", methode_name)
 
     if not self.donnees_api:
@@ -186,10 +215,11 @@ def _phase_4_verification_planning(self):
 
 # === PHASES POST-API ===
 
+@tracer()
 def _phase_5_configuration_finale(self):
     """Phase 5: Finalisation de la configuration avec les données API"""
     self.phase_courante = "CONFIGURATION_FINALE"
-    methode_name = contexte_actuel(self)
+    methode_name = "InitialisateurScenario._phase_5_configuration_finale"
     LOGGER.info("[%s] === PHASE 5: CONFIGURATION FINALE ===", methode_name)
 
     try:
@@ -204,10 +234,11 @@ def _phase_5_configuration_finale(self):
     except Exception as e:
         raise ErreurPostAPI(f"Échec finalisation configuration: {e}") from e
 
+@tracer()
 def _phase_6_repertoires(self):
     """Phase 6: Création des répertoires de sortie"""
     self.phase_courante = "CREATION_REPERTOIRES"
-    methode_name = contexte_actuel(self)
+    methode_name = "InitialisateurScenario._phase_6_repertoires"
     LOGGER.info("[%s] === PHASE 6: RÉPERTOIRES ===", methode_name)
 
     try:
@@ -225,6 +256,49 @@ def _phase_6_repertoires(self):
         self.config["screenshot_dir"] = None
         self.config["report_dir"] = None
 
+@tracer()
+def _phase_7_verification_disponibilite(self):
+    """
+    Phase 7: Sonde HTTP de url_initiale (et preflight_urls) avant le lancement du navigateur.
+
+    Politique (config "preflight") : desactive (défaut), avertir ou bloquer ;
+    une valeur inconnue est signalée et remplacée par le défaut.
+    """
+    politique = self.config.get("preflight", ConstantesSimulateur.PREFLIGHT_DESACTIVE)
+    if politique not in ConstantesSimulateur.PREFLIGHT_VALIDES:
+        LOGGER.warning(
+            "[InitialisateurScenario._phase_7_verification_disponibilite] ⚠️ preflight inconnu (%s), '%s' appliqué",
+            politique, ConstantesSimulateur.PREFLIGHT_DESACTIVE,
+        )
+        politique = ConstantesSimulateur.PREFLIGHT_DESACTIVE
+    if (
+        politique == ConstantesSimulateur.PREFLIGHT_DESACTIVE
+        or self.config.get("type_scenario") != ConstantesSimulateur.TYPE_SCENARIO_WEB
+        or not self.config.get("url_initiale")
+    ):
+        return
+
+    self.phase_courante = "VERIFICATION_DISPONIBILITE"
+    methode_name = "InitialisateurScenario._phase_7_verification_disponibilite"
+    LOGGER.info("[%s] === PHASE 7: DISPONIBILITÉ ===", methode_name)
+
+    try:
+        erreurs = verifier_disponibilite(self.config)
+    except Exception as e:
+        # Sonde inopérante - ne doit pas empêcher le scénario
+        LOGGER.warning("[%s] ⚠️ Sonde de disponibilité impossible: %s", methode_name, e)
+        return
+
+    if not erreurs:
+        LOGGER.info("[%s] ✅ Application disponible", methode_name)
+        return
+
+    for erreur in erreurs:
+        LOGGER.warning("[%s] ⚠️ %s", methode_name, message_erreur(erreur))
+
+    if politique == ConstantesSimulateur.PREFLIGHT_BLOQUER:
+        raise ErreurDisponibilite(erreurs)
+
 # === MÉTHODES UTILITAIRES ===
 
 def _creer_repertoires_sortie(self):
@@ -260,7 +334,7 @@ def _chemin_image_exadata(self):
 
 def _gerer_erreur_pre_api(self, erreur: ErreurPreAPI):
     """Gère les erreurs de pré-API (pas d'inscription)"""
-    methode_name = contexte_actuel(self)
+    methode_name = "InitialisateurScenario._gerer_erreur_pre_api"
     LOGGER.critical("[%s] ❌ ERREUR PRÉ-API: %s", methode_name, erreur)
     LOGGER.critical("[%s] Phase: %s", methode_name, self.phase_courante)
     print(f"❌ Erreur critique en phase {self.phase_courante}: {erreur}")
@@ -268,16 +342,25 @@ def _gerer_erreur_pre_api(self, erreur: ErreurPreAPI):
 
 def _gerer_erreur_post_api(self, erreur: ErreurPostAPI):
     """Gère les erreurs post-API (inscription obligatoire avec status=3)"""
-    methode_name = contexte_actuel(self)
+    methode_name = "InitialisateurScenario._gerer_erreur_post_api"
     LOGGER.critical("[%s] ❌ ERREUR POST-API: %s", methode_name, erreur)
     LOGGER.critical("[%s] Phase: %s", methode_name, self.phase_courante)
     print(f"❌ Erreur critique en phase {self.phase_courante}: {erreur}")
     
     self._inscrire_erreur_initialisation(str(erreur))
 
-def _inscrire_erreur_initialisation(self, message_erreur: str):
-    """Inscrit une erreur d'initialisation (status=3) via l'API"""
-    methode_name = contexte_actuel(self)
+def _gerer_erreur_disponibilite(self, erreur: ErreurDisponibilite):
+    """Gère une application indisponible (inscription avec status=2 et l'erreur classifiée)"""
+    methode_name = "InitialisateurScenario._gerer_erreur_disponibilite"
+    LOGGER.critical("[%s] ❌ APPLICATION INDISPONIBLE: %s", methode_name, erreur)
+    print(f"❌ {erreur} - Scénario non lancé")
+
+    self._inscrire_erreur_initialisation(str(erreur), status=2, commentaire=str(erreur))
+
+@tracer()
+def _inscrire_erreur_initialisation(self, message_erreur: str, status: int = 3, commentaire: Optional[str] = None):
+    """Inscrit une erreur d'initialisation (status=3 par défaut) via l'API"""
+    methode_name = "InitialisateurScenario._inscrire_erreur_initialisation"
     
     # Vérifier si l'inscription est possible (API chargée + identifiant disponible)
     if not self.api_chargee_avec_succes:
@@ -297,20 +380,21 @@ def _inscrire_erreur_initialisation(self, message_erreur: str):
 
     try:
         duree_totale = (datetime.now() - self.date_debut).total_seconds()
+        commentaire = commentaire or "Erreur lors de l'initialisation du scénario - Scénario non lancé"
         
         data_erreur = {
             "identifiant": identifiant,
             "scenario": self.config.get("nom_scenario", ""),
             "date": self.date_debut.isoformat(),
             "duree": duree_totale,
-            "status": 3,  # Status UNKNOWN pour erreurs d'initialisation
+            "status": status,  # UNKNOWN (3) sauf application indisponible (2)
             "nb_scene": 0,
-            "commentaire": "Erreur lors de l'initialisation du scénario - Scénario non lancé",
+            "commentaire": commentaire,
             "injecteur": os.getenv("HOSTNAME", "unknown"),
             "navigateur": self.config.get("navigateur", "unknown"),
             "interface_ip": "127.0.0.1",
-            "status_initial": 3,
-            "commentaire_initial": "Erreur lors de l'initialisation du scénario - Scénario non lancé",
+            "status_initial": status,
+            "commentaire_initial": commentaire,
             "briques": []
         }
         
@@ -333,7 +417,33 @@ def _inscrire_erreur_initialisation(self, message_erreur: str):
             pass
 ```
 
-# === FONCTION UTILITAIRE ===
+# === FONCTIONS UTILITAIRES ===
+
+def charger_utilisateur_isac(config: Dict, nom: str) -> Dict:
+    """
+    Identifiants d'un fichier utilisateur ISAC (config/utilisateurs/<nom>.conf).
+
+    Le fichier peut être découpé par plateforme ; les valeurs {crypte, valeur}
+    sont déchiffrées.
+
+    Returns:
+        Dict: utilisateur_isac, utilisateur et mot_de_passe à fusionner dans la configuration
+    """
+    repertoire = config.get("utilisateur_isac_path") or (
+        f"{config.get('scenarios_path', ConstantesSimulateur.DEFAUT_SCENARIOS_PATH)}/{ConstantesSimulateur.UTILISATEURS_ISAC}"
+    )
+    with open(Path(repertoire) / f"{nom}.conf", encoding="utf-8") as fichier:
+        donnees = yaml.safe_load(fichier) or {}
+    donnees = donnees.get(config.get("plateforme"), donnees)
+
+    utilisateur = {"utilisateur_isac": nom}
+    for cle in ("utilisateur", "mot_de_passe"):
+        valeur = donnees.get(cle)
+        if isinstance(valeur, dict) and valeur.get("crypte"):
+            valeur = decryptage_utilisateur(valeur["valeur"])
+        utilisateur[cle] = valeur
+    return utilisateur
+
 
 def initialiser_scenario() -> Tuple[Dict, Dict]:
 “””
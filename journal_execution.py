@@ -0,0 +1,154 @@
+"""
+journal_execution.py
+
+Journal NDJSON d'une exécution, écrit au fil de l'eau dans report_dir/journal.ndjson.
+
+Une ligne par enregistrement, écrite et vidée (flush) immédiatement :
+- {"type": "entete", ...}  : informations de l'exécution (à la création)
+- {"type": "etape", ...}   : une brique par étape terminée
+- {"type": "fin", ...}     : exécution finalisée (rapport écrit et inscrit)
+
+Un processus tué (OOM, timeout Jenkins) laisse un journal sans ligne "fin" :
+`journaux_orphelins` les retrouve et `rapport_depuis_journal` en fait un
+résultat partiel inscriptible (commande `run_scenario.py --recuperer`).
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+NOM_JOURNAL = "journal.ndjson"
+TYPE_ENTETE = "entete"
+TYPE_ETAPE = "etape"
+TYPE_FIN = "fin"
+
+# Champs de l'exécution repris dans l'en-tête (et donc dans un rapport récupéré)
+CHAMPS_ENTETE = ("identifiant", "scenario", "date", "injecteur", "navigateur", "interface_ip")
+
+# Délai avant qu'un journal sans fin soit considéré comme orphelin (exécution encore en cours sinon)
+DEFAUT_AGE_ORPHELIN = 3600
+
+STATUS_INCONNU = 3
+
+
+class JournalExecution:
+    """Journal d'une exécution en cours (ouvert en ajout, vidé à chaque ligne)"""
+
+    def __init__(self, chemin: str, entete: Dict):
+        self.chemin = Path(chemin)
+        self._fichier = open(self.chemin, "a", encoding="utf-8")
+        self._ecrire({"type": TYPE_ENTETE, **entete})
+
+    def _ecrire(self, enregistrement: Dict) -> None:
+        self._fichier.write(json.dumps(enregistrement, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._fichier.flush()
+
+    def ajouter_etape(self, brique: Dict) -> None:
+        self._ecrire({"type": TYPE_ETAPE, **brique})
+
+    def briques(self) -> List[Dict]:
+        """Briques journalisées, dans l'ordre"""
+        return list(lire_briques(self.chemin))
+
+    def terminer(self, status: int) -> None:
+        """Marque l'exécution comme finalisée"""
+        if self._fichier.closed:
+            return
+        self._ecrire({"type": TYPE_FIN, "status": status, "date": datetime.now().isoformat()})
+        self._fichier.close()
+
+
+def lire_journal(chemin: Path) -> Iterator[Dict]:
+    """Enregistrements d'un journal ; une dernière ligne tronquée (processus tué) est ignorée"""
+    with open(chemin, encoding="utf-8") as fichier:
+        for numero, ligne in enumerate(fichier, start=1):
+            try:
+                yield json.loads(ligne)
+            except ValueError:
+                LOGGER.warning("[lire_journal] Ligne %d illisible ignorée dans %s", numero, chemin)
+
+
+def lire_briques(chemin: Path) -> Iterator[Dict]:
+    for enregistrement in lire_journal(chemin):
+        if enregistrement.pop("type", None) == TYPE_ETAPE:
+            yield enregistrement
+
+
+def journaux_orphelins(racine: Path, age_minimum: float = DEFAUT_AGE_ORPHELIN) -> List[Path]:
+    """Journaux sans ligne de fin, non modifiés depuis age_minimum secondes"""
+    limite = time.time() - age_minimum
+    orphelins = []
+    for chemin in racine.rglob(NOM_JOURNAL):
+        try:
+            if chemin.stat().st_mtime > limite:
+                continue
+            with open(chemin, "rb") as fichier:
+                fichier.seek(max(0, chemin.stat().st_size - 4096))
+                derniere = fichier.read().rstrip(b"\n").rsplit(b"\n", 1)[-1]
+        except OSError:
+            continue
+        if b'"type":"fin"' not in derniere:
+            orphelins.append(chemin)
+    return sorted(orphelins)
+
+
+def rapport_depuis_journal(chemin: Path) -> Dict:
+    """
+    Rapport partiel d'une exécution interrompue.
+
+    Le statut est celui de la dernière étape en erreur s'il y en a une, sinon
+    inconnu (3) : l'exécution n'est pas allée à son terme.
+    """
+    entete: Dict = {}
+    briques: List[Dict] = []
+    for enregistrement in lire_journal(chemin):
+        type_enregistrement = enregistrement.pop("type", None)
+        if type_enregistrement == TYPE_ENTETE:
+            entete = enregistrement
+        elif type_enregistrement == TYPE_ETAPE:
+            briques.append(enregistrement)
+
+    en_erreur = [brique for brique in briques if brique.get("status") not in (0, 1)]
+    status = en_erreur[-1]["status"] if en_erreur else STATUS_INCONNU
+    commentaire = f"Exécution interrompue - résultat partiel ({len(briques)} étape(s) journalisée(s))"
+    if en_erreur and en_erreur[-1].get("commentaire"):
+        commentaire = f"{commentaire} : {en_erreur[-1]['commentaire']}"
+
+    return {
+        **{champ: entete.get(champ, "") for champ in CHAMPS_ENTETE},
+        "duree": round(sum(float(brique.get("duree", 0)) for brique in briques), 3),
+        "status": status,
+        "nb_scene": len(briques),
+        "commentaire": commentaire,
+        "status_initial": status,
+        "commentaire_initial": commentaire,
+        "briques": briques,
+    }
+
+
+def marquer_recupere(chemin: Path, status: int) -> None:
+    """Ajoute la ligne de fin d'un journal récupéré"""
+    with open(chemin, "rb") as fichier:
+        fichier.seek(max(0, chemin.stat().st_size - 1))
+        # Dernière ligne tronquée par l'interruption : la fin commence sur une nouvelle ligne
+        separateur = "" if fichier.read() in (b"", b"\n") else "\n"
+    fin = {"type": TYPE_FIN, "status": status, "date": datetime.now().isoformat(), "recupere": True}
+    with open(chemin, "a", encoding="utf-8") as fichier:
+        fichier.write(separateur + json.dumps(fin, separators=(",", ":")) + "\n")
+
+
+def ouvrir_journal(config: Dict, entete: Dict) -> Optional[JournalExecution]:
+    """Journal de l'exécution dans report_dir (config journal_execution, défaut True)"""
+    if not config.get("journal_execution", True) or not config.get("report_dir"):
+        return None
+    try:
+        return JournalExecution(os.path.join(config["report_dir"], NOM_JOURNAL), entete)
+    except OSError as e:
+        LOGGER.warning("[ouvrir_journal] ⚠️ Journal d'exécution non créé: %s", e)
+        return None
@@ -0,0 +1,220 @@
+"""
+journal_reseau.py
+
+Journal réseau léger ("timings") : alternative au HAR complet.
+
+Un enregistrement compact par requête terminée (modèle d'URL, statut, taille,
+phases DNS / connexion / TLS / TTFB / téléchargement) est ajouté au fil de
+l'eau dans un fichier NDJSON compressé (gzip). Aucun corps de réponse n'est
+conservé en mémoire. Un agrégat par étape est ajouté au rapport scenario.json.
+
+La taille d'une requête est celle annoncée par l'en-tête content-length de sa
+réponse (None pour une réponse chunked) : aucun aller-retour au navigateur par
+requête.
+
+Configuration :
+- generer_har : active l'enregistrement réseau (API flag_har ou config)
+- mode_har : "complet" (défaut, HAR Playwright avec corps, comme auparavant)
+  ou "timings" (ce module)
+"""
+
+import gzip
+import json
+import logging
+import re
+import time
+import weakref
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import pytest
+
+LOGGER = logging.getLogger(__name__)
+
+MODE_HAR_TIMINGS = "timings"
+MODE_HAR_COMPLET = "complet"
+NOM_FICHIER_TIMINGS = "reseau.ndjson.gz"
+NOM_FICHIER_HAR = "scenario.har"
+
+# Nombre d'enregistrements écrits entre deux vidages du tampon
+TAILLE_LOT_ECRITURE = 50
+
+# Segments de chemin variables remplacés dans le modèle d'URL
+MOTIF_SEGMENT_VARIABLE = re.compile(
+    r"^(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,})$"
+)
+
+
+def modele_url(url: str) -> str:
+    """
+    Modèle d'URL : identifiants retirés du chemin, valeurs retirées de la query.
+
+    Exemple : https://h/demande/12345?id=7&mode=x -> https://h/demande/{id}?id&mode
+    """
+    decoupe = urlsplit(url)
+    if decoupe.scheme == "data":
+        return "data:"
+
+    chemin = "/".join(
+        "{id}" if MOTIF_SEGMENT_VARIABLE.match(segment) else segment for segment in decoupe.path.split("/")
+    )
+    modele = f"{decoupe.scheme}://{decoupe.netloc}{chemin}"
+    if decoupe.query:
+        modele += "?" + "&".join(parametre.split("=", 1)[0] for parametre in decoupe.query.split("&"))
+    return modele
+
+
+def _phase(fin: float, debut: float) -> Optional[float]:
+    """Durée d'une phase en ms (None si une des bornes n'est pas disponible)"""
+    if fin < 0 or debut < 0:
+        return None
+    return round(fin - debut, 1)
+
+
+class AgregatEtape:
+    """Agrégat des requêtes d'une étape"""
+
+    __slots__ = ("nb_requetes", "nb_erreurs", "octets", "ttfb_total", "ttfb_max", "duree_max")
+
+    def __init__(self):
+        self.nb_requetes = 0
+        self.nb_erreurs = 0
+        self.octets = 0
+        self.ttfb_total = 0.0
+        self.ttfb_max = 0.0
+        self.duree_max = 0.0
+
+    def ajouter(self, enregistrement: Dict) -> None:
+        self.nb_requetes += 1
+        status = enregistrement["status"]
+        if status is None or status >= 400:
+            self.nb_erreurs += 1
+        self.octets += enregistrement["taille"] or 0
+        ttfb = enregistrement["ttfb"]
+        if ttfb is not None:
+            self.ttfb_total += ttfb
+            self.ttfb_max = max(self.ttfb_max, ttfb)
+        if enregistrement["duree"] is not None:
+            self.duree_max = max(self.duree_max, enregistrement["duree"])
+
+    def vers_dict(self) -> Dict:
+        return {
+            "nb_requetes": self.nb_requetes,
+            "nb_erreurs": self.nb_erreurs,
+            "octets": self.octets,
+            "ttfb_moyen_ms": round(self.ttfb_total / self.nb_requetes, 1) if self.nb_requetes else None,
+            "ttfb_max_ms": round(self.ttfb_max, 1),
+            "duree_max_ms": round(self.duree_max, 1),
+        }
+
+
+class JournalReseau:
+    """Enregistreur des timings réseau d'un contexte Playwright"""
+
+    def __init__(self, chemin_fichier: str):
+        self.chemin_fichier = chemin_fichier
+        self._fichier = gzip.open(chemin_fichier, "at", encoding="utf-8")
+        # Statut et taille annoncée par requête ; clés faibles : une requête jamais
+        # terminée (contexte fermé) ne reste pas en mémoire
+        self._reponses: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._en_attente = 0
+        self.etape_courante = ""
+        self.agregat = AgregatEtape()
+
+    def installer(self, context) -> None:
+        """Abonne le journal aux événements réseau du contexte"""
+        context.on("response", self._sur_reponse)
+        context.on("requestfinished", self._sur_fin_requete)
+        context.on("requestfailed", self._sur_fin_requete)
+
+    def _sur_reponse(self, response) -> None:
+        """Mémorise statut et taille annoncée (en-têtes déjà reçus : aucun aller-retour au navigateur)"""
+        taille = response.headers.get("content-length")
+        self._reponses[response.request] = (response.status, int(taille) if taille and taille.isdigit() else None)
+
+    def _sur_fin_requete(self, request) -> None:
+        """Écrit l'enregistrement compact d'une requête terminée (ou en échec)"""
+        status, taille = self._reponses.pop(request, (None, None))
+        timing = request.timing
+
+        enregistrement = {
+            "t": round(timing["startTime"] / 1000, 3) if timing.get("startTime", -1) > 0 else round(time.time(), 3),
+            "etape": self.etape_courante,
+            "methode": request.method,
+            "url": modele_url(request.url),
+            "type": request.resource_type,
+            "status": status,
+            "taille": taille,
+            "dns": _phase(timing.get("domainLookupEnd", -1), timing.get("domainLookupStart", -1)),
+            "connexion": _phase(timing.get("connectEnd", -1), timing.get("connectStart", -1)),
+            "tls": _phase(timing.get("connectEnd", -1), timing.get("secureConnectionStart", -1)),
+            "ttfb": _phase(timing.get("responseStart", -1), timing.get("requestStart", -1)),
+            "telechargement": _phase(timing.get("responseEnd", -1), timing.get("responseStart", -1)),
+            "duree": _phase(timing.get("responseEnd", -1), 0),
+        }
+        if request.failure:
+            enregistrement["echec"] = request.failure
+
+        self.agregat.ajouter(enregistrement)
+        self._fichier.write(json.dumps(enregistrement, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+        self._en_attente += 1
+        if self._en_attente >= TAILLE_LOT_ECRITURE:
+            self._fichier.flush()
+            self._en_attente = 0
+
+    def debuter_etape(self, nom_etape: str) -> None:
+        """Rattache les requêtes suivantes à une nouvelle étape"""
+        self.etape_courante = nom_etape
+        self.agregat = AgregatEtape()
+
+    def relever_agregat(self) -> Dict:
+        """Agrégat de l'étape courante"""
+        return self.agregat.vers_dict()
+
+    def fermer(self) -> None:
+        """Vide le tampon et ferme le fichier"""
+        if not self._fichier.closed:
+            self._fichier.close()
+            LOGGER.info("[JournalReseau] Journal réseau écrit: %s", self.chemin_fichier)
+
+
+def options_har(config: Dict) -> Dict:
+    """Options de création du contexte pour le mode HAR complet"""
+    if not config.get("generer_har") or config.get("mode_har", MODE_HAR_COMPLET) != MODE_HAR_COMPLET:
+        return {}
+    if not config.get("report_dir"):
+        return {}
+    return {"record_har_path": f"{config['report_dir']}/{NOM_FICHIER_HAR}"}
+
+
+# === FIXTURES PYTEST ===
+
+
+@pytest.fixture(scope="session")
+def journal_reseau(execution) -> Optional[JournalReseau]:
+    """Journal réseau léger du scénario (None si non demandé)"""
+    config = execution.config
+    if (
+        not config.get("generer_har")
+        or config.get("mode_har", MODE_HAR_COMPLET) != MODE_HAR_TIMINGS
+        or not config.get("report_dir")
+    ):
+        yield None
+        return
+
+    journal = JournalReseau(f"{config['report_dir']}/{NOM_FICHIER_TIMINGS}")
+    yield journal
+    journal.fermer()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def agregat_reseau(journal_reseau, etape):
+    """Ajoute l'agrégat réseau de l'étape à son rapport"""
+    if journal_reseau is None:
+        yield
+        return
+
+    journal_reseau.debuter_etape(etape.etape.nom)
+    yield
+    etape.etape["reseau"] = journal_reseau.relever_agregat()
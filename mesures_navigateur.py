@@ -0,0 +1,140 @@
+"""
+mesures_navigateur.py
+
+Mesures de performance côté navigateur, relevées à la fin de chaque étape
+et pour chaque frame : Navigation Timing, paint (FP/FCP), LCP, CLS et tâches
+longues. Elles permettent de distinguer un backend lent d'un rendu lent.
+
+Les observateurs sont installés par un script d'initialisation du contexte ;
+chaque relevé ne contient que ce qui est nouveau depuis le relevé précédent
+(navigation non encore rapportée, décalages et tâches longues de l'étape).
+Les indicateurs non supportés par le navigateur (CLS et tâches longues sous
+Firefox par exemple) valent None.
+
+Seules les étapes qui utilisent la fixture `page` sont mesurées, sur les frames
+de cette page : une étape sans page ne provoque aucun lancement de navigateur.
+
+Configuration : mesures_navigateur (défaut True)
+"""
+
+import logging
+from typing import Dict, List
+
+import pytest
+
+LOGGER = logging.getLogger(__name__)
+
+SCRIPT_OBSERVATEURS = """
+(() => {
+    if (window.__mesuresSimulateur) return;
+    const supportes = (window.PerformanceObserver && PerformanceObserver.supportedEntryTypes) || [];
+    const m = window.__mesuresSimulateur = {
+        lcp: null, cls: 0, nbTachesLongues: 0, dureeTachesLongues: 0,
+        navigationRapportee: false,
+        clsSupporte: supportes.includes('layout-shift'),
+        tachesLonguesSupportees: supportes.includes('longtask'),
+    };
+    const observer = (type, traitement) => {
+        if (!supportes.includes(type)) return;
+        try {
+            new PerformanceObserver(liste => liste.getEntries().forEach(traitement))
+                .observe({type: type, buffered: true});
+        } catch (e) {}
+    };
+    observer('largest-contentful-paint', e => { m.lcp = e.startTime; });
+    observer('layout-shift', e => { if (!e.hadRecentInput) m.cls += e.value; });
+    observer('longtask', e => { m.nbTachesLongues += 1; m.dureeTachesLongues += e.duration; });
+})();
+"""
+
+SCRIPT_RELEVE = """
+() => {
+    const m = window.__mesuresSimulateur;
+    if (!m) return null;
+    const arrondi = v => Math.round(v * 10) / 10;
+    const releve = {url: location.href};
+
+    if (!m.navigationRapportee) {
+        const nav = performance.getEntriesByType('navigation')[0];
+        if (nav) {
+            releve.navigation = {
+                type: nav.type,
+                dns_ms: arrondi(nav.domainLookupEnd - nav.domainLookupStart),
+                connexion_ms: arrondi(nav.connectEnd - nav.connectStart),
+                ttfb_ms: arrondi(nav.responseStart - nav.requestStart),
+                reponse_ms: arrondi(nav.responseEnd - nav.responseStart),
+                dom_interactive_ms: arrondi(nav.domInteractive),
+                dom_content_loaded_ms: arrondi(nav.domContentLoadedEventEnd),
+                load_ms: nav.loadEventEnd > 0 ? arrondi(nav.loadEventEnd) : null,
+                taille_transfert: nav.transferSize,
+            };
+            for (const paint of performance.getEntriesByType('paint')) {
+                releve[paint.name === 'first-contentful-paint' ? 'fcp_ms' : 'fp_ms'] = arrondi(paint.startTime);
+            }
+            m.navigationRapportee = true;
+        }
+    }
+
+    if (m.lcp !== null) {
+        releve.lcp_ms = arrondi(m.lcp);
+        m.lcp = null;
+    }
+    releve.cls = m.clsSupporte ? Math.round(m.cls * 10000) / 10000 : null;
+    releve.taches_longues = m.tachesLonguesSupportees
+        ? {nb: m.nbTachesLongues, duree_totale_ms: arrondi(m.dureeTachesLongues)}
+        : null;
+    m.cls = 0;
+    m.nbTachesLongues = 0;
+    m.dureeTachesLongues = 0;
+    return releve;
+}
+"""
+
+
+def installer_observateurs(context) -> None:
+    """Installe les observateurs de performance sur toutes les pages et frames du contexte"""
+    context.add_init_script(SCRIPT_OBSERVATEURS)
+
+
+def relever_mesures_page(page) -> List[Dict]:
+    """
+    Relève les mesures de toutes les frames d'une page (frame principale en premier).
+
+    Les frames détachées ou non instrumentées sont ignorées.
+    """
+    releves = []
+    if page.is_closed():
+        return releves
+    for frame in page.frames:
+        try:
+            releve = frame.evaluate(SCRIPT_RELEVE)
+        except Exception as e:
+            LOGGER.debug("[relever_mesures_page] Frame %s ignorée: %s", frame.name or frame.url, e)
+            continue
+        if releve:
+            releve["frame"] = frame.name or ("principale" if frame.parent_frame is None else "")
+            releves.append(releve)
+    return releves
+
+
+def relever_mesures(context) -> List[Dict]:
+    """Relève les mesures de toutes les pages du contexte"""
+    return [releve for page in context.pages for releve in relever_mesures_page(page)]
+
+
+# === FIXTURE PYTEST ===
+
+
+@pytest.fixture(scope="function", autouse=True)
+def mesures_etape(execution, etape, request):
+    """Ajoute au rapport de l'étape les mesures de la page qu'elle utilise, relevées en fin d'étape"""
+    if "page" not in request.fixturenames or not execution.config.get("mesures_navigateur", True):
+        yield
+        return
+
+    page = request.getfixturevalue("page")
+    yield
+
+    releves = relever_mesures_page(page)
+    if releves:
+        etape.etape["mesures"] = releves
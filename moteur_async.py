@@ -0,0 +1,458 @@
+"""
+moteur_async.py
+
+Moteur d'exécution asyncio : plusieurs dizaines de scénarios simultanés dans une
+seule boucle d'événements, sur quelques navigateurs partagés (un contexte par scénario).
+
+- MoteurAsync : navigateurs partagés (API async de Playwright), places de contextes
+  par navigateur, nombre de scénarios simultanés borné.
+- ScenarioAsync : exécution des étapes `test_*` d'un fichier de scénario et
+  production du rapport au format de scenario.json.
+- Adaptateur sync : les fichiers de scénario existants (API sync, `page` et
+  `step_result` en paramètres, `expect` de playwright.sync_api) s'exécutent dans
+  un thread ; chaque appel Playwright est transmis à la boucle et attendu.
+  Les étapes `async def` reçoivent directement les objets async, sans thread.
+
+Les étapes reçoivent par nom les mêmes paramètres que les fixtures pytest :
+`page`, `step_result` / `etape` (EtapeAsync, même API que Etape), `execution`
+(config du scénario) et, pour les étapes sync, `registre_locators`.
+
+Limites de l'adaptateur : seul le nom `expect` du module de scénario est lié à
+l'adaptateur (les modules communs doivent utiliser `moteur_async.expect`) ; les
+gestionnaires d'événements (`page.on(...)`) sont appelés dans la boucle avec les
+objets async et ne doivent pas bloquer.
+"""
+
+import asyncio
+import importlib.util
+import inspect
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from cache_session import options_session
+from enregistrements import EnregistrementEtape, StatutEtape, encoder_etape
+from echantillonneur import Echantillonneur
+from gouverneur import GouverneurConcurrence
+from registre_locators import RegistreLocators, charger_apprentissage, resoudre_locator
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAUT_NAVIGATEURS = 2
+DEFAUT_CONTEXTES_PAR_NAVIGATEUR = 20
+DEFAUT_SCENARIOS_SIMULTANES = 30
+
+
+# === ADAPTATEUR SYNC ===
+
+
+def _est_objet_async(valeur) -> bool:
+    return type(valeur).__module__.startswith("playwright.async_api")
+
+
+def _adapter(valeur, boucle):
+    """Enveloppe les objets Playwright async retournés au code sync"""
+    if _est_objet_async(valeur):
+        return AdaptateurSync(valeur, boucle)
+    if isinstance(valeur, list):
+        return [_adapter(element, boucle) for element in valeur]
+    return valeur
+
+
+def _desadapter(valeur):
+    """Objet async sous-jacent d'un argument passé par le code sync"""
+    if isinstance(valeur, AdaptateurSync):
+        return valeur._objet
+    if isinstance(valeur, (list, tuple)):
+        return type(valeur)(_desadapter(element) for element in valeur)
+    return valeur
+
+
+async def _executer(fonction: Callable, args, kwargs):
+    resultat = fonction(*args, **kwargs)
+    if inspect.isawaitable(resultat):
+        resultat = await resultat
+    return resultat
+
+
+class AdaptateurSync:
+    """
+    Façade sync d'un objet Playwright async.
+
+    Utilisable uniquement hors du thread de la boucle : chaque appel de méthode
+    est exécuté dans la boucle et son résultat attendu.
+    """
+
+    __slots__ = ("_objet", "_boucle")
+
+    def __init__(self, objet, boucle: asyncio.AbstractEventLoop):
+        self._objet = objet
+        self._boucle = boucle
+
+    def _appeler(self, fonction: Callable, args, kwargs):
+        args = [_desadapter(arg) for arg in args]
+        kwargs = {nom: _desadapter(valeur) for nom, valeur in kwargs.items()}
+        futur = asyncio.run_coroutine_threadsafe(_executer(fonction, args, kwargs), self._boucle)
+        return _adapter(futur.result(), self._boucle)
+
+    def __getattr__(self, nom: str):
+        valeur = getattr(self._objet, nom)
+        if not callable(valeur):
+            return _adapter(valeur, self._boucle)
+
+        def methode(*args, **kwargs):
+            return self._appeler(valeur, args, kwargs)
+
+        methode.__name__ = nom
+        return methode
+
+    def __repr__(self) -> str:
+        return f"AdaptateurSync({self._objet!r})"
+
+
+class PageScenarioAsync(AdaptateurSync):
+    """Page adaptée exposée aux scénarios sync : `screenshot(nom)` comme ScenarioPage"""
+
+    __slots__ = ("_scenario",)
+
+    def __init__(self, page, boucle, scenario: "ScenarioAsync"):
+        super().__init__(page, boucle)
+        self._scenario = scenario
+
+    def screenshot(self, nom: Optional[str] = None, **options):
+        if nom is None or "path" in options:
+            return self._appeler(self._objet.screenshot, (), options)
+        chemin = self._scenario.chemin_capture(nom)
+        if chemin is None:
+            return None
+        self._appeler(self._objet.screenshot, (), {"path": chemin, **options})
+        return chemin
+
+
+def expect(cible, message: Optional[str] = None):
+    """`expect` pour les scénarios sync exécutés par le moteur"""
+    from playwright.async_api import expect as expect_async
+
+    cible = resoudre_locator(cible)
+    if not isinstance(cible, AdaptateurSync):
+        raise TypeError(f"expect attend un objet de la page du moteur async, reçu {type(cible).__name__}")
+    return AdaptateurSync(expect_async(cible._objet, message), cible._boucle)
+
+
+# === ÉTAPES ET SCÉNARIOS ===
+
+
+class EtapeAsync:
+    """
+    Étape d'un scénario exécuté par le moteur (même enregistrement et mêmes setters que Etape).
+
+    Avec un échantillonneur, l'étape reçoit comme en pytest le résumé `ressources`
+    des échantillons pris pendant son exécution (aucune lecture de /proc sur la boucle).
+    """
+
+    def __init__(self, nom: str, ordre: int, echantillonneur: Optional[Echantillonneur] = None):
+        self.etape = EnregistrementEtape(nom, ordre)
+        self.debut = time.perf_counter()
+        self.compteur_screenshot = 0
+        self.echantillonneur = echantillonneur
+        self._resume = echantillonneur.debuter_etape() if echantillonneur is not None else None
+
+    def __str__(self):
+        return f"{self.etape}"
+
+    def incrementer_screenshot(self) -> int:
+        self.compteur_screenshot += 1
+        return self.compteur_screenshot
+
+    def get_compteur_screenshot(self) -> int:
+        return self.compteur_screenshot
+
+    def set_ordre(self, ordre: int) -> None:
+        self.etape.ordre = ordre
+
+    def set_status(self, status) -> None:
+        self.etape.status = StatutEtape(status)
+
+    def set_url(self, url: str) -> None:
+        self.etape.url = url
+
+    def set_commentaire(self, commentaire: str) -> None:
+        self.etape.commentaire = commentaire
+
+    def finalise(self, status: StatutEtape, url: str, commentaire: str) -> None:
+        """
+        Fin d'étape : un statut plus grave ou un commentaire positionné par l'étape
+        (set_status, set_commentaire) est conservé.
+        """
+        self.etape.duree = round(time.perf_counter() - self.debut, 3)
+        if self.etape.status == StatutEtape.INCONNU or status > self.etape.status:
+            self.etape.status = status
+        self.etape.url = url
+        self.etape.commentaire = commentaire or self.etape.commentaire
+        if self._resume is not None:
+            self.etape["ressources"] = self.echantillonneur.resume_etape(self._resume)
+            self._resume = None
+
+
+def charger_etapes(fichier: Path) -> List[Callable]:
+    """
+    Étapes d'un fichier de scénario dans l'ordre de définition (ordre pytest) :
+    méthodes `test_*` des classes `Test*` puis fonctions `test_*` du module.
+
+    Le nom `expect` du module est lié à l'adaptateur du moteur.
+    """
+    spec = importlib.util.spec_from_file_location(f"scenario_async_{fichier.stem}", fichier)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if hasattr(module, "expect"):
+        module.expect = expect
+
+    etapes = []
+    for nom, valeur in vars(module).items():
+        if nom.startswith("Test") and inspect.isclass(valeur):
+            instance = valeur()
+            etapes.extend(
+                getattr(instance, nom_methode) for nom_methode in vars(valeur) if nom_methode.startswith("test_")
+            )
+        elif nom.startswith("test_") and inspect.isfunction(valeur):
+            etapes.append(valeur)
+    return etapes
+
+
+class ScenarioAsync:
+    """
+    Exécution d'un scénario dans un contexte du moteur.
+
+    Comme avec pytest -x, l'exécution s'arrête à la première étape en erreur.
+    """
+
+    def __init__(self, fichier: Path, config: Dict):
+        self.fichier = fichier
+        self.config = config
+        self.date = datetime.now()
+        self.etapes: List[EnregistrementEtape] = []
+        self._compteur_captures = 0
+
+    def chemin_capture(self, nom: str) -> Optional[str]:
+        if not self.config.get("screenshot_dir"):
+            return None
+        self._compteur_captures += 1
+        return f"{self.config['screenshot_dir']}/{len(self.etapes) + 1:02d}_{self._compteur_captures:02d}_{nom}.png"
+
+    async def executer(self, moteur: "MoteurAsync") -> Dict:
+        boucle = asyncio.get_running_loop()
+        etapes = charger_etapes(self.fichier)
+
+        # Session en cache chargée à la création du contexte, comme pour la fixture page
+        options_contexte = {**self.config.get("options_contexte", {}), **options_session(self.config)}
+        async with moteur.contexte(**options_contexte) as context:
+            page = await context.new_page()
+            if self.config.get("url_initiale"):
+                await page.goto(self.config["url_initiale"])
+
+            page_sync = PageScenarioAsync(page, boucle, self)
+            # Registre sync (adaptateur) : créé et utilisé hors de la boucle
+            apprentissage = charger_apprentissage(self.config)
+            registre = await boucle.run_in_executor(moteur.executeur, RegistreLocators, page_sync, apprentissage)
+
+            for ordre, fonction in enumerate(etapes, start=1):
+                nom = fonction.__name__[5:]
+                etape = EtapeAsync(nom, ordre, moteur.echantillonneur)
+                try:
+                    if inspect.iscoroutinefunction(fonction):
+                        await fonction(**self._arguments(fonction, page, etape))
+                    else:
+                        await boucle.run_in_executor(
+                            moteur.executeur,
+                            lambda: fonction(**self._arguments(fonction, page_sync, etape, registre)),
+                        )
+                    etape.finalise(StatutEtape.SUCCES, page.url, "")
+                except Exception as e:
+                    LOGGER.warning("[ScenarioAsync %s] ❌ Étape %s en erreur: %s", self.fichier.stem, nom, e)
+                    etape.finalise(StatutEtape.ERREUR, page.url, str(e).splitlines()[0] if str(e) else type(e).__name__)
+                if apprentissage is not None:
+                    await boucle.run_in_executor(moteur.executeur, registre.apprendre)
+                self.etapes.append(etape.etape)
+                if etape.etape.status != StatutEtape.SUCCES:
+                    break
+
+        if apprentissage is not None:
+            try:
+                await asyncio.to_thread(apprentissage.enregistrer)
+            except OSError as e:
+                LOGGER.warning("[ScenarioAsync %s] ⚠️ Enregistrement de l'apprentissage impossible: %s", self.fichier.stem, e)
+        return self.rapport()
+
+    def _arguments(
+        self, fonction: Callable, page, etape: EtapeAsync, registre: Optional[RegistreLocators] = None
+    ) -> Dict[str, Any]:
+        """Paramètres de l'étape résolus par nom, comme les fixtures (registre : étapes sync seulement)"""
+        disponibles = {"page": page, "step_result": etape, "etape": etape, "execution": self}
+        if registre is not None:
+            disponibles["registre_locators"] = registre
+        parametres = inspect.signature(fonction).parameters
+        manquants = [
+            nom for nom, parametre in parametres.items()
+            if nom not in disponibles and parametre.default is inspect.Parameter.empty
+        ]
+        if manquants:
+            raise TypeError(f"Paramètre(s) non fourni(s) par le moteur async: {', '.join(manquants)}")
+        return {nom: disponibles[nom] for nom in parametres if nom in disponibles}
+
+    def rapport(self) -> Dict:
+        """Rapport au format de scenario.json"""
+        if self.etapes:
+            status, commentaire = int(self.etapes[-1].status), self.etapes[-1].commentaire
+        else:
+            status, commentaire = int(StatutEtape.INCONNU), "Aucune étape"
+        return {
+            "identifiant": self.config.get("identifiant", ""),
+            "scenario": self.config.get("nom_scenario", self.fichier.stem),
+            "date": self.date.isoformat(),
+            "duree": round(sum(etape.duree for etape in self.etapes), 3),
+            "status": status,
+            "nb_scene": len(self.etapes),
+            "commentaire": commentaire,
+            "injecteur": os.getenv("HOSTNAME", "unknown"),
+            "navigateur": self.config.get("navigateur", "unknown"),
+            "interface_ip": "127.0.0.1",
+            "status_initial": status,
+            "commentaire_initial": commentaire,
+            "briques": [encoder_etape(etape) for etape in self.etapes],
+        }
+
+
+# === MOTEUR ===
+
+
+class _NavigateurPartage:
+    __slots__ = ("browser", "places", "actifs")
+
+    def __init__(self, browser, contextes_max: int):
+        self.browser = browser
+        self.places = asyncio.Semaphore(contextes_max)
+        self.actifs = 0
+
+
+class MoteurAsync:
+    """
+    Navigateurs partagés et exécution concurrente de scénarios.
+
+    Args:
+        navigateur: firefox, chromium ou msedge
+        nb_navigateurs: nombre de navigateurs lancés
+        contextes_par_navigateur: contextes simultanés maximum par navigateur
+        scenarios_simultanes: scénarios exécutés simultanément (borne aussi les threads de l'adaptateur)
+        options_lancement: options passées à launch() (headless...)
+        gouverneur: limite de concurrence ajustée selon la charge de l'hôte
+            (remplace scenarios_simultanes, dont il reprend le maximum)
+    """
+
+    def __init__(
+        self,
+        navigateur: str = "firefox",
+        nb_navigateurs: int = DEFAUT_NAVIGATEURS,
+        contextes_par_navigateur: int = DEFAUT_CONTEXTES_PAR_NAVIGATEUR,
+        scenarios_simultanes: int = DEFAUT_SCENARIOS_SIMULTANES,
+        options_lancement: Optional[Dict] = None,
+        gouverneur: Optional[GouverneurConcurrence] = None,
+    ):
+        self.navigateur = navigateur
+        self.nb_navigateurs = nb_navigateurs
+        self.contextes_par_navigateur = contextes_par_navigateur
+        self.scenarios_simultanes = scenarios_simultanes
+        self.options_lancement = options_lancement or {}
+        self.gouverneur = gouverneur
+        self.executeur = ThreadPoolExecutor(max_workers=scenarios_simultanes, thread_name_prefix="scenario_sync")
+        self._playwright = None
+        self._navigateurs: List[_NavigateurPartage] = []
+        # Relevés de charge de l'injecteur (lus par le gouverneur)
+        self.echantillonneur: Optional[Echantillonneur] = None
+
+    async def demarrer(self) -> None:
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        for _ in range(self.nb_navigateurs):
+            self._navigateurs.append(_NavigateurPartage(await self._lancer(), self.contextes_par_navigateur))
+        self.echantillonneur = Echantillonneur().demarrer()
+        LOGGER.info(
+            "[MoteurAsync] %d navigateur(s) %s démarré(s), %d contextes max chacun",
+            self.nb_navigateurs, self.navigateur, self.contextes_par_navigateur,
+        )
+
+    async def _lancer(self):
+        if self.navigateur == "msedge":
+            return await self._playwright.chromium.launch(channel="msedge", **self.options_lancement)
+        return await getattr(self._playwright, self.navigateur).launch(**self.options_lancement)
+
+    async def arreter(self) -> None:
+        for navigateur in self._navigateurs:
+            try:
+                await navigateur.browser.close()
+            except Exception as e:
+                LOGGER.debug("[MoteurAsync] Fermeture navigateur: %s", e)
+        self._navigateurs.clear()
+        if self.echantillonneur is not None:
+            await asyncio.to_thread(self.echantillonneur.arreter)
+            self.echantillonneur = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        self.executeur.shutdown(wait=False)
+
+    @asynccontextmanager
+    async def contexte(self, **options):
+        """Contexte sur le navigateur le moins chargé (attend une place libre)"""
+        navigateur = min(self._navigateurs, key=lambda candidat: candidat.actifs)
+        async with navigateur.places:
+            navigateur.actifs += 1
+            context = await navigateur.browser.new_context(**options)
+            try:
+                yield context
+            finally:
+                try:
+                    await context.close()
+                finally:
+                    navigateur.actifs -= 1
+
+    async def executer(self, scenarios: List[ScenarioAsync]) -> List[Dict]:
+        """Exécute les scénarios (au plus scenarios_simultanes à la fois) ; rapports dans le même ordre"""
+        limite = self.gouverneur or asyncio.Semaphore(self.scenarios_simultanes)
+        surveillance = asyncio.create_task(self.gouverneur.surveiller(self.echantillonneur)) if self.gouverneur else None
+
+        async def executer_un(scenario: ScenarioAsync) -> Dict:
+            async with limite:
+                try:
+                    return await scenario.executer(self)
+                except Exception as e:
+                    LOGGER.error("[MoteurAsync] ❌ Scénario %s: %s", scenario.fichier.stem, e)
+                    rapport = scenario.rapport()
+                    rapport["status"] = rapport["status_initial"] = int(StatutEtape.INCONNU)
+                    rapport["commentaire"] = rapport["commentaire_initial"] = f"Erreur moteur: {e}"
+                    return rapport
+
+        try:
+            return await asyncio.gather(*(executer_un(scenario) for scenario in scenarios))
+        finally:
+            if surveillance is not None:
+                surveillance.cancel()
+
+
+def executer_scenarios(scenarios: List[ScenarioAsync], **options_moteur) -> List[Dict]:
+    """Point d'entrée sync : démarre le moteur, exécute les scénarios et l'arrête"""
+
+    async def principal():
+        moteur = MoteurAsync(**options_moteur)
+        await moteur.demarrer()
+        try:
+            return await moteur.executer(scenarios)
+        finally:
+            await moteur.arreter()
+
+    return asyncio.run(principal())
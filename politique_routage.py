@@ -0,0 +1,143 @@
+"""
+politique_routage.py
+
+Politique de routage des requêtes : blocage des ressources non essentielles
+(images, polices, traceurs, scripts tiers...) par scénario et par application.
+
+Configuration (config scénario) :
+
+    routage:
+      bloquer_types: [image, font, media]
+      bloquer_urls: ['google-analytics\\.com', '/matomo\\.js']
+      autoriser_urls: ['portail\\.intranet\\.local/static/img/captcha']
+    routage_applications:
+      AAI2:
+        bloquer_types: [stylesheet]
+
+Les règles de l'application (nom issu des données API) s'ajoutent à celles du
+scénario. Une URL de la liste d'autorisation n'est jamais bloquée.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Pattern
+
+import pytest
+
+LOGGER = logging.getLogger(__name__)
+
+# Taille moyenne estimée d'une ressource bloquée (octets) : une requête bloquée
+# n'étant jamais téléchargée, les octets économisés ne peuvent être qu'estimés
+TAILLES_ESTIMEES = {
+    "image": 30_000,
+    "font": 40_000,
+    "media": 300_000,
+    "script": 50_000,
+    "stylesheet": 20_000,
+}
+TAILLE_ESTIMEE_DEFAUT = 5_000
+
+
+def _compiler(motifs: List[str]) -> Optional[Pattern]:
+    """Compile une liste de regex en une seule alternative (None si vide)"""
+    if not motifs:
+        return None
+    return re.compile("|".join(f"(?:{motif})" for motif in motifs))
+
+
+class PolitiqueRoutage:
+    """Règles de blocage appliquées aux requêtes d'un contexte Playwright"""
+
+    def __init__(
+        self,
+        bloquer_types: Optional[List[str]] = None,
+        bloquer_urls: Optional[List[str]] = None,
+        autoriser_urls: Optional[List[str]] = None,
+    ):
+        self.bloquer_types = frozenset(bloquer_types or [])
+        self.bloquer_urls = _compiler(bloquer_urls or [])
+        self.autoriser_urls = _compiler(autoriser_urls or [])
+
+        self.requetes_bloquees = 0
+        self.octets_economises = 0
+
+    @classmethod
+    def depuis_config(cls, config: Dict, donnees_api: Optional[Dict] = None) -> Optional["PolitiqueRoutage"]:
+        """Construit la politique du scénario (None si aucune règle n'est configurée)"""
+        regles = [config.get("routage") or {}]
+
+        nom_app = (donnees_api or {}).get("application", {}).get("nom")
+        if nom_app:
+            regles.append((config.get("routage_applications") or {}).get(nom_app) or {})
+
+        fusion = {
+            cle: [valeur for regle in regles for valeur in regle.get(cle) or []]
+            for cle in ("bloquer_types", "bloquer_urls", "autoriser_urls")
+        }
+        if not fusion["bloquer_types"] and not fusion["bloquer_urls"]:
+            return None
+        return cls(**fusion)
+
+    def doit_bloquer(self, resource_type: str, url: str) -> bool:
+        """Décision de blocage d'une requête"""
+        if resource_type not in self.bloquer_types and not (self.bloquer_urls and self.bloquer_urls.search(url)):
+            return False
+        return not (self.autoriser_urls and self.autoriser_urls.search(url))
+
+    def installer(self, context) -> None:
+        """
+        Installe la politique sur un contexte (avant la création des pages).
+
+        Sans blocage par type, seules les URL correspondant aux motifs sont interceptées,
+        ce qui évite un aller-retour vers Playwright pour chaque requête.
+        """
+        if self.bloquer_types:
+            context.route("**/*", self._router)
+        else:
+            context.route(self.bloquer_urls, self._router)
+
+        LOGGER.info(
+            "[PolitiqueRoutage] Routage installé (types bloqués: %s)", ", ".join(sorted(self.bloquer_types)) or "aucun"
+        )
+
+    def _router(self, route, request) -> None:
+        """Handler de route : abandon des requêtes bloquées, poursuite des autres"""
+        resource_type = request.resource_type
+        if self.doit_bloquer(resource_type, request.url):
+            self.requetes_bloquees += 1
+            self.octets_economises += TAILLES_ESTIMEES.get(resource_type, TAILLE_ESTIMEE_DEFAUT)
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    def relever_compteurs(self) -> Dict:
+        """Retourne les compteurs depuis le dernier relevé puis les remet à zéro"""
+        compteurs = {
+            "requetes_bloquees": self.requetes_bloquees,
+            "octets_economises_estimes": self.octets_economises,
+        }
+        self.requetes_bloquees = 0
+        self.octets_economises = 0
+        return compteurs
+
+
+# === FIXTURES PYTEST ===
+
+
+@pytest.fixture(scope="session")
+def politique_routage(execution) -> Optional[PolitiqueRoutage]:
+    """Politique de routage du scénario (None si non configurée)"""
+    return PolitiqueRoutage.depuis_config(execution.config, execution.donnees_scenario_api)
+
+
+@pytest.fixture(scope="function", autouse=True)
+def compteurs_routage(politique_routage, etape):
+    """Ajoute au rapport de chaque étape le nombre de requêtes bloquées"""
+    if politique_routage is not None:
+        # Requêtes bloquées entre deux étapes : non attribuées
+        politique_routage.relever_compteurs()
+
+    yield
+
+    if politique_routage is not None:
+        etape.etape.update(politique_routage.relever_compteurs())
@@ -0,0 +1,345 @@
+"""
+pool_navigateurs.py
+
+Pool de navigateurs pré-lancés, partagé entre les scénarios d'un même runner.
+
+Chaque scénario obtient un contexte isolé (cookies, cache, stockage) créé sur un
+navigateur déjà démarré. La fixture `page` des scénarios est ouverte sur ce contexte :
+HAR, session en cache, politique de routage, journal réseau et observateurs de
+performance sont installés avant sa première navigation. Un navigateur est recyclé (fermé puis relancé) :
+- après un nombre maximal de contextes servis
+- lorsque la mémoire (RSS) de son arborescence de processus dépasse une limite
+- lorsqu'il s'est déconnecté (crash)
+"""
+
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import pytest
+
+from cache_session import options_session
+from journal_reseau import options_har
+from mesures_navigateur import installer_observateurs
+
+LOGGER = logging.getLogger(__name__)
+
+# Valeurs par défaut du pool
+DEFAUT_TAILLE_POOL = 2
+DEFAUT_MAX_CONTEXTES = 50
+DEFAUT_RSS_MAX_MO = 1500
+
+
+# === MESURE MÉMOIRE (LINUX /proc) ===
+
+
+def _pids_enfants() -> Dict[int, List[int]]:
+    """Table ppid -> pids construite depuis /proc"""
+    enfants: Dict[int, List[int]] = {}
+    for entree in Path("/proc").iterdir():
+        if not entree.name.isdigit():
+            continue
+        try:
+            # Le nom du processus (2e champ) peut contenir des espaces : on coupe après ')'
+            champs = (entree / "stat").read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        enfants.setdefault(int(champs[1]), []).append(int(entree.name))
+    return enfants
+
+
+def descendants(pid: int, enfants: Optional[Dict[int, List[int]]] = None) -> Set[int]:
+    """
+    Ensemble des processus descendants d'un processus (pid exclu).
+
+    `enfants` : table ppid -> pids déjà construite (un seul parcours de /proc pour plusieurs pids)
+    """
+    if enfants is None:
+        enfants = _pids_enfants()
+    resultat: Set[int] = set()
+    a_visiter = [pid]
+    while a_visiter:
+        for enfant in enfants.get(a_visiter.pop(), []):
+            if enfant not in resultat:
+                resultat.add(enfant)
+                a_visiter.append(enfant)
+    return resultat
+
+
+def rss_processus_mo(pids: Set[int]) -> float:
+    """Somme des RSS (en Mo) d'un ensemble de processus encore vivants"""
+    total_pages = 0
+    for pid in pids:
+        try:
+            total_pages += int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return total_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+# === POOL ===
+
+
+class NavigateurDuPool:
+    """Navigateur du pool avec ses compteurs d'utilisation"""
+
+    def __init__(self, navigateur: str, browser, pids: Set[int]):
+        self.navigateur = navigateur
+        self.browser = browser
+        self.pids = pids
+        self.contextes_servis = 0
+        self.contextes_actifs = 0
+        self.deconnecte = False
+        browser.on("disconnected", self._sur_deconnexion)
+
+    def _sur_deconnexion(self, _browser) -> None:
+        """Handler `disconnected` : crash ou fermeture du navigateur"""
+        self.deconnecte = True
+
+    def est_vivant(self) -> bool:
+        """Le navigateur est-il toujours utilisable ?"""
+        return not self.deconnecte and self.browser.is_connected()
+
+    def rss_mo(self) -> float:
+        """Mémoire résidente de l'arborescence de processus du navigateur"""
+        enfants = _pids_enfants()
+        pids = set(self.pids)
+        for pid in self.pids:
+            pids |= descendants(pid, enfants)
+        return rss_processus_mo(pids)
+
+
+class PoolNavigateurs:
+    """
+    Pool de N navigateurs pré-lancés par type de navigateur.
+
+    Doit être utilisé depuis le thread qui l'a démarré (API sync de Playwright).
+    """
+
+    def __init__(
+        self,
+        taille: int = DEFAUT_TAILLE_POOL,
+        max_contextes: int = DEFAUT_MAX_CONTEXTES,
+        rss_max_mo: float = DEFAUT_RSS_MAX_MO,
+        options_lancement: Optional[Dict] = None,
+    ):
+        self.taille = taille
+        self.max_contextes = max_contextes
+        self.rss_max_mo = rss_max_mo
+        self.options_lancement = options_lancement or {}
+        self.navigateurs: Dict[str, List[NavigateurDuPool]] = {}
+        self._playwright_manager = None
+        self._playwright = None
+
+    # === CYCLE DE VIE ===
+
+    def demarrer(self, types_navigateur: Optional[List[str]] = None) -> "PoolNavigateurs":
+        """Démarre Playwright et pré-lance les navigateurs demandés"""
+        from playwright.sync_api import sync_playwright
+
+        if self._playwright is None:
+            self._playwright_manager = sync_playwright()
+            self._playwright = self._playwright_manager.start()
+
+        for navigateur in types_navigateur or []:
+            self._completer(navigateur)
+        return self
+
+    def arreter(self) -> None:
+        """Ferme tous les navigateurs et arrête Playwright"""
+        for navigateurs in self.navigateurs.values():
+            for navigateur in navigateurs:
+                self._fermer(navigateur)
+        self.navigateurs = {}
+
+        if self._playwright_manager is not None:
+            self._playwright_manager.__exit__(None, None, None)
+            self._playwright_manager = None
+            self._playwright = None
+
+    def __enter__(self) -> "PoolNavigateurs":
+        return self.demarrer()
+
+    def __exit__(self, *exc_info) -> None:
+        self.arreter()
+
+    # === LANCEMENT / RECYCLAGE ===
+
+    def _lancer(self, navigateur: str) -> NavigateurDuPool:
+        """Lance un navigateur et identifie ses processus (pour la mesure RSS)"""
+        options = dict(self.options_lancement)
+        if navigateur == "msedge":
+            type_navigateur = self._playwright.chromium
+            options["channel"] = "msedge"
+        else:
+            type_navigateur = getattr(self._playwright, navigateur)
+
+        pids_avant = descendants(os.getpid())
+        browser = type_navigateur.launch(**options)
+        pids_navigateur = descendants(os.getpid()) - pids_avant
+
+        LOGGER.info("[PoolNavigateurs] 🚀 Navigateur %s lancé (%d processus)", navigateur, len(pids_navigateur))
+        return NavigateurDuPool(navigateur, browser, pids_navigateur)
+
+    def _fermer(self, navigateur: NavigateurDuPool) -> None:
+        """Ferme un navigateur sans propager d'erreur (navigateur déjà crashé)"""
+        try:
+            navigateur.browser.close()
+        except Exception as e:
+            LOGGER.debug("[PoolNavigateurs] Fermeture du navigateur impossible: %s", e)
+
+    def _completer(self, navigateur: str) -> List[NavigateurDuPool]:
+        """Remplace les navigateurs morts ou usés et complète le pool jusqu'à sa taille"""
+        navigateurs = self.navigateurs.setdefault(navigateur, [])
+
+        for membre in list(navigateurs):
+            if membre.contextes_actifs:
+                continue
+            raison = self._raison_recyclage(membre)
+            if raison:
+                LOGGER.info("[PoolNavigateurs] ♻️ Recyclage d'un navigateur %s (%s)", navigateur, raison)
+                navigateurs.remove(membre)
+                self._fermer(membre)
+
+        while len(navigateurs) < self.taille:
+            navigateurs.append(self._lancer(navigateur))
+        return navigateurs
+
+    def _raison_recyclage(self, membre: NavigateurDuPool) -> Optional[str]:
+        """Raison de recycler un navigateur, None s'il est réutilisable"""
+        if not membre.est_vivant():
+            return "navigateur déconnecté"
+        if membre.contextes_servis >= self.max_contextes:
+            return f"{membre.contextes_servis} contextes servis"
+        if self.rss_max_mo:
+            rss = membre.rss_mo()
+            if rss > self.rss_max_mo:
+                return f"RSS {rss:.0f} Mo > {self.rss_max_mo} Mo"
+        return None
+
+    # === CONTEXTES ===
+
+    @contextmanager
+    def contexte(self, navigateur: str, **options_contexte):
+        """
+        Fournit un contexte isolé sur un navigateur du pool.
+
+        Le contexte est fermé en sortie ; le navigateur reste lancé pour le scénario suivant.
+        """
+        navigateurs = [membre for membre in self._completer(navigateur) if membre.est_vivant()]
+        membre = min(navigateurs, key=lambda candidat: candidat.contextes_actifs)
+
+        context = membre.browser.new_context(**options_contexte)
+        membre.contextes_servis += 1
+        membre.contextes_actifs += 1
+        LOGGER.debug(
+            "[PoolNavigateurs] Contexte %s #%d ouvert", navigateur, membre.contextes_servis
+        )
+
+        try:
+            yield context
+        finally:
+            membre.contextes_actifs -= 1
+            try:
+                context.close()
+            except Exception as e:
+                # Navigateur crashé pendant le scénario : il sera remplacé au prochain contexte
+                LOGGER.warning("[PoolNavigateurs] ⚠️ Fermeture du contexte impossible: %s", e)
+
+
+# === PLUGIN PYTEST ===
+
+
+class PluginPoolNavigateurs:
+    """
+    Plugin pytest passé à `pytest.main(..., plugins=[...])` par le runner.
+
+    Fournit le pool aux fixtures des scénarios exécutés dans le même processus.
+    """
+
+    def __init__(self, pool: PoolNavigateurs):
+        self.pool = pool
+
+    @pytest.fixture(scope="session")
+    def pool_navigateurs(self) -> PoolNavigateurs:
+        """Pool de navigateurs du runner"""
+        return self.pool
+
+
+@pytest.fixture(scope="session")
+def contexte_navigateur(request, execution, politique_routage, journal_reseau):
+    """
+    Contexte du scénario : issu du pool du runner s'il est disponible,
+    sinon d'un navigateur lancé pour ce seul scénario.
+    """
+    try:
+        pool = request.getfixturevalue("pool_navigateurs")
+    except pytest.FixtureLookupError:
+        pool = None
+
+    # Pool du runner partagé (non arrêté ici) ou navigateur dédié à ce scénario
+    pool_local = None
+    if pool is None:
+        pool = pool_local = PoolNavigateurs(taille=1).demarrer()
+
+    try:
+        options_contexte = {**options_har(execution.config), **options_session(execution.config)}
+        with pool.contexte(execution.navigateur, **options_contexte) as context:
+            if politique_routage is not None:
+                politique_routage.installer(context)
+            if journal_reseau is not None:
+                journal_reseau.installer(context)
+            if execution.config.get("mesures_navigateur", True):
+                installer_observateurs(context)
+            yield context
+    finally:
+        if pool_local is not None:
+            pool_local.arreter()
+
+
+class PageScenario:
+    """
+    Page Playwright exposée aux scénarios : `screenshot(nom)` comme ScenarioPage,
+    le reste de l'API est délégué à la page.
+    """
+
+    def __init__(self, page, execution):
+        self._page = page
+        self._execution = execution
+        self._captures = (0, 0)  # (numéro d'étape, compteur de captures de l'étape)
+
+    def __getattr__(self, nom: str):
+        return getattr(self._page, nom)
+
+    def chemin_capture(self, nom: str) -> Optional[str]:
+        """Chemin de la prochaine capture de l'étape courante (None sans répertoire de captures)"""
+        if not self._execution.config.get("screenshot_dir"):
+            return None
+        numero_etape = self._execution.compteur_etape
+        compteur = self._captures[1] + 1 if self._captures[0] == numero_etape else 1
+        self._captures = (numero_etape, compteur)
+        return f"{self._execution.config['screenshot_dir']}/{numero_etape:02d}_{compteur:02d}_{nom}.png"
+
+    def screenshot(self, nom: Optional[str] = None, **options):
+        if nom is None or "path" in options:
+            return self._page.screenshot(**options)
+        chemin = self.chemin_capture(nom)
+        if chemin is None:
+            return None
+        self._page.screenshot(path=chemin, **options)
+        return chemin
+
+
+@pytest.fixture(scope="session")
+def page(execution, contexte_navigateur) -> PageScenario:
+    """
+    Page du scénario, ouverte sur le contexte du pool (remplace la fixture `page` de src.core).
+
+    Les installations de `contexte_navigateur` précèdent la première navigation.
+    """
+    page_playwright = contexte_navigateur.new_page()
+    if execution.config.get("url_initiale"):
+        page_playwright.goto(execution.config["url_initiale"])
+    return PageScenario(page_playwright, execution)
@@ -0,0 +1,126 @@
+"""
+preflight.py
+
+Sonde HTTP de disponibilité exécutée pendant l'initialisation, avant le lancement du navigateur.
+
+Une requête par URL (url_initiale puis preflight_urls) est envoyée avec le proxy
+et les http_credentials du scénario, sur une session à connexions poolées. Le
+résultat est classifié avec les types et codes d'erreurs.yaml.
+
+Configuration (config scénario) :
+- preflight : "desactive" (défaut), "avertir" (journaliser et continuer)
+  ou "bloquer" (arrêter le scénario avec un résultat en erreur)
+- preflight_urls : URL supplémentaires à sonder
+- preflight_timeout : timeout de lecture en secondes (défaut 10)
+"""
+
+import logging
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import requests
+import yaml
+from requests.adapters import HTTPAdapter
+
+from detection_reseau import FICHIER_ERREURS_DEFAUT, charger_descriptions_codes, classifier_status
+
+LOGGER = logging.getLogger(__name__)
+
+TIMEOUT_CONNEXION = 5
+DEFAUT_TIMEOUT_LECTURE = 10
+
+
+@lru_cache(maxsize=1)
+def _descriptions_types() -> Dict[str, str]:
+    """Table `descriptions_types` d'erreurs.yaml"""
+    try:
+        with open(FICHIER_ERREURS_DEFAUT, encoding="utf-8") as fichier:
+            return (yaml.safe_load(fichier) or {}).get("descriptions_types", {})
+    except (OSError, yaml.YAMLError):
+        return {}
+
+
+def _erreur_type(type_erreur: str, detail: str) -> Dict:
+    """Erreur classifiée par type (sans code HTTP)"""
+    description = _descriptions_types().get(type_erreur, type_erreur)
+    return {"code": None, "type": type_erreur, "description": f"{description} ({detail})"}
+
+
+def creer_session(config: Dict) -> requests.Session:
+    """Session HTTP avec le proxy et l'authentification basique du scénario"""
+    session = requests.Session()
+    adaptateur = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0)
+    session.mount("http://", adaptateur)
+    session.mount("https://", adaptateur)
+
+    proxy = config.get("proxy")
+    if isinstance(proxy, dict):
+        # Format Playwright : {"server": ..., "username": ..., "password": ...}
+        proxy = proxy.get("server")
+    if proxy:
+        session.proxies = {"http": proxy, "https": proxy}
+
+    credentials = config.get("http_credentials")
+    if credentials:
+        session.auth = (credentials.get("username"), credentials.get("password"))
+    return session
+
+
+def sonder_url(session: requests.Session, url: str, timeout_lecture: float) -> Optional[Dict]:
+    """
+    Sonde une URL ; le corps de la réponse n'est pas téléchargé.
+
+    Returns:
+        Optional[dict]: erreur classifiée (avec l'url) ou None si l'URL est disponible
+    """
+    descriptions_codes = charger_descriptions_codes()
+    try:
+        with session.get(url, timeout=(TIMEOUT_CONNEXION, timeout_lecture), stream=True) as reponse:
+            status = reponse.status_code
+    except requests.exceptions.SSLError as e:
+        erreur = _erreur_type("securite", type(e).__name__)
+    except requests.exceptions.Timeout as e:
+        erreur = _erreur_type("performance", type(e).__name__)
+    except requests.exceptions.RequestException as e:
+        erreur = _erreur_type("reseau", type(e).__name__)
+    else:
+        if status < 400:
+            return None
+        erreur = classifier_status(status, descriptions_codes)
+
+    erreur["url"] = url
+    return erreur
+
+
+def verifier_disponibilite(config: Dict) -> List[Dict]:
+    """
+    Sonde url_initiale et les preflight_urls du scénario.
+
+    Returns:
+        List[dict]: erreurs classifiées (liste vide si tout est disponible)
+    """
+    urls = [url for url in [config.get("url_initiale"), *(config.get("preflight_urls") or [])] if url]
+    timeout_lecture = config.get("preflight_timeout", DEFAUT_TIMEOUT_LECTURE)
+
+    erreurs = []
+    with creer_session(config) as session:
+        for url in urls:
+            debut = time.perf_counter()
+            erreur = sonder_url(session, url, timeout_lecture)
+            LOGGER.info(
+                "[verifier_disponibilite] %s %s (%.0f ms)",
+                "❌" if erreur else "✅",
+                url,
+                (time.perf_counter() - debut) * 1000,
+            )
+            if erreur:
+                erreurs.append(erreur)
+    return erreurs
+
+
+def message_erreur(erreur: Dict) -> str:
+    """Commentaire de résultat pour une erreur de disponibilité"""
+    if erreur["code"] is None:
+        return f"Application indisponible : {erreur['description']} sur {erreur['url']}"
+    return f"Application indisponible : erreur {erreur['code']} ({erreur['description']}) sur {erreur['url']}"
@@ -0,0 +1,208 @@
+"""
+progression.py
+
+Envoi en direct de la progression d'une exécution vers ISAC (début et fin de chaque étape).
+
+Le rapport complet n'est inscrit qu'en fin de scénario : ce flux permet aux
+tableaux de bord de suivre une exécution longue et de repérer un scénario bloqué.
+
+- le thread du test ne fait qu'ajouter l'événement dans un tampon (jamais d'I/O)
+- un thread d'envoi expédie les événements par lots (toutes les `intervalle`
+  secondes ou dès qu'un lot est plein)
+- coalescence : un événement remplace celui de la même étape encore en attente
+  (la fin d'une étape remplace son début non envoyé)
+- contre-pression : tampon plein ou endpoint en échec, les événements sont abandonnés
+- battement : sans événement depuis `battement` secondes, un lot vide indique
+  l'étape en cours et depuis quand
+
+Configuration (config scénario) :
+- progression_url : endpoint de progression (flux désactivé si absent)
+- progression_intervalle : délai maximal avant envoi d'un lot (défaut 1 s)
+- progression_battement : intervalle du battement (défaut 30 s)
+
+Serveur de test local : benchmarks/stub_progression.py
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from encodage_rapport import encoder_json
+from enregistrements import EnregistrementEtape
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAUT_INTERVALLE = 1.0
+DEFAUT_BATTEMENT = 30.0
+TAILLE_LOT = 50
+CAPACITE = 1000
+TIMEOUT_ENVOI = 2.0
+CLE_SCENARIO = "__scenario__"
+
+
+class FluxProgression(threading.Thread):
+    """
+    Flux de progression d'une exécution (un par exécution).
+
+    Args:
+        url: endpoint recevant les lots (POST JSON)
+        entete: identification de l'exécution, reprise dans chaque lot
+        intervalle: délai maximal avant l'envoi des événements en attente
+        battement: intervalle du battement sans événement
+        capacite: nombre maximal d'événements en attente
+    """
+
+    def __init__(
+        self,
+        url: str,
+        entete: Dict,
+        intervalle: float = DEFAUT_INTERVALLE,
+        battement: float = DEFAUT_BATTEMENT,
+        capacite: int = CAPACITE,
+    ):
+        super().__init__(name="flux_progression", daemon=True)
+        self.url = url
+        self.entete = entete
+        self.intervalle = intervalle
+        self.battement = battement
+        self.capacite = capacite
+        self.envoyes = 0
+        self.abandonnes = 0
+        self._en_attente: "OrderedDict[str, Dict]" = OrderedDict()
+        self._etape_en_cours: Optional[Dict] = None
+        self._verrou = threading.Lock()
+        self._lot_pret = threading.Event()
+        self._arret = threading.Event()
+        self._dernier_envoi = time.monotonic()
+        self._session = requests.Session()
+        adaptateur = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+        self._session.mount("http://", adaptateur)
+        self._session.mount("https://", adaptateur)
+
+    # === CÔTÉ TEST (non bloquant) ===
+
+    def _publier(self, cle: str, evenement: Dict) -> None:
+        with self._verrou:
+            if cle in self._en_attente:
+                self._en_attente[cle] = evenement
+                return
+            if len(self._en_attente) >= self.capacite:
+                self.abandonnes += 1
+                return
+            self._en_attente[cle] = evenement
+            if len(self._en_attente) >= TAILLE_LOT:
+                self._lot_pret.set()
+
+    def debut_etape(self, nom: str) -> None:
+        maintenant = datetime.now().isoformat()
+        self._etape_en_cours = {"nom": nom, "depuis": maintenant}
+        self._publier(nom, {"type": "debut", "nom": nom, "date": maintenant})
+
+    def fin_etape(self, etape: EnregistrementEtape) -> None:
+        self._etape_en_cours = None
+        self._publier(
+            etape.nom,
+            {
+                "type": "fin",
+                "nom": etape.nom,
+                "ordre": etape.ordre,
+                "date": etape.date.isoformat(),
+                "duree": etape.duree,
+                "status": int(etape.status),
+                "commentaire": etape.commentaire,
+            },
+        )
+
+    def arreter(self, status: int) -> None:
+        """Publie la fin de l'exécution, envoie les derniers événements et arrête le thread"""
+        self._publier(CLE_SCENARIO, {"type": "fin_scenario", "status": status, "date": datetime.now().isoformat()})
+        self._arret.set()
+        self._lot_pret.set()
+        self.join(timeout=TIMEOUT_ENVOI + 1)
+        self._session.close()
+        LOGGER.info(
+            "[FluxProgression] %d événement(s) envoyé(s), %d abandonné(s)", self.envoyes, self.abandonnes
+        )
+
+    # === THREAD D'ENVOI ===
+
+    def _extraire_lot(self) -> List[Dict]:
+        with self._verrou:
+            lot = []
+            while self._en_attente and len(lot) < TAILLE_LOT:
+                lot.append(self._en_attente.popitem(last=False)[1])
+            return lot
+
+    def _envoyer(self, evenements: List[Dict]) -> bool:
+        self._dernier_envoi = time.monotonic()
+        lot = {
+            **self.entete,
+            "envoi": datetime.now().isoformat(),
+            "etape_en_cours": self._etape_en_cours,
+            "evenements": evenements,
+        }
+        try:
+            reponse = self._session.post(
+                self.url,
+                data=encoder_json(lot),
+                headers={"Content-Type": "application/json"},
+                timeout=TIMEOUT_ENVOI,
+            )
+            reponse.raise_for_status()
+        except requests.RequestException as e:
+            LOGGER.debug("[FluxProgression] Lot de %d événement(s) abandonné: %s", len(evenements), e)
+            with self._verrou:
+                self.abandonnes += len(evenements)
+            return False
+        self.envoyes += len(evenements)
+        return True
+
+    def _vider(self) -> None:
+        # Endpoint en échec : le reste du tampon n'est pas réessayé dans ce cycle
+        lot = self._extraire_lot()
+        while lot and self._envoyer(lot):
+            lot = self._extraire_lot()
+
+    def run(self) -> None:
+        while not self._arret.is_set():
+            self._lot_pret.wait(self.intervalle)
+            self._lot_pret.clear()
+            if self._en_attente:
+                self._vider()
+            elif time.monotonic() - self._dernier_envoi >= self.battement:
+                self._envoyer([])
+        self._vider()
+
+
+def ouvrir_flux_progression(config: Dict, entete: Dict) -> Optional[FluxProgression]:
+    """Flux de progression démarré (None si config progression_url absente)"""
+    url = config.get("progression_url")
+    if not url:
+        return None
+    flux = FluxProgression(
+        url,
+        entete,
+        intervalle=config.get("progression_intervalle", DEFAUT_INTERVALLE),
+        battement=config.get("progression_battement", DEFAUT_BATTEMENT),
+    )
+    flux.start()
+    LOGGER.info("[ouvrir_flux_progression] Progression envoyée à %s", url)
+    return flux
+
+
+# === FIXTURE PYTEST ===
+
+
+@pytest.fixture(scope="function", autouse=True)
+def progression_etape(execution, etape):
+    """Début de l'étape envoyé au flux de progression (la fin l'est par Execution.ajoute_etape)"""
+    if execution.progression is not None:
+        execution.progression.debut_etape(etape.etape.nom)
+    yield
@@ -0,0 +1,323 @@
+"""
+registre_locators.py
+
+Registre par page des frame locators et des locators nommés des scénarios.
+
+- Les frame locators et locators construits sont mis en cache et réutilisés
+  d'une étape à l'autre ; le cache est vidé à chaque navigation de la frame principale.
+- Mode apprentissage (optionnel) : le chemin CSS de l'élément résolu par un locator
+  par rôle ou par texte est enregistré en fin d'étape. Aux exécutions suivantes,
+  ce chemin est essayé en premier ; s'il ne désigne pas exactement un élément au
+  texte attendu, la requête par rôle est utilisée. Le choix est fait à la première
+  utilisation du locator (action ou assertion), pas à sa construction, et refait
+  après une navigation de la page (tous les locators) ou d'une iframe (locators
+  des iframes).
+
+Utilisation depuis un scénario (fixture `registre_locators`, rattachée à la page : page.registre) :
+
+    from registre_locators import expect
+
+    def test_accueil(self, page, registre_locators):
+        lien = registre_locators.par_role("link", name="Consulter une demande", frame='iframe[name="iframe_principale"]')
+        expect(lien).to_be_visible()
+
+Les locators par rôle ou par texte sont des LocatorDiffere (proxy vers le Locator
+choisi) : l'`expect` de ce module les résout avant de déléguer à celui de Playwright
+et rattache la clé du registre à l'assertion (clé d'historique des timeouts adaptatifs,
+stable quelle que soit la stratégie choisie).
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytest
+
+LOGGER = logging.getLogger(__name__)
+
+SOUS_REPERTOIRE_APPRENTISSAGE = "apprentissage_locators"
+LONGUEUR_MAX_TEXTE = 200
+
+# Chemin CSS (id le plus proche puis nth-of-type) et texte de l'élément unique
+SCRIPT_CHEMIN_CSS = """
+(elements, longueurMax) => {
+    if (elements.length !== 1) return null;
+    let el = elements[0];
+    const texte = (el.textContent || '').trim().slice(0, longueurMax);
+    const parties = [];
+    while (el && el.nodeType === 1 && el !== document.documentElement) {
+        if (el.id) {
+            parties.unshift('#' + CSS.escape(el.id));
+            break;
+        }
+        let rang = 1;
+        for (let frere = el.previousElementSibling; frere; frere = frere.previousElementSibling) {
+            if (frere.tagName === el.tagName) rang++;
+        }
+        parties.unshift(el.tagName.toLowerCase() + ':nth-of-type(' + rang + ')');
+        el = el.parentElement;
+    }
+    return [parties.join(' > '), texte];
+}
+"""
+
+SCRIPT_VERIFICATION = """
+(elements, [texte, longueurMax]) =>
+    elements.length === 1 && (elements[0].textContent || '').trim().slice(0, longueurMax) === texte
+"""
+
+
+class ApprentissageCss:
+    """Chemins CSS appris par clé de locator, persistés dans un fichier JSON par scénario"""
+
+    def __init__(self, chemin_fichier: str):
+        self.chemin_fichier = Path(chemin_fichier)
+        self.chemins: Dict[str, List[str]] = {}
+        self._modifie = False
+
+    def charger(self) -> "ApprentissageCss":
+        try:
+            with open(self.chemin_fichier, encoding="utf-8") as fichier:
+                self.chemins = json.load(fichier)
+        except FileNotFoundError:
+            self.chemins = {}
+        except (OSError, ValueError) as e:
+            LOGGER.warning("[ApprentissageCss] ⚠️ Fichier d'apprentissage illisible, ignoré: %s", e)
+            self.chemins = {}
+        return self
+
+    def memoriser(self, cle: str, chemin_css: str, texte: str) -> None:
+        if self.chemins.get(cle) != [chemin_css, texte]:
+            self.chemins[cle] = [chemin_css, texte]
+            self._modifie = True
+
+    def oublier(self, cle: str) -> None:
+        if self.chemins.pop(cle, None) is not None:
+            self._modifie = True
+
+    def enregistrer(self) -> None:
+        if not self._modifie:
+            return
+        self.chemin_fichier.parent.mkdir(parents=True, exist_ok=True)
+        temporaire = self.chemin_fichier.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporaire, "w", encoding="utf-8") as fichier:
+            json.dump(self.chemins, fichier, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporaire, self.chemin_fichier)
+        self._modifie = False
+
+
+class LocatorDiffere:
+    """
+    Locator du registre : la stratégie (chemin CSS appris ou requête d'origine) est choisie
+    à la première utilisation, puis de nouveau après une navigation qui l'invalide.
+
+    Proxy : les actions et méthodes de Locator sont déléguées au locator choisi
+    (`resoudre()`) ; les assertions passent par `expect` de ce module.
+    """
+
+    __slots__ = ("_registre", "cle", "_frame", "_fabrique", "_resolu", "_generation")
+
+    def __init__(self, registre: "RegistreLocators", cle: str, frame: Optional[str], fabrique: Callable):
+        self._registre = registre
+        self.cle = cle
+        self._frame = frame
+        self._fabrique = fabrique
+        self._resolu = None
+        self._generation: Optional[Tuple[int, int]] = None
+
+    def resoudre(self):
+        """Locator choisi (vérification du chemin appris au premier appel après invalidation)"""
+        generation = self._registre.generation(self._frame)
+        if self._resolu is None or self._generation != generation:
+            self._resolu = self._registre.resoudre(self.cle, self._frame, self._fabrique)
+            self._generation = generation
+        return self._resolu
+
+    def __getattr__(self, nom: str):
+        return getattr(self.resoudre(), nom)
+
+    def __repr__(self) -> str:
+        return f"<LocatorDiffere {self.cle}>"
+
+
+def resoudre_locator(cible: Any) -> Any:
+    """Locator Playwright d'une cible (LocatorDiffere résolu, autre objet inchangé)"""
+    return cible.resoudre() if isinstance(cible, LocatorDiffere) else cible
+
+
+def expect(cible, message: Optional[str] = None):
+    """`expect` de Playwright acceptant les locators du registre (clé du registre dans `cle_registre`)"""
+    from playwright.sync_api import expect as expect_playwright
+
+    assertions = expect_playwright(resoudre_locator(cible), message)
+    if isinstance(cible, LocatorDiffere):
+        assertions.cle_registre = cible.cle
+    return assertions
+
+
+class RegistreLocators:
+    """Cache des frame locators et locators d'une page Playwright"""
+
+    def __init__(self, page, apprentissage: Optional[ApprentissageCss] = None):
+        self.page = page
+        self.apprentissage = apprentissage
+        self._frames: Dict[str, object] = {}
+        self._locators: Dict[str, object] = {}
+        # Locators par rôle/texte résolus par la requête d'origine : à apprendre en fin d'étape
+        self._a_apprendre: Dict[str, object] = {}
+        # Compteurs de navigations (page, iframes) : invalident les choix des LocatorDiffere
+        self._navigations_page = 0
+        self._navigations_frames = 0
+        page.on("framenavigated", self._sur_navigation)
+
+    def _sur_navigation(self, frame) -> None:
+        """
+        Navigation de la frame principale : les entrées du registre sont invalidées ;
+        navigation d'une iframe : les locators des iframes seront revérifiés.
+        """
+        if frame.parent_frame is None:
+            self.invalider()
+        else:
+            self._navigations_frames += 1
+
+    def invalider(self) -> None:
+        self._frames.clear()
+        self._locators.clear()
+        self._navigations_page += 1
+
+    def generation(self, frame: Optional[str]) -> Tuple[int, int]:
+        """Navigations qui concernent un locator de la page (frame None) ou d'une iframe"""
+        return self._navigations_page, self._navigations_frames if frame is not None else 0
+
+    # === FRAMES ===
+
+    def frame(self, selecteur: str):
+        """Frame locator mis en cache"""
+        frame_locator = self._frames.get(selecteur)
+        if frame_locator is None:
+            frame_locator = self._frames[selecteur] = self.page.frame_locator(selecteur)
+        return frame_locator
+
+    def _racine(self, frame: Optional[str]):
+        return self.page if frame is None else self.frame(frame)
+
+    # === LOCATORS ===
+
+    def nomme(self, nom: str, fabrique: Callable[[], object]):
+        """Locator nommé, construit par `fabrique` au premier appel"""
+        locator = self._locators.get(nom)
+        if locator is None:
+            locator = self._locators[nom] = fabrique()
+        return locator
+
+    def par_role(self, role: str, frame: Optional[str] = None, **options):
+        """Équivalent de get_by_role, avec cache et apprentissage du chemin CSS"""
+        cle = self._cle("role", role, frame, options)
+        return self._locator_appris(cle, frame, lambda racine: racine.get_by_role(role, **options))
+
+    def par_texte(self, texte: str, frame: Optional[str] = None, exact: Optional[bool] = None):
+        """Équivalent de get_by_text, avec cache et apprentissage du chemin CSS"""
+        cle = self._cle("texte", texte, frame, {"exact": exact})
+        return self._locator_appris(cle, frame, lambda racine: racine.get_by_text(texte, exact=exact))
+
+    @staticmethod
+    def _cle(type_locator: str, valeur: str, frame: Optional[str], options: Dict) -> str:
+        options_triees = ",".join(f"{nom}={options[nom]}" for nom in sorted(options) if options[nom] is not None)
+        return f"{frame or ''}|{type_locator}={valeur}|{options_triees}"
+
+    def _locator_appris(self, cle: str, frame: Optional[str], fabrique: Callable):
+        locator = self._locators.get(cle)
+        if locator is None:
+            locator = self._locators[cle] = LocatorDiffere(self, cle, frame, fabrique)
+        return locator
+
+    def resoudre(self, cle: str, frame: Optional[str], fabrique: Callable):
+        """Locator CSS appris s'il est vérifié sur la page actuelle, sinon requête d'origine (à apprendre)"""
+        racine = self._racine(frame)
+        locator = self._essayer_chemin_appris(cle, racine)
+        if locator is None:
+            locator = fabrique(racine)
+            if self.apprentissage is not None:
+                self._a_apprendre[cle] = locator
+        return locator
+
+    def _essayer_chemin_appris(self, cle: str, racine):
+        """Locator CSS appris s'il désigne exactement un élément au texte attendu, sinon None"""
+        if self.apprentissage is None or cle not in self.apprentissage.chemins:
+            return None
+
+        chemin_css, texte = self.apprentissage.chemins[cle]
+        locator_css = racine.locator(chemin_css)
+        try:
+            valide = locator_css.evaluate_all(SCRIPT_VERIFICATION, [texte, LONGUEUR_MAX_TEXTE])
+        except Exception:
+            valide = False
+
+        if not valide:
+            LOGGER.debug("[RegistreLocators] Chemin appris non vérifié pour %s - requête d'origine", cle)
+            return None
+        return locator_css
+
+    def apprendre(self) -> None:
+        """Mémorise le chemin CSS des locators résolus par la requête d'origine (fin d'étape)"""
+        if self.apprentissage is None:
+            return
+
+        for cle, locator in self._a_apprendre.items():
+            try:
+                resultat: Optional[Tuple[str, str]] = locator.evaluate_all(SCRIPT_CHEMIN_CSS, LONGUEUR_MAX_TEXTE)
+            except Exception as e:
+                LOGGER.debug("[RegistreLocators] Apprentissage impossible pour %s: %s", cle, e)
+                continue
+            if resultat:
+                self.apprentissage.memoriser(cle, *resultat)
+        self._a_apprendre.clear()
+
+
+def charger_apprentissage(config: Dict) -> Optional[ApprentissageCss]:
+    """Chemins CSS appris du scénario (config apprentissage_locators, défaut False)"""
+    if not config.get("apprentissage_locators") or not config.get("output_path"):
+        return None
+    return ApprentissageCss(
+        f"{config['output_path']}/{SOUS_REPERTOIRE_APPRENTISSAGE}/{config.get('nom_scenario', 'inconnu')}.json"
+    ).charger()
+
+
+# === FIXTURES PYTEST ===
+
+
+@pytest.fixture(scope="session")
+def apprentissage_locators(execution) -> Optional[ApprentissageCss]:
+    """Chemins CSS appris du scénario, enregistrés en fin de scénario"""
+    apprentissage = charger_apprentissage(execution.config)
+    yield apprentissage
+    if apprentissage is None:
+        return
+
+    try:
+        apprentissage.enregistrer()
+    except OSError as e:
+        LOGGER.warning("[apprentissage_locators] ⚠️ Enregistrement impossible: %s", e)
+
+
+@pytest.fixture(scope="function")
+def registre_locators(request, apprentissage_locators) -> RegistreLocators:
+    """Registre de la page du scénario, créé au premier appel et rattaché à la page (page.registre)"""
+    page = request.getfixturevalue("page")
+    registre = getattr(page, "registre", None)
+    if not isinstance(registre, RegistreLocators):
+        registre = RegistreLocators(page, apprentissage_locators)
+        page.registre = registre
+    return registre
+
+
+@pytest.fixture(scope="function", autouse=True)
+def apprentissage_etape(request):
+    """En fin d'étape, apprend les chemins CSS des locators résolus du registre de la page"""
+    yield
+
+    registre = getattr(request.node.funcargs.get("page"), "registre", None)
+    if isinstance(registre, RegistreLocators):
+        registre.apprendre()
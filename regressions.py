@@ -0,0 +1,159 @@
+"""
+regressions.py
+
+Détection des régressions de latence par rapport à l'historique local des durées.
+
+Le statut d'une exécution ne dépend que du statut de sa dernière étape : un
+scénario passé de 4 s à 40 s reste un SUCCÈS. Chaque étape terminée est donc
+comparée à sa référence (médiane et MAD des dernières durées sans erreur, voir
+historique.py), chargée une fois pour tout le scénario : la comparaison est en
+O(1) par étape et se fait au fil de l'eau dans `Execution.ajoute_etape`.
+
+Une étape est en régression si sa durée dépasse le plus grand de ces seuils :
+- médiane + seuil_mad * 1.4826 * MAD (écart robuste, 1.4826 * MAD ≈ écart-type)
+- médiane * facteur (écart relatif minimal)
+- médiane + ECART_MIN_MS (écart absolu minimal, évite les alertes sur des étapes très courtes)
+
+Configuration (config scénario) :
+- regression_durees : active la détection (défaut True, nécessite output_path)
+- regression_seuil_mad / regression_facteur : seuils (défaut 3.0 / 1.5)
+- regression_escalade : "scenario" (défaut, le scénario en SUCCÈS passe en
+  AVERTISSEMENT), "etape" (les étapes en régression et le scénario),
+  "aucune" (section `regression` des étapes seulement)
+"""
+
+import logging
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from enregistrements import EnregistrementEtape, StatutEtape
+from historique import HistoriqueDurees, chemin_base
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAUT_SEUIL_MAD = 3.0
+DEFAUT_FACTEUR = 1.5
+ECART_MIN_MS = 500
+MIN_ECHANTILLONS = 20
+# MAD -> écart-type d'une distribution normale
+COEFFICIENT_MAD = 1.4826
+
+ESCALADE_AUCUNE = "aucune"
+ESCALADE_SCENARIO = "scenario"
+ESCALADE_ETAPE = "etape"
+ESCALADES_VALIDES = [ESCALADE_AUCUNE, ESCALADE_SCENARIO, ESCALADE_ETAPE]
+
+
+def _completer(commentaire: str, ajout: str) -> str:
+    return f"{commentaire} - {ajout}" if commentaire else ajout
+
+
+class DetecteurRegressions:
+    """
+    Comparaison des durées d'étapes aux références d'un scénario.
+
+    Args:
+        references: {étape: (médiane ms, MAD ms, nombre d'échantillons)}
+        seuil_mad: nombre d'écarts robustes au-delà de la médiane
+        facteur: rapport minimal à la médiane
+        escalade: ESCALADE_AUCUNE, ESCALADE_SCENARIO ou ESCALADE_ETAPE
+    """
+
+    def __init__(
+        self,
+        references: Dict[str, Tuple[float, float, int]],
+        seuil_mad: float = DEFAUT_SEUIL_MAD,
+        facteur: float = DEFAUT_FACTEUR,
+        escalade: str = ESCALADE_SCENARIO,
+        min_echantillons: int = MIN_ECHANTILLONS,
+    ):
+        # Seuil pré-calculé par étape : une comparaison par étape terminée
+        self.seuils = {
+            etape: (max(mediane + seuil_mad * COEFFICIENT_MAD * mad, mediane * facteur, mediane + ECART_MIN_MS), mediane)
+            for etape, (mediane, mad, nombre) in references.items()
+            if nombre >= min_echantillons
+        }
+        self.escalade = escalade
+        self.regressions: List[str] = []
+
+    def verifier(self, etape: EnregistrementEtape) -> Optional[Dict]:
+        """
+        Compare la durée d'une étape terminée à sa référence.
+
+        Une étape en régression reçoit une section `regression` et, en escalade
+        "etape", passe de SUCCÈS à AVERTISSEMENT ; son statut et son commentaire
+        d'avant l'escalade sont gardés dans la section (status_initial, commentaire_initial).
+
+        Returns:
+            Optional[dict]: la section `regression` ou None
+        """
+        seuil = self.seuils.get(etape.nom)
+        if seuil is None or etape.status not in (StatutEtape.SUCCES, StatutEtape.AVERTISSEMENT):
+            return None
+        seuil_ms, mediane_ms = seuil
+        duree_ms = etape.duree * 1000
+        if duree_ms <= seuil_ms:
+            return None
+
+        regression = {
+            "duree_ms": round(duree_ms, 1),
+            "mediane_ms": round(mediane_ms, 1),
+            "seuil_ms": round(seuil_ms, 1),
+            "rapport": round(duree_ms / mediane_ms, 2) if mediane_ms else None,
+        }
+        etape["regression"] = regression
+        self.regressions.append(etape.nom)
+        LOGGER.warning(
+            "[DetecteurRegressions] ⚠️ Étape '%s' en régression : %.0f ms (médiane %.0f ms, seuil %.0f ms)",
+            etape.nom, duree_ms, mediane_ms, seuil_ms,
+        )
+
+        if self.escalade == ESCALADE_ETAPE and etape.status == StatutEtape.SUCCES:
+            regression["status_initial"] = int(etape.status)
+            regression["commentaire_initial"] = etape.commentaire
+            etape.status = StatutEtape.AVERTISSEMENT
+            etape.commentaire = _completer(etape.commentaire, "dégradation de performance")
+        return regression
+
+    @staticmethod
+    def statut_initial(etape: EnregistrementEtape) -> Tuple[int, str]:
+        """Statut et commentaire fonctionnels d'une étape, avant une escalade "etape" """
+        regression = etape.get("regression") or {}
+        if "status_initial" in regression:
+            return regression["status_initial"], regression["commentaire_initial"]
+        return int(etape.status), etape.commentaire
+
+    def escalader(self, status: int, commentaire: str) -> Tuple[int, str]:
+        """Statut et commentaire du scénario après escalade (inchangés sans régression)"""
+        if not self.regressions or self.escalade == ESCALADE_AUCUNE or status != StatutEtape.SUCCES:
+            return status, commentaire
+        etapes = ", ".join(self.regressions)
+        return int(StatutEtape.AVERTISSEMENT), _completer(commentaire, f"Dégradation de performance : {etapes}")
+
+
+def creer_detecteur(config: Dict) -> Optional[DetecteurRegressions]:
+    """Détecteur chargé avec les références du scénario (None si désactivé ou sans historique)"""
+    if not config.get("regression_durees", True) or not config.get("output_path"):
+        return None
+    chemin = chemin_base(config["output_path"])
+    if not chemin.exists():
+        return None
+
+    escalade = config.get("regression_escalade", ESCALADE_SCENARIO)
+    if escalade not in ESCALADES_VALIDES:
+        LOGGER.warning("[creer_detecteur] ⚠️ regression_escalade inconnue (%s), '%s' appliquée", escalade, ESCALADE_SCENARIO)
+        escalade = ESCALADE_SCENARIO
+
+    try:
+        with HistoriqueDurees(chemin) as historique:
+            references = historique.references(config.get("nom_scenario", ""))
+    except (OSError, sqlite3.Error) as e:
+        LOGGER.warning("[creer_detecteur] ⚠️ Références des durées non chargées: %s", e)
+        return None
+
+    return DetecteurRegressions(
+        references,
+        seuil_mad=config.get("regression_seuil_mad", DEFAUT_SEUIL_MAD),
+        facteur=config.get("regression_facteur", DEFAUT_FACTEUR),
+        escalade=escalade,
+    )
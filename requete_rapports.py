@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+requete_rapports.py
+
+Requêtes sur l'historique des rapports (output_path/rapports) à partir d'un cache en colonnes.
+
+Le cache (output_path/cache_rapports) contient une partition NumPy par jour
+(<AAAA-MM-JJ>.npz) : les étapes de tous les scenario.json du jour, en colonnes
+(application, scénario et étape encodés par dictionnaire, statut, instant,
+durée en ms, indice de l'exécution). Une requête ne lit que les partitions
+de sa période : son coût ne dépend pas du nombre de fichiers JSON.
+
+Maintenance incrémentale (`actualiser`) :
+- une partition est reconstruite quand la signature de son jour change
+  (mtime des répertoires rapports/<app>/<scenario>/<jour>, modifiés à la création de chaque exécution)
+- les jours récents (JOURS_INSTABLES) sont en plus vérifiés rapport par rapport :
+  une exécution en cours écrit son scenario.json après la création de son répertoire
+- les partitions des jours supprimés de rapports/ (rétention) sont conservées
+- une partition reconstruite garde les lignes des exécutions qu'elle contenait et
+  dont le rapport a été supprimé depuis (rétention partielle d'un jour) : chaque
+  partition garde le chemin du rapport de chaque exécution
+
+Filtres : application, scénario, étape (motifs fnmatch), statuts, période, durée minimale.
+Regroupements : application, scenario, etape, status, jour. Agrégats : nombre,
+erreurs, moyenne, p50, p95, p99, max (ms). `--comparer` confronte une période à la
+précédente (étapes ralenties). Export CSV, NPZ (colonnes) ou Parquet (pyarrow si installé).
+
+Usage :
+    python requete_rapports.py --application AAI2 --depuis 7j --groupe scenario etape
+    python requete_rapports.py --application AAI2 --comparer 7j --seuil 1.2
+    python requete_rapports.py --scenario 'AAI2_*' --depuis 30j --export etapes.csv
+"""
+
+import argparse
+import csv
+import fnmatch
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from historique import parser_fenetre
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    pyarrow = None
+
+LOGGER = logging.getLogger(__name__)
+
+SOUS_REPERTOIRE_CACHE = "cache_rapports"
+NOM_MANIFESTE = "manifeste.json"
+NOM_RAPPORT = "scenario.json"
+VERSION_CACHE = 1
+JOURS_INSTABLES = 2
+LECTEURS = 8
+
+COLONNES_TEXTE = ("application", "scenario", "etape")
+REGROUPEMENTS = COLONNES_TEXTE + ("status", "jour")
+PERCENTILES = (50, 95, 99)
+
+
+# === CONSTRUCTION DES PARTITIONS ===
+
+
+def _lire(chemin: str) -> Optional[Dict]:
+    try:
+        with open(chemin, "rb") as fichier:
+            contenu = fichier.read()
+        return orjson.loads(contenu) if orjson is not None else json.loads(contenu)
+    except (OSError, ValueError) as e:
+        LOGGER.warning("[requete_rapports] ⚠️ Rapport illisible ignoré %s: %s", chemin, e)
+        return None
+
+
+def _instant(valeur, defaut: float) -> float:
+    try:
+        return datetime.fromisoformat(valeur).timestamp()
+    except (TypeError, ValueError):
+        return defaut
+
+
+def _encoder(valeurs: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encodage par dictionnaire : (dictionnaire trié, codes int32)"""
+    dictionnaire, codes = np.unique(np.array(valeurs, dtype=np.str_), return_inverse=True)
+    return dictionnaire, codes.astype(np.int32).ravel()
+
+
+def construire_partition(rapports: List[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+    """
+    Colonnes d'une partition à partir des rapports d'un jour.
+
+    Args:
+        rapports: (chemin du scenario.json, application)
+    """
+    textes: Dict[str, List[str]] = {colonne: [] for colonne in COLONNES_TEXTE}
+    status, instants, durees, executions = [], [], [], []
+
+    with ThreadPoolExecutor(max_workers=LECTEURS) as lecteurs:
+        contenus = lecteurs.map(_lire, (chemin for chemin, _ in rapports))
+        for indice, ((chemin, application), rapport) in enumerate(zip(rapports, contenus)):
+            if rapport is None:
+                continue
+            scenario = rapport.get("scenario") or Path(chemin).parents[2].name
+            instant_execution = _instant(rapport.get("date"), os.path.getmtime(chemin))
+            for brique in rapport.get("briques") or []:
+                textes["application"].append(application)
+                textes["scenario"].append(scenario)
+                textes["etape"].append(str(brique.get("nom", "")))
+                status.append(int(brique.get("status", 3)))
+                instants.append(_instant(brique.get("date"), instant_execution))
+                durees.append(float(brique.get("duree") or 0) * 1000)
+                executions.append(indice)
+
+    partition: Dict[str, np.ndarray] = {}
+    for colonne, valeurs in textes.items():
+        partition[f"dict_{colonne}"], partition[colonne] = _encoder(valeurs)
+    partition["status"] = np.array(status, dtype=np.int8)
+    partition["instant"] = np.array(instants, dtype=np.float64)
+    partition["duree"] = np.array(durees, dtype=np.float32)
+    partition["execution"] = np.array(executions, dtype=np.int32)
+    partition["chemins"] = np.array([chemin for chemin, _ in rapports], dtype=np.str_)
+    return partition
+
+
+def conserver_executions_supprimees(ancienne: Dict[str, np.ndarray], nouvelle: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Ajoute à la nouvelle partition d'un jour les lignes de l'ancienne dont le
+    rapport n'existe plus (exécutions supprimées par la rétention).
+    """
+    if "chemins" not in ancienne:
+        return nouvelle
+    presents = set(nouvelle["chemins"].tolist())
+    anciens = ancienne["chemins"].tolist()
+    gardees = [indice for indice, chemin in enumerate(anciens) if chemin not in presents and not os.path.exists(chemin)]
+    if not gardees:
+        return nouvelle
+
+    lignes = np.isin(ancienne["execution"], gardees)
+    renumerotation = np.full(len(anciens), -1, dtype=np.int32)
+    renumerotation[gardees] = np.arange(len(gardees), dtype=np.int32) + nouvelle["chemins"].size
+
+    partition: Dict[str, np.ndarray] = {}
+    for colonne in COLONNES_TEXTE:
+        valeurs = np.concatenate((
+            nouvelle[f"dict_{colonne}"][nouvelle[colonne]],
+            ancienne[f"dict_{colonne}"][ancienne[colonne][lignes]],
+        ))
+        partition[f"dict_{colonne}"], partition[colonne] = _encoder(valeurs.tolist())
+    for colonne in ("status", "instant", "duree"):
+        partition[colonne] = np.concatenate((nouvelle[colonne], ancienne[colonne][lignes]))
+    partition["execution"] = np.concatenate((nouvelle["execution"], renumerotation[ancienne["execution"][lignes]]))
+    partition["chemins"] = np.concatenate((nouvelle["chemins"], np.array(anciens, dtype=np.str_)[gardees]))
+    return partition
+
+
+# === CACHE ===
+
+
+class CacheRapports:
+    """Cache en colonnes des rapports, une partition par jour"""
+
+    def __init__(self, racine_rapports: Path, repertoire_cache: Path):
+        # Chemins absolus : les partitions gardent le chemin des rapports (indépendant du répertoire courant)
+        self.racine = Path(racine_rapports).resolve()
+        self.repertoire = repertoire_cache
+        self.repertoire.mkdir(parents=True, exist_ok=True)
+        self.chemin_manifeste = self.repertoire / NOM_MANIFESTE
+        self.manifeste = self._charger_manifeste()
+
+    def _charger_manifeste(self) -> Dict:
+        try:
+            manifeste = json.loads(self.chemin_manifeste.read_text(encoding="utf-8"))
+            if manifeste.get("version") == VERSION_CACHE:
+                return manifeste
+        except (OSError, ValueError):
+            pass
+        return {"version": VERSION_CACHE, "jours": {}}
+
+    def _enregistrer_manifeste(self) -> None:
+        temporaire = self.chemin_manifeste.with_suffix(f".{os.getpid()}.tmp")
+        temporaire.write_text(json.dumps(self.manifeste, separators=(",", ":")), encoding="utf-8")
+        os.replace(temporaire, self.chemin_manifeste)
+
+    def _repertoires_jours(self) -> Dict[str, List[Tuple[str, str, float]]]:
+        """{jour: [(application, répertoire du jour, mtime)]} sans descendre au niveau des exécutions"""
+        jours: Dict[str, List[Tuple[str, str, float]]] = {}
+        for application in os.scandir(self.racine):
+            if not application.is_dir():
+                continue
+            for scenario in os.scandir(application.path):
+                if not scenario.is_dir():
+                    continue
+                for jour in os.scandir(scenario.path):
+                    if jour.is_dir():
+                        jours.setdefault(jour.name, []).append((application.name, jour.path, jour.stat().st_mtime))
+        return jours
+
+    @staticmethod
+    def _rapports_du_jour(repertoires: List[Tuple[str, str, float]]) -> List[Tuple[str, str]]:
+        rapports = []
+        for application, chemin_jour, _ in repertoires:
+            for execution in os.scandir(chemin_jour):
+                chemin = os.path.join(execution.path, NOM_RAPPORT)
+                if execution.is_dir() and os.path.exists(chemin):
+                    rapports.append((chemin, application))
+        return sorted(rapports)
+
+    def actualiser(self) -> List[str]:
+        """Reconstruit les partitions dont le jour a changé ; retourne les jours reconstruits"""
+        recents = {(date.today() - timedelta(days=ecart)).isoformat() for ecart in range(JOURS_INSTABLES)}
+        reconstruits = []
+        for jour, repertoires in sorted(self._repertoires_jours().items()):
+            signature = sorted([chemin, round(mtime, 3)] for _, chemin, mtime in repertoires)
+            connu = self.manifeste["jours"].get(jour)
+            rapports = None
+            if jour in recents:
+                rapports = self._rapports_du_jour(repertoires)
+                signature.append(len(rapports))
+            if connu and connu["signature"] == signature and (self.repertoire / f"{jour}.npz").exists():
+                continue
+
+            if rapports is None:
+                rapports = self._rapports_du_jour(repertoires)
+            partition = construire_partition(rapports)
+            ancienne = self._partition(jour) if connu else None
+            if ancienne is not None:
+                partition = conserver_executions_supprimees(ancienne, partition)
+            temporaire = self.repertoire / f"{jour}.{os.getpid()}.tmp.npz"
+            np.savez_compressed(temporaire, **partition)
+            os.replace(temporaire, self.repertoire / f"{jour}.npz")
+            self.manifeste["jours"][jour] = {"signature": signature, "etapes": int(partition["duree"].size)}
+            reconstruits.append(jour)
+
+        if reconstruits:
+            self._enregistrer_manifeste()
+        return reconstruits
+
+    def _partition(self, jour: str) -> Optional[Dict[str, np.ndarray]]:
+        try:
+            with np.load(self.repertoire / f"{jour}.npz", allow_pickle=False) as contenu:
+                return {cle: contenu[cle] for cle in contenu.files}
+        except (OSError, ValueError):
+            return None
+
+    def charger(self, debut: Optional[float] = None, fin: Optional[float] = None) -> "TableEtapes":
+        """Partitions couvrant [debut, fin] réunies en une table (dictionnaires fusionnés)"""
+        jour_debut = date.fromtimestamp(debut - 86400).isoformat() if debut else ""
+        jour_fin = date.fromtimestamp(fin + 86400).isoformat() if fin else "9999"
+        partitions = []
+        for jour in sorted(self.manifeste["jours"]):
+            if jour_debut <= jour <= jour_fin:
+                partition = self._partition(jour)
+                if partition is not None:
+                    partitions.append(partition)
+        return TableEtapes.fusionner(partitions)
+
+
+# === TABLE ET REQUÊTES ===
+
+
+def _decalage_local() -> float:
+    return datetime.now().astimezone().utcoffset().total_seconds()
+
+
+class TableEtapes:
+    """Colonnes des étapes de plusieurs partitions (codes des dictionnaires globaux)"""
+
+    def __init__(self, colonnes: Dict[str, np.ndarray], dictionnaires: Dict[str, np.ndarray]):
+        self.colonnes = colonnes
+        self.dictionnaires = dictionnaires
+
+    def __len__(self) -> int:
+        return int(self.colonnes["duree"].size)
+
+    @classmethod
+    def fusionner(cls, partitions: List[Dict[str, np.ndarray]]) -> "TableEtapes":
+        dictionnaires = {
+            colonne: np.unique(np.concatenate([p[f"dict_{colonne}"] for p in partitions] or [np.array([], dtype=np.str_)]))
+            for colonne in COLONNES_TEXTE
+        }
+        colonnes: Dict[str, np.ndarray] = {}
+        for colonne in COLONNES_TEXTE:
+            # Code local -> code global : recherche du dictionnaire local dans le dictionnaire global
+            colonnes[colonne] = np.concatenate(
+                [np.searchsorted(dictionnaires[colonne], p[f"dict_{colonne}"]).astype(np.int32)[p[colonne]] for p in partitions]
+                or [np.array([], dtype=np.int32)]
+            )
+        for colonne, type_colonne in (("status", np.int8), ("instant", np.float64), ("duree", np.float32)):
+            colonnes[colonne] = np.concatenate([p[colonne] for p in partitions] or [np.array([], dtype=type_colonne)])
+        # Jour local (décalage UTC courant) en nombre de jours depuis l'epoch
+        colonnes["jour"] = ((colonnes["instant"] + _decalage_local()) // 86400).astype(np.int32)
+        return cls(colonnes, dictionnaires)
+
+    def _codes(self, colonne: str, motif: str) -> np.ndarray:
+        dictionnaire = self.dictionnaires[colonne]
+        return np.flatnonzero([fnmatch.fnmatchcase(valeur, motif) for valeur in dictionnaire.tolist()])
+
+    def masque(
+        self,
+        application: Optional[str] = None,
+        scenario: Optional[str] = None,
+        etape: Optional[str] = None,
+        status: Optional[Sequence[int]] = None,
+        debut: Optional[float] = None,
+        fin: Optional[float] = None,
+        duree_min_ms: Optional[float] = None,
+    ) -> np.ndarray:
+        """Masque des lignes retenues (motifs fnmatch évalués sur les dictionnaires, pas sur les lignes)"""
+        masque = np.ones(len(self), dtype=bool)
+        for colonne, motif in (("application", application), ("scenario", scenario), ("etape", etape)):
+            if motif:
+                masque &= np.isin(self.colonnes[colonne], self._codes(colonne, motif))
+        if status:
+            masque &= np.isin(self.colonnes["status"], list(status))
+        if debut is not None:
+            masque &= self.colonnes["instant"] >= debut
+        if fin is not None:
+            masque &= self.colonnes["instant"] < fin
+        if duree_min_ms is not None:
+            masque &= self.colonnes["duree"] >= duree_min_ms
+        return masque
+
+    def _valeur(self, colonne: str, code) -> object:
+        if colonne in COLONNES_TEXTE:
+            return str(self.dictionnaires[colonne][code])
+        if colonne == "jour":
+            return (date(1970, 1, 1) + timedelta(days=int(code))).isoformat()
+        return int(code)
+
+    def agreger(self, masque: np.ndarray, groupes: Sequence[str]) -> List[Dict]:
+        """Agrégats des durées (ms) par groupe"""
+        durees = self.colonnes["duree"][masque].astype(np.float64)
+        if not durees.size:
+            return []
+        if groupes:
+            cles = np.stack([self.colonnes[groupe][masque] for groupe in groupes], axis=1)
+            uniques, inverse = np.unique(cles, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+        else:
+            uniques, inverse = np.zeros((1, 0), dtype=np.int64), np.zeros(durees.size, dtype=np.int64)
+
+        nombre = np.bincount(inverse, minlength=len(uniques))
+        somme = np.bincount(inverse, weights=durees, minlength=len(uniques))
+        erreurs = np.bincount(inverse, weights=self.colonnes["status"][masque] >= 2, minlength=len(uniques))
+        # Tri par (groupe, durée) : les percentiles sont lus par rang dans chaque groupe
+        durees_triees = durees[np.lexsort((durees, inverse))]
+        debuts = np.concatenate(([0], np.cumsum(nombre)[:-1]))
+        percentiles = {
+            rang: durees_triees[debuts + np.maximum(0, np.ceil(rang / 100 * nombre).astype(np.int64) - 1)]
+            for rang in PERCENTILES
+        }
+        maximums = durees_triees[debuts + nombre - 1]
+
+        return [
+            {
+                **{groupe: self._valeur(groupe, uniques[indice, position]) for position, groupe in enumerate(groupes)},
+                "nombre": int(nombre[indice]),
+                "erreurs": int(erreurs[indice]),
+                "moyenne": round(float(somme[indice] / nombre[indice]), 1),
+                **{f"p{rang}": round(float(valeurs[indice]), 1) for rang, valeurs in percentiles.items()},
+                "max": round(float(maximums[indice]), 1),
+            }
+            for indice in range(len(uniques))
+        ]
+
+    def lignes(self, masque: np.ndarray) -> Dict[str, np.ndarray]:
+        """Lignes retenues, colonnes texte décodées"""
+        lignes = {colonne: self.dictionnaires[colonne][self.colonnes[colonne][masque]] for colonne in COLONNES_TEXTE}
+        lignes["date"] = (self.colonnes["instant"][masque] + _decalage_local()).astype(np.int64).astype("datetime64[s]")
+        lignes["status"] = self.colonnes["status"][masque]
+        lignes["duree_ms"] = self.colonnes["duree"][masque]
+        return lignes
+
+
+def comparer_periodes(table: TableEtapes, filtres: Dict, periode: timedelta, seuil: float) -> List[Dict]:
+    """Étapes dont le p50 de la dernière période dépasse seuil * p50 de la période précédente"""
+    fin = time.time()
+    debut = fin - periode.total_seconds()
+    precedent = {
+        (ligne["scenario"], ligne["etape"]): ligne
+        for ligne in table.agreger(table.masque(**filtres, debut=debut - periode.total_seconds(), fin=debut), ("scenario", "etape"))
+    }
+    ralenties = []
+    for ligne in table.agreger(table.masque(**filtres, debut=debut, fin=fin), ("scenario", "etape")):
+        reference = precedent.get((ligne["scenario"], ligne["etape"]))
+        if reference and reference["p50"] and ligne["p50"] >= seuil * reference["p50"]:
+            ralenties.append({**ligne, "p50_precedent": reference["p50"], "rapport": round(ligne["p50"] / reference["p50"], 2)})
+    return sorted(ralenties, key=lambda ligne: ligne["rapport"], reverse=True)
+
+
+# === EXPORT ET AFFICHAGE ===
+
+
+def _colonnes_resultat(resultat) -> Dict[str, np.ndarray]:
+    """Colonnes d'un résultat (lignes décodées ou liste d'agrégats)"""
+    if isinstance(resultat, dict):
+        return resultat
+    return {colonne: np.array([ligne[colonne] for ligne in resultat]) for colonne in (resultat[0] if resultat else {})}
+
+
+def exporter(resultat, chemin: Path) -> None:
+    """Export CSV, NPZ (colonnes NumPy) ou Parquet (pyarrow) selon l'extension"""
+    colonnes = _colonnes_resultat(resultat)
+    if chemin.suffix == ".npz":
+        np.savez_compressed(chemin, **colonnes)
+    elif chemin.suffix == ".parquet":
+        if pyarrow is None:
+            raise RuntimeError("Export Parquet indisponible : pyarrow n'est pas installé (utiliser .npz ou .csv)")
+        pyarrow.parquet.write_table(pyarrow.table(colonnes), chemin)
+    else:
+        with open(chemin, "w", encoding="utf-8", newline="") as fichier:
+            ecrivain = csv.writer(fichier, delimiter=";")
+            ecrivain.writerow(colonnes)
+            ecrivain.writerows(zip(*(valeurs.tolist() for valeurs in colonnes.values())))
+
+
+def afficher(resultat, limite: int = 50) -> None:
+    colonnes = _colonnes_resultat(resultat)
+    if not colonnes or not len(next(iter(colonnes.values()))):
+        print("Aucun résultat")
+        return
+    textes = {colonne: [str(valeur) for valeur in valeurs[:limite].tolist()] for colonne, valeurs in colonnes.items()}
+    largeurs = {colonne: max(len(colonne), *(len(valeur) for valeur in valeurs)) for colonne, valeurs in textes.items()}
+    print("  ".join(colonne.ljust(largeurs[colonne]) for colonne in textes))
+    for ligne in zip(*textes.values()):
+        print("  ".join(valeur.ljust(largeurs[colonne]) for colonne, valeur in zip(textes, ligne)))
+    total = len(next(iter(colonnes.values())))
+    if total > limite:
+        print(f"... {total - limite} ligne(s) non affichée(s)")
+
+
+def main():
+    """Point d'entrée des requêtes"""
+    output_path = os.environ.get("SIMU_OUTPUT", "/tmp")
+    parser = argparse.ArgumentParser(description="Requêtes sur l'historique des rapports (cache en colonnes)")
+    parser.add_argument("--rapports", default=os.path.join(output_path, "rapports"), help="Répertoire des rapports")
+    parser.add_argument("--cache", default=os.path.join(output_path, SOUS_REPERTOIRE_CACHE), help="Répertoire du cache")
+    parser.add_argument("--application", help="Motif d'application (fnmatch)")
+    parser.add_argument("--scenario", help="Motif de scénario (fnmatch)")
+    parser.add_argument("--etape", help="Motif d'étape (fnmatch)")
+    parser.add_argument("--status", type=int, nargs="+", help="Statuts retenus (0 à 3)")
+    parser.add_argument("--depuis", help="Période glissante : 30m, 24h, 7j, 4s")
+    parser.add_argument("--duree-min", type=float, help="Durée minimale des étapes (ms)")
+    parser.add_argument("--groupe", nargs="+", choices=REGROUPEMENTS, default=[], help="Colonnes de regroupement")
+    parser.add_argument("--comparer", help="Étapes ralenties : période comparée à la précédente (ex. 7j)")
+    parser.add_argument("--seuil", type=float, default=1.2, help="Avec --comparer : rapport minimal des p50")
+    parser.add_argument("--export", type=Path, help="Fichier d'export (.csv, .npz, .parquet)")
+    parser.add_argument("--sans-actualisation", action="store_true", help="Interroge le cache sans le mettre à jour")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    cache = CacheRapports(Path(args.rapports), Path(args.cache))
+    if not args.sans_actualisation:
+        debut = time.perf_counter()
+        reconstruits = cache.actualiser()
+        if reconstruits:
+            print(f"Cache actualisé : {len(reconstruits)} jour(s) en {time.perf_counter() - debut:.2f}s")
+
+    filtres = {
+        "application": args.application,
+        "scenario": args.scenario,
+        "etape": args.etape,
+        "status": args.status,
+        "duree_min_ms": args.duree_min,
+    }
+    debut = time.perf_counter()
+    if args.comparer:
+        periode = parser_fenetre(args.comparer)
+        table = cache.charger(debut=time.time() - 2 * periode.total_seconds())
+        resultat = comparer_periodes(table, filtres, periode, args.seuil)
+    else:
+        depuis = time.time() - parser_fenetre(args.depuis).total_seconds() if args.depuis else None
+        table = cache.charger(debut=depuis)
+        masque = table.masque(**filtres, debut=depuis)
+        resultat = table.agreger(masque, args.groupe) if args.groupe else table.lignes(masque)
+    print(f"{len(table)} étape(s) en cache sur la période, requête en {(time.perf_counter() - debut) * 1000:.1f} ms\n")
+
+    afficher(resultat)
+    if args.export:
+        exporter(resultat, args.export)
+        print(f"\n✅ Export: {args.export}")
+
+
+if __name__ == "__main__":
+    main()
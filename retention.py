@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+retention.py
+
+Rétention, compaction et archivage des répertoires screenshots/ et rapports/.
+
+Chaque exécution crée screenshots/<app>/<scenario>/<jour>/<HH:MM:SS> et
+rapports/<app>/<scenario>/<jour>/<HH:MM:SS>. Une exécution est conservée en
+clair selon la politique de son application et son statut (scenario.json,
+inconnu sans rapport), par exemple erreurs 30 jours, succès 2 jours. Passé
+ce délai, ses fichiers sont ajoutés à l'archive de son jour
+(archives/<app>/<jour>.zip) puis supprimés. Une archive zip garde un
+répertoire central : un fichier archivé se relit seul (`lire_fichier_archive`),
+sans décompresser le reste. L'index <jour>.index.json décrit les exécutions
+archivées (statut, fichiers). Les archives sont supprimées après `archive` jours.
+
+Le travail est limité en débit (Mo/s) et peut tourner en tâche de fond :
+`--demon` (passe périodique) ou `lancer_en_arriere_plan` (processus détaché, nice 19).
+Un verrou empêche deux passes simultanées sur le même output_path.
+
+Si le cache de requete_rapports.py existe (output_path/cache_rapports), il est
+actualisé avant toute suppression : ses partitions gardent les exécutions
+supprimées, les comparaisons historiques ne perdent pas les jours compactés.
+
+Politiques (output_path/retention.yaml, valeurs en jours) :
+
+    defaut:
+      succes: 2
+      avertissement: 7
+      erreur: 30
+      inconnu: 30
+      archive: 90        # 0 : suppression sans archivage
+    applications:
+      AAI2:
+        erreur: 60
+
+Usage :
+    python retention.py --simulation
+    python retention.py --debit 10
+    python retention.py --demon --periode 3600
+    python retention.py --lire AAI2 2026-09-01 rapports/AAI2_connexion/10:15:00/scenario.json
+"""
+
+import argparse
+import fcntl
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import zipfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from requete_rapports import SOUS_REPERTOIRE_CACHE, CacheRapports
+
+LOGGER = logging.getLogger(__name__)
+
+NOM_POLITIQUES = "retention.yaml"
+SOUS_REPERTOIRE_ARCHIVES = "archives"
+NOM_VERROU = ".retention.verrou"
+TYPES_REPERTOIRES = ("rapports", "screenshots")
+NOM_RAPPORT = "scenario.json"
+
+DEFAUT_POLITIQUE = {"succes": 2, "avertissement": 7, "erreur": 30, "inconnu": 30, "archive": 90}
+NOMS_STATUTS = {0: "succes", 1: "avertissement", 2: "erreur", 3: "inconnu"}
+DEFAUT_DEBIT_MO_S = 20.0
+DEFAUT_PERIODE = 3600.0
+# Fichiers déjà compressés : stockés tels quels dans l'archive
+EXTENSIONS_COMPRESSEES = frozenset((".png", ".jpg", ".jpeg", ".webp", ".zip", ".gz"))
+
+
+# === POLITIQUES ===
+
+
+class PolitiquesRetention:
+    """Délais de conservation (jours) par application et statut"""
+
+    def __init__(self, defaut: Optional[Dict] = None, applications: Optional[Dict[str, Dict]] = None):
+        self.defaut = {**DEFAUT_POLITIQUE, **(defaut or {})}
+        self.applications = applications or {}
+
+    @classmethod
+    def charger(cls, chemin: Path) -> "PolitiquesRetention":
+        """Politiques du fichier YAML (valeurs par défaut s'il est absent)"""
+        try:
+            with open(chemin, encoding="utf-8") as fichier:
+                contenu = yaml.safe_load(fichier) or {}
+        except FileNotFoundError:
+            return cls()
+        return cls(contenu.get("defaut"), contenu.get("applications"))
+
+    def politique(self, application: str) -> Dict[str, int]:
+        return {**self.defaut, **self.applications.get(application, {})}
+
+    def delai_minimal(self, application: str) -> int:
+        """Plus petit délai en clair : un jour plus récent n'a rien d'expiré"""
+        politique = self.politique(application)
+        return min(politique[nom] for nom in NOMS_STATUTS.values())
+
+
+class LimiteurDebit:
+    """Limitation du débit d'entrées/sorties (seau à jetons, octets par seconde)"""
+
+    def __init__(self, debit_mo_s: float):
+        self.debit = debit_mo_s * 1024 * 1024
+        self._jetons = self.debit
+        self._instant = time.monotonic()
+
+    def consommer(self, octets: int) -> None:
+        if self.debit <= 0:
+            return
+        maintenant = time.monotonic()
+        self._jetons = min(self.debit, self._jetons + (maintenant - self._instant) * self.debit)
+        self._instant = maintenant
+        self._jetons -= octets
+        if self._jetons < 0:
+            time.sleep(-self._jetons / self.debit)
+
+
+# === MOTEUR DE RÉTENTION ===
+
+
+class MoteurRetention:
+    """
+    Passe de rétention sur un output_path.
+
+    Args:
+        output_path: répertoire contenant rapports/, screenshots/ et archives/
+        politiques: délais par application et statut
+        debit_mo_s: débit maximal de lecture/écriture (0 = illimité)
+        simulation: liste les actions sans rien modifier
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        politiques: PolitiquesRetention,
+        debit_mo_s: float = DEFAUT_DEBIT_MO_S,
+        simulation: bool = False,
+    ):
+        self.output_path = Path(output_path)
+        self.politiques = politiques
+        self.limiteur = LimiteurDebit(debit_mo_s)
+        self.simulation = simulation
+        self.archives = self.output_path / SOUS_REPERTOIRE_ARCHIVES
+
+    # --- parcours ---
+
+    def _jours_expirables(self) -> Dict[Tuple[str, str], Dict[Tuple[str, str], Dict[str, Path]]]:
+        """
+        Exécutions des jours assez anciens pour que l'une d'elles puisse être expirée.
+
+        Returns:
+            dict: {(application, jour): {(scenario, heure): {type de répertoire: chemin}}}
+        """
+        aujourd_hui = date.today()
+        jours: Dict[Tuple[str, str], Dict[Tuple[str, str], Dict[str, Path]]] = {}
+        for type_repertoire in TYPES_REPERTOIRES:
+            racine = self.output_path / type_repertoire
+            for application in _sous_repertoires(racine):
+                delai = self.politiques.delai_minimal(application.name)
+                for scenario in _sous_repertoires(application):
+                    for jour in _sous_repertoires(scenario):
+                        age = _age_jours(jour.name, aujourd_hui)
+                        if age is None or age <= delai:
+                            continue
+                        executions = jours.setdefault((application.name, jour.name), {})
+                        for heure in _sous_repertoires(jour):
+                            executions.setdefault((scenario.name, heure.name), {})[type_repertoire] = Path(heure.path)
+        return jours
+
+    def _statut(self, repertoires: Dict[str, Path]) -> str:
+        rapport = repertoires.get("rapports")
+        if rapport is not None:
+            try:
+                status = json.loads((rapport / NOM_RAPPORT).read_bytes()).get("status")
+                return NOMS_STATUTS.get(status, "inconnu")
+            except (OSError, ValueError, AttributeError):
+                pass
+        return "inconnu"
+
+    # --- actions ---
+
+    def _archiver(self, application: str, jour: str, executions: List[Tuple[str, str, str, Dict[str, Path]]]) -> int:
+        """Ajoute les exécutions à l'archive du jour ; retourne le volume archivé (octets)"""
+        repertoire = self.archives / application
+        repertoire.mkdir(parents=True, exist_ok=True)
+        chemin_archive = repertoire / f"{jour}.zip"
+        chemin_index = repertoire / f"{jour}.index.json"
+        index = _lire_index(chemin_index)
+
+        volume = 0
+        with zipfile.ZipFile(chemin_archive, "a", compression=zipfile.ZIP_DEFLATED) as archive:
+            presents = set(archive.namelist())
+            for scenario, heure, statut, repertoires in executions:
+                fichiers = []
+                for type_repertoire, chemin in repertoires.items():
+                    for fichier in sorted(chemin.rglob("*")):
+                        if not fichier.is_file():
+                            continue
+                        nom = f"{type_repertoire}/{scenario}/{heure}/{fichier.relative_to(chemin).as_posix()}"
+                        if nom not in presents:
+                            compression = (
+                                zipfile.ZIP_STORED if fichier.suffix.lower() in EXTENSIONS_COMPRESSEES else zipfile.ZIP_DEFLATED
+                            )
+                            archive.write(fichier, nom, compress_type=compression)
+                            taille = fichier.stat().st_size
+                            self.limiteur.consommer(2 * taille)
+                            volume += taille
+                        fichiers.append(nom)
+                index["executions"][f"{scenario}/{heure}"] = {
+                    "status": statut,
+                    "archive_le": datetime.now().isoformat(),
+                    "fichiers": fichiers,
+                }
+
+        # Archive complète sur disque avant la suppression des originaux
+        with open(chemin_archive, "rb") as fichier_archive:
+            os.fsync(fichier_archive.fileno())
+        _ecrire_index(chemin_index, index)
+        return volume
+
+    def _supprimer(self, repertoires: Dict[str, Path]) -> None:
+        for chemin in repertoires.values():
+            shutil.rmtree(chemin, ignore_errors=True)
+            # Répertoires jour / scénario / application devenus vides
+            for parent in list(chemin.parents)[:3]:
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break
+
+    def purger_archives(self) -> int:
+        """Supprime les archives plus anciennes que le délai `archive` de leur application"""
+        aujourd_hui = date.today()
+        supprimees = 0
+        for application in _sous_repertoires(self.archives):
+            delai = self.politiques.politique(application.name)["archive"]
+            for archive in Path(application.path).glob("*.zip"):
+                age = _age_jours(archive.stem, aujourd_hui)
+                if age is None or age <= delai:
+                    continue
+                LOGGER.info("[MoteurRetention] Archive expirée: %s", archive)
+                if not self.simulation:
+                    archive.unlink(missing_ok=True)
+                    archive.with_name(f"{archive.stem}.index.json").unlink(missing_ok=True)
+                supprimees += 1
+        return supprimees
+
+    def actualiser_cache(self) -> bool:
+        """Actualise le cache des rapports s'il existe (False si l'actualisation a échoué)"""
+        repertoire = self.output_path / SOUS_REPERTOIRE_CACHE
+        racine = self.output_path / "rapports"
+        if self.simulation or not repertoire.is_dir() or not racine.is_dir():
+            return True
+        try:
+            CacheRapports(racine, repertoire).actualiser()
+        except (OSError, ValueError) as e:
+            LOGGER.error("[MoteurRetention] ❌ Cache des rapports non actualisé: %s", e)
+            return False
+        return True
+
+    def passe(self) -> Dict[str, int]:
+        """Une passe complète : archivage et suppression des exécutions expirées, purge des archives"""
+        bilan = {"archivees": 0, "supprimees": 0, "octets_archives": 0, "archives_purgees": 0}
+        aujourd_hui = date.today()
+        if not self.actualiser_cache():
+            # Rien n'est supprimé tant que le cache n'a pas relevé les exécutions
+            return bilan
+
+        for (application, jour), executions in sorted(self._jours_expirables().items()):
+            politique = self.politiques.politique(application)
+            age = _age_jours(jour, aujourd_hui)
+            expirees = []
+            for (scenario, heure), repertoires in sorted(executions.items()):
+                statut = self._statut(repertoires)
+                if age > politique[statut]:
+                    expirees.append((scenario, heure, statut, repertoires))
+            if not expirees:
+                continue
+
+            archiver = politique["archive"] > 0 and age <= politique["archive"]
+            LOGGER.info(
+                "[MoteurRetention] %s %s : %d exécution(s) expirée(s)%s",
+                application, jour, len(expirees), " archivée(s)" if archiver else "",
+            )
+            if self.simulation:
+                bilan["supprimees"] += len(expirees)
+                continue
+
+            if archiver:
+                try:
+                    bilan["octets_archives"] += self._archiver(application, jour, expirees)
+                    bilan["archivees"] += len(expirees)
+                except (OSError, zipfile.BadZipFile) as e:
+                    # Originaux conservés : la prochaine passe réessaiera
+                    LOGGER.error("[MoteurRetention] ❌ Archivage %s %s impossible: %s", application, jour, e)
+                    continue
+            for _, _, _, repertoires in expirees:
+                self._supprimer(repertoires)
+                bilan["supprimees"] += 1
+
+        bilan["archives_purgees"] = self.purger_archives()
+        return bilan
+
+
+# === LECTURE DES ARCHIVES ===
+
+
+def lire_index(output_path: Path, application: str, jour: str) -> Dict:
+    """Index des exécutions archivées d'un jour"""
+    return _lire_index(Path(output_path) / SOUS_REPERTOIRE_ARCHIVES / application / f"{jour}.index.json")
+
+
+def lire_fichier_archive(output_path: Path, application: str, jour: str, chemin: str) -> bytes:
+    """
+    Contenu d'un fichier archivé.
+
+    Args:
+        chemin: chemin dans l'archive, <rapports|screenshots>/<scenario>/<heure>/<fichier>
+    """
+    with zipfile.ZipFile(Path(output_path) / SOUS_REPERTOIRE_ARCHIVES / application / f"{jour}.zip") as archive:
+        return archive.read(chemin)
+
+
+# === OUTILS ===
+
+
+def _sous_repertoires(repertoire) -> Iterator[os.DirEntry]:
+    try:
+        with os.scandir(repertoire) as entrees:
+            yield from [entree for entree in entrees if entree.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        return
+
+
+def _age_jours(nom_jour: str, aujourd_hui: date) -> Optional[int]:
+    try:
+        return (aujourd_hui - date.fromisoformat(nom_jour)).days
+    except ValueError:
+        return None
+
+
+def _lire_index(chemin: Path) -> Dict:
+    try:
+        return json.loads(chemin.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"executions": {}}
+
+
+def _ecrire_index(chemin: Path, index: Dict) -> None:
+    temporaire = chemin.with_suffix(f".{os.getpid()}.tmp")
+    temporaire.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(temporaire, chemin)
+
+
+def executer_passe(output_path: Path, politiques: PolitiquesRetention, debit_mo_s: float, simulation: bool = False) -> Optional[Dict]:
+    """Passe protégée par un verrou (None si une autre passe est en cours)"""
+    output_path.mkdir(parents=True, exist_ok=True)
+    with open(output_path / NOM_VERROU, "w") as verrou:
+        try:
+            fcntl.flock(verrou, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            LOGGER.info("[executer_passe] Passe de rétention déjà en cours sur %s", output_path)
+            return None
+        return MoteurRetention(output_path, politiques, debit_mo_s, simulation).passe()
+
+
+class ServiceRetention(threading.Thread):
+    """Passes de rétention périodiques en tâche de fond"""
+
+    def __init__(self, output_path: Path, politiques: PolitiquesRetention, debit_mo_s: float, periode: float = DEFAUT_PERIODE):
+        super().__init__(name="service_retention", daemon=True)
+        self.output_path = output_path
+        self.politiques = politiques
+        self.debit_mo_s = debit_mo_s
+        self.periode = periode
+        self._arret = threading.Event()
+
+    def run(self) -> None:
+        while True:
+            try:
+                bilan = executer_passe(self.output_path, self.politiques, self.debit_mo_s)
+                if bilan:
+                    LOGGER.info("[ServiceRetention] %s", bilan)
+            except OSError as e:
+                LOGGER.error("[ServiceRetention] ❌ Passe interrompue: %s", e)
+            if self._arret.wait(self.periode):
+                return
+
+    def arreter(self) -> None:
+        self._arret.set()
+
+
+def lancer_en_arriere_plan(output_path: Path, debit_mo_s: float = DEFAUT_DEBIT_MO_S) -> subprocess.Popen:
+    """Lance une passe dans un processus détaché de basse priorité (nice 19)"""
+    return subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "--output", str(output_path), "--debit", str(debit_mo_s)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        preexec_fn=lambda: os.nice(19),
+    )
+
+
+def main():
+    """Point d'entrée de la rétention"""
+    parser = argparse.ArgumentParser(description="Rétention et archivage des screenshots et rapports")
+    parser.add_argument("--output", type=Path, default=Path(os.environ.get("SIMU_OUTPUT", "/tmp")), help="output_path")
+    parser.add_argument("--politiques", type=Path, help=f"Fichier de politiques (défaut output_path/{NOM_POLITIQUES})")
+    parser.add_argument("--debit", type=float, default=DEFAUT_DEBIT_MO_S, help="Débit maximal en Mo/s (0 = illimité)")
+    parser.add_argument("--simulation", action="store_true", help="Liste les exécutions expirées sans rien modifier")
+    parser.add_argument("--demon", action="store_true", help="Passes périodiques jusqu'à interruption")
+    parser.add_argument("--periode", type=float, default=DEFAUT_PERIODE, help="Avec --demon : secondes entre deux passes")
+    parser.add_argument("--lire", nargs=3, metavar=("APPLICATION", "JOUR", "CHEMIN"), help="Écrit un fichier archivé sur la sortie standard")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.lire:
+        sys.stdout.buffer.write(lire_fichier_archive(args.output, *args.lire))
+        return
+
+    politiques = PolitiquesRetention.charger(args.politiques or args.output / NOM_POLITIQUES)
+    if args.demon:
+        service = ServiceRetention(args.output, politiques, args.debit, args.periode)
+        service.start()
+        try:
+            service.join()
+        except KeyboardInterrupt:
+            service.arreter()
+        return
+
+    bilan = executer_passe(args.output, politiques, args.debit, args.simulation)
+    if bilan is not None:
+        print(
+            f"✅ {bilan['supprimees']} exécution(s) expirée(s), {bilan['archivees']} archivée(s) "
+            f"({bilan['octets_archives'] / 1024 / 1024:.1f} Mo), {bilan['archives_purgees']} archive(s) purgée(s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 import argparse
 import glob
+import json
 import os
 import time
 from datetime import datetime
@@ -16,8 +17,18 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from simulateur.enums import Status
 from simulateur.run_tests_via_yaml import TestAPI
+from simulateur.initialisation import InitialisateurScenario, charger_utilisateur_isac
 from utils.utils import load_config_files
 from utils.yaml_loader import load_yaml_file
+from pool_navigateurs import PoolNavigateurs, PluginPoolNavigateurs
+from charge import InjectionCharge, lister_utilisateurs
+from moteur_async import ScenarioAsync, executer_scenarios
+from gouverneur import GouverneurConcurrence
+from encodage_rapport import ecrire_json, encoder_json
+from historique import DEFAUT_FENETRE, HistoriqueDurees, chemin_base, enregistrer_execution, parser_fenetre
+from retention import lancer_en_arriere_plan
+from journal_execution import DEFAUT_AGE_ORPHELIN, journaux_orphelins, marquer_recupere, rapport_depuis_journal
+from rich.table import Table
 from helpers import (
 console,
 print_error,
@@ -152,7 +163,8 @@ try:
         return None
     
     print_success(f"Fichier JSON trouvé: {json_path}")
-    return load_yaml_file(str(json_path))
+    with open(json_path, encoding="utf-8") as fichier:
+        return json.load(fichier)
     
 except (ValueError, FileNotFoundError) as e:
     print_error(f"Erreur lors de la lecture du JSON: {str(e)}")
@@ -196,7 +208,7 @@ headers = {
 
 try:
     with console.status("[bold cyan]Envoi des résultats vers ISAC..."):
-        response = requests.post(url, headers=headers, timeout=10, json=json_execution)
+        response = requests.post(url, headers=headers, timeout=10, data=encoder_json(json_execution))
     
     if response.status_code == 201:
         print_success("Résultats sauvegardés dans ISAC")
@@ -383,13 +395,14 @@ except Exception as e:
     return False
 ```
 
-def run_multi_scenarios(scenarios_dir: Path) -> None:
+def run_multi_scenarios(scenarios_dir: Path, taille_pool: int = 0) -> None:
 “””
 Exécute plusieurs scénarios et affiche un récapitulatif.
 
 ```
 Args:
     scenarios_dir: Répertoire contenant les scénarios
+    taille_pool: Nombre de navigateurs pré-lancés partagés entre les scénarios (0 = pas de pool)
 """
 print_section("Exécution de tous les scénarios")
 
@@ -403,30 +416,316 @@ print_info(f"{len(scenarios_files)} scénario(s) trouvé(s)")
 
 results = []
 
-with Progress(
-    SpinnerColumn(),
-    TextColumn("[progress.description]{task.description}"),
-    console=console
-) as progress:
-    task = progress.add_task("Exécution des tests...", total=len(scenarios_files))
-    
-    for file_path in scenarios_files:
-        scenario = file_path.stem
-        os.environ['SCENARIO'] = scenario
+# Pool de navigateurs partagé entre les exécutions pytest de ce processus
+plugins = []
+pool = None
+if taille_pool > 0:
+    navigateur = os.environ.get('NAVIGATEUR', 'firefox')
+    headless = os.environ.get('HEADLESS', 'true').lower() != 'false'
+    pool = PoolNavigateurs(taille=taille_pool, options_lancement={"headless": headless})
+    plugins.append(PluginPoolNavigateurs(pool))
+
+# Navigateurs du pool fermés même si une exécution lève (KeyboardInterrupt compris)
+try:
+    if pool is not None:
+        pool.demarrer([navigateur])
+        print_info(f"Pool de {taille_pool} navigateur(s) {navigateur} démarré")
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console
+    ) as progress:
+        task = progress.add_task("Exécution des tests...", total=len(scenarios_files))
+    
+        for file_path in scenarios_files:
+            scenario = file_path.stem
+            os.environ['SCENARIO'] = scenario
         
-        progress.update(task, description=f"Test: {scenario}")
+            progress.update(task, description=f"Test: {scenario}")
         
-        result = pytest.main(["-x", "-s", str(file_path)])
-        success = result == 0
+            result = pytest.main(["-x", "-s", str(file_path)], plugins=plugins)
+            success = result == 0
         
-        results.append((scenario, success))
-        print_test_result(scenario, success)
+            results.append((scenario, success))
+            print_test_result(scenario, success)
         
-        progress.advance(task)
+            progress.advance(task)
+finally:
+    if pool is not None:
+        pool.arreter()
 
 print_summary_table(results)
 ```
 
+def run_multi_scenarios_async(scenarios_dir: Path, scenarios_simultanes: int, gouverneur: bool = False) -> None:
+    """
+    Exécute tous les scénarios simultanément avec le moteur asyncio.
+
+```
+Args:
+    scenarios_dir: Répertoire contenant les scénarios
+    scenarios_simultanes: Nombre maximum de scénarios exécutés en même temps
+    gouverneur: Ajuster le nombre de scénarios simultanés selon la charge de l'hôte
+"""
+print_section("Exécution de tous les scénarios (moteur async)")
+
+scenarios_files = sorted(scenarios_dir.glob("*.py"))
+if not scenarios_files:
+    print_warning(f"Aucun scénario trouvé dans {scenarios_dir}")
+    return
+
+navigateur = os.environ.get('NAVIGATEUR', 'firefox')
+headless = os.environ.get('HEADLESS', 'true').lower() != 'false'
+
+# Même initialisation que la fixture execution (environnement, API, planning,
+# répertoires, disponibilité) : un scénario dont l'initialisation échoue n'est
+# pas lancé, son erreur est inscrite par l'initialisation comme en mode pytest
+results = []
+scenarios = []
+for file_path in scenarios_files:
+    os.environ['SCENARIO'] = file_path.stem
+    try:
+        config, _ = InitialisateurScenario().initialiser()
+    except pytest.exit.Exception as e:
+        print_warning(f"{file_path.stem} : initialisation en échec ({e}), scénario non lancé")
+        results.append((file_path.stem, False))
+        continue
+    scenarios.append(ScenarioAsync(file_path, config))
+
+if not scenarios:
+    print_summary_table(results)
+    return
+
+print_info(f"{len(scenarios)} scénario(s), {scenarios_simultanes} simultané(s) au maximum")
+
+with console.status("[bold cyan]Exécution des scénarios..."):
+    rapports = executer_scenarios(
+        scenarios,
+        navigateur=navigateur,
+        nb_navigateurs=max(1, -(-scenarios_simultanes // 20)),
+        scenarios_simultanes=scenarios_simultanes,
+        options_lancement={"headless": headless},
+        gouverneur=GouverneurConcurrence(maximum=scenarios_simultanes) if gouverneur else None,
+    )
+
+for scenario, rapport in zip(scenarios, rapports):
+    chemin_rapport = None
+    if scenario.config.get("report_dir"):
+        chemin_rapport = f"{scenario.config['report_dir']}/scenario.json"
+        ecrire_json(chemin_rapport, rapport)
+    enregistrer_execution(scenario.config, rapport, chemin_rapport)
+    success = rapport["status"] == Status.SUCCESS.value
+    results.append((scenario.fichier.stem, success))
+    print_test_result(scenario.fichier.stem, success, rapport["duree"])
+    post_execution_result_in_isac(scenario.fichier.stem, rapport)
+
+print_summary_table(results)
+
+def recover_orphaned_journals(racine: Path, age_minimum: float = DEFAUT_AGE_ORPHELIN) -> int:
+    """
+    Transforme les journaux d'exécutions interrompues en résultats partiels inscrits.
+
+```
+Args:
+    racine: Répertoire parcouru récursivement (journal.ndjson)
+    age_minimum: Âge minimal en secondes d'un journal sans fin pour être récupéré
+
+Returns:
+    Nombre de journaux récupérés
+"""
+print_section(f"Récupération des journaux orphelins: {racine}")
+
+orphelins = journaux_orphelins(racine, age_minimum)
+if not orphelins:
+    print_info("Aucun journal orphelin")
+    return 0
+
+# Sans inscription, les journaux ne sont pas marqués récupérés : ils seront inscrits plus tard
+inscription_active = os.environ.get('INSCRIPTION', '').lower() == 'true'
+if not inscription_active:
+    print_warning("Inscription désactivée (INSCRIPTION != true) : journaux laissés orphelins")
+
+recuperes = 0
+for chemin in orphelins:
+    rapport = rapport_depuis_journal(chemin)
+    print_warning(f"{rapport['scenario']} ({chemin.parent}) : {rapport['nb_scene']} étape(s) journalisée(s)")
+
+    chemin_rapport = chemin.parent / "scenario.json"
+    if not chemin_rapport.exists():
+        ecrire_json(str(chemin_rapport), rapport)
+
+    if inscription_active and post_execution_result_in_isac(rapport["scenario"], rapport):
+        marquer_recupere(chemin, rapport["status"])
+        recuperes += 1
+
+print_success(f"{recuperes}/{len(orphelins)} journal(aux) récupéré(s)")
+return recuperes
+```
+
+def print_history(
+    output_path: str, scenario_name: Optional[str], fenetre: str, etape: Optional[str] = None, importer: bool = False
+) -> bool:
+    """
+    Affiche les percentiles des durées d'étapes de l'historique local.
+
+```
+Avec importer, les scenario.json de output_path/rapports absents de l'historique sont
+importés au préalable (parcours complet des rapports : à ne demander qu'une fois, les
+exécutions suivantes sont historisées à leur fin).
+
+Args:
+    output_path: Répertoire de sortie (SIMU_OUTPUT) contenant historique.sqlite
+    scenario_name: Scénario interrogé (None : liste des scénarios historisés)
+    fenetre: Fenêtre glissante ("30m", "24h", "7j", "4s")
+    etape: Limite la requête à une étape
+    importer: Importe d'abord les rapports absents de l'historique
+
+Returns:
+    True si la requête a produit un résultat
+"""
+try:
+    duree_fenetre = parser_fenetre(fenetre)
+except ValueError as e:
+    print_error(str(e))
+    return False
+
+with HistoriqueDurees(chemin_base(output_path)) as historique:
+    rapports = Path(output_path) / "rapports"
+    if importer and rapports.is_dir():
+        importes = historique.importer_rapports(rapports)
+        if importes:
+            print_info(f"{importes} rapport(s) importé(s) dans l'historique")
+
+    if not scenario_name:
+        table = Table(title="Scénarios historisés")
+        for colonne in ("Scénario", "exécutions", "dernière"):
+            table.add_column(colonne, justify="left" if colonne == "Scénario" else "right")
+        for nom, nombre, instant in historique.scenarios():
+            table.add_row(nom, str(nombre), datetime.fromtimestamp(instant).strftime("%Y-%m-%d %H:%M"))
+        console.print(table)
+        return table.row_count > 0
+
+    resultats = historique.percentiles(scenario_name, duree_fenetre, etape)
+
+if not resultats:
+    print_warning(f"Aucune étape historisée pour {scenario_name} sur {fenetre}")
+    return False
+
+table = Table(title=f"Durées des étapes (ms) - {scenario_name} - {fenetre}")
+table.add_column("Étape", style="cyan")
+for colonne in ("nombre", "erreurs", "p50", "p95", "p99", "max"):
+    table.add_column(colonne, justify="right")
+for nom, mesures in resultats.items():
+    table.add_row(nom, *(str(mesures[colonne]) for colonne in ("nombre", "erreurs", "p50", "p95", "p99", "max")))
+console.print(table)
+return True
+```
+
+def run_load_scenario(
+    scenario_name: str,
+    work_dir: Path,
+    utilisateurs_virtuels: int,
+    duree: float,
+    rampe: float,
+    reflexion: Tuple[float, float],
+) -> bool:
+    """
+    Exécute un scénario en mode charge (N utilisateurs virtuels simultanés).
+
+```
+Args:
+    scenario_name: Nom du scénario
+    work_dir: Répertoire de travail
+    utilisateurs_virtuels: Nombre d'utilisateurs virtuels
+    duree: Durée totale du tir en secondes
+    rampe: Durée de la montée en charge en secondes
+    reflexion: Temps de réflexion (min, max) entre deux itérations en secondes
+
+Returns:
+    True si au moins une itération a été exécutée sans erreur
+"""
+print_section(f"Tir de charge: {scenario_name}")
+
+file_path = work_dir / "scenarios" / "python" / f"{scenario_name}.py"
+if not file_path.exists():
+    print_error(f"Scénario introuvable: {file_path}")
+    return False
+
+# Initialisation unique du scénario (sans inscription), puis une configuration par utilisateur virtuel
+os.environ['SCENARIO'] = scenario_name
+os.environ['INSCRIPTION'] = 'false'
+try:
+    config, _ = InitialisateurScenario().initialiser()
+except pytest.exit.Exception as e:
+    print_error(f"Initialisation du scénario en échec: {e}")
+    return False
+
+utilisateurs_isac = lister_utilisateurs(work_dir / "config" / "utilisateurs")
+if not utilisateurs_isac:
+    print_warning("Aucun fichier dans config/utilisateurs : utilisateur du scénario partagé")
+elif len(utilisateurs_isac) < utilisateurs_virtuels:
+    print_warning(f"{len(utilisateurs_isac)} utilisateur(s) ISAC pour {utilisateurs_virtuels} utilisateurs virtuels")
+
+configs = []
+try:
+    identifiants = {nom: charger_utilisateur_isac(config, nom) for nom in utilisateurs_isac[:utilisateurs_virtuels]}
+except (OSError, ValueError, yaml.YAMLError) as e:
+    print_error(f"Fichier utilisateur ISAC illisible: {e}")
+    return False
+for numero in range(utilisateurs_virtuels):
+    if utilisateurs_isac:
+        configs.append({**config, **identifiants[utilisateurs_isac[numero % len(utilisateurs_isac)]]})
+    else:
+        configs.append(dict(config))
+
+injection = InjectionCharge(
+    file_path,
+    configs,
+    duree,
+    rampe=rampe,
+    reflexion=reflexion,
+    navigateur=os.environ.get('NAVIGATEUR', 'firefox'),
+    options_lancement={"headless": os.environ.get('HEADLESS', 'true').lower() != 'false'},
+)
+print_info(f"{utilisateurs_virtuels} utilisateur(s) virtuel(s), rampe {rampe}s, durée {duree}s")
+
+with console.status("[bold cyan]Tir en cours..."):
+    rapport = injection.executer()
+
+print_load_report(rapport)
+print_success(f"Rapport de charge: {injection.repertoire / 'charge.json'}")
+
+return rapport["iterations"] > rapport["iterations_en_erreur"]
+```
+
+def print_load_report(rapport: dict) -> None:
+    """Affiche les percentiles par étape et le débit d'un tir de charge."""
+    table = Table(title=f"Durées des étapes (s) - {rapport['iterations']} itération(s)")
+    table.add_column("Étape", style="cyan")
+    for colonne in ("nombre", "erreurs", "p50", "p90", "p95", "p99", "max"):
+        table.add_column(colonne, justify="right")
+    for nom, mesures in rapport["etapes"].items():
+        table.add_row(nom, *(str(mesures[colonne]) for colonne in ("nombre", "erreurs", "p50", "p90", "p95", "p99", "max")))
+    console.print(table)
+
+    debit = Table(title=f"Débit par intervalle de {rapport['intervalle_debit']}s")
+    for colonne in ("debut", "iterations", "etapes", "erreurs"):
+        debit.add_column(colonne, justify="right")
+    for intervalle in rapport["debit"]:
+        debit.add_row(*(str(intervalle[colonne]) for colonne in ("debut", "iterations", "etapes", "erreurs")))
+    console.print(debit)
+    print_info(f"{rapport['iterations_par_minute']} itération(s)/min, {rapport['iterations_en_erreur']} en erreur")
+
+def parse_reflexion(valeur: str) -> Tuple[float, float]:
+    """Temps de réflexion 'MIN-MAX' ou 'VALEUR' (secondes)"""
+    bornes = [float(borne) for borne in valeur.split("-", 1)]
+    if len(bornes) == 1:
+        bornes.append(bornes[0])
+    if bornes[0] < 0 or bornes[1] < bornes[0]:
+        raise argparse.ArgumentTypeError(f"Temps de réflexion invalide: {valeur}")
+    return bornes[0], bornes[1]
+
 def main():
 “”“Point d’entrée principal du script.”””
 parser = argparse.ArgumentParser(
@@ -447,17 +746,115 @@ parser.add_argument(
 action=“store_true”,
 help=“Mode test Exadata”
 )
+parser.add_argument(
+"-p", "--pool",
+type=int,
+default=0,
+help="Avec --all : nombre de navigateurs pré-lancés réutilisés entre les scénarios"
+)
+parser.add_argument(
+"--recuperer",
+nargs="?",
+const=os.path.join(os.environ.get('SIMU_OUTPUT', '/tmp'), "rapports"),
+metavar="REPERTOIRE",
+help="Inscrit les exécutions interrompues (journal.ndjson sans fin) comme résultats partiels"
+)
+parser.add_argument(
+"--async",
+dest="moteur_async",
+type=int,
+default=0,
+help="Avec --all : moteur asyncio avec N scénarios simultanés sur des navigateurs partagés"
+)
+parser.add_argument(
+"--gouverneur",
+action="store_true",
+help="Avec --async : N devient un maximum, ajusté selon la charge CPU/mémoire de l'hôte"
+)
+parser.add_argument(
+"--historique",
+nargs="?",
+const="",
+metavar="SCENARIO",
+help="Percentiles des durées d'étapes de l'historique local (sans SCENARIO : scénarios historisés)"
+)
+parser.add_argument(
+"--fenetre",
+default=DEFAUT_FENETRE,
+help=f"Avec --historique : fenêtre glissante, ex. 30m, 24h, 7j, 4s (défaut {DEFAUT_FENETRE})"
+)
+parser.add_argument(
+"--etape",
+help="Avec --historique : limite la requête à une étape"
+)
+parser.add_argument(
+"--importer",
+action="store_true",
+help="Avec --historique : importe d'abord les rapports de $SIMU_OUTPUT/rapports absents de l'historique"
+)
+parser.add_argument(
+"--retention",
+action="store_true",
+help="Lance en tâche de fond l'archivage/suppression des screenshots et rapports expirés (retention.yaml)"
+)
+parser.add_argument(
+"-c", "--charge",
+type=int,
+default=0,
+help="Avec --scenario : mode charge avec N utilisateurs virtuels simultanés"
+)
+parser.add_argument(
+"--duree",
+type=float,
+default=300,
+help="Mode charge : durée totale du tir en secondes (défaut 300)"
+)
+parser.add_argument(
+"--rampe",
+type=float,
+default=0,
+help="Mode charge : durée de la montée en charge en secondes (défaut 0)"
+)
+parser.add_argument(
+"--reflexion",
+type=parse_reflexion,
+default=(0.0, 0.0),
+help="Mode charge : temps de réflexion entre deux itérations, 'MIN-MAX' en secondes"
+)
 
 ```
 args = parser.parse_args()
 work_dir = Path.cwd()
 
+# Rétention en tâche de fond (processus détaché, débit limité), indépendante de l'action demandée
+if args.retention:
+    retention = lancer_en_arriere_plan(Path(os.environ.get('SIMU_OUTPUT', '/tmp')))
+    print_info(f"Rétention lancée en tâche de fond (pid {retention.pid})")
+    if not (args.recuperer or args.historique is not None or args.scenario or args.all):
+        return
+
+# Récupération des exécutions interrompues
+if args.recuperer:
+    recover_orphaned_journals(Path(args.recuperer))
+
+# Percentiles de l'historique local des durées
+elif args.historique is not None:
+    output_path = os.environ.get('SIMU_OUTPUT', '/tmp')
+    if not print_history(output_path, args.historique or None, args.fenetre, args.etape, args.importer):
+        exit(1)
+
 # Exécution d'un scénario unique
-if args.scenario:
+elif args.scenario:
     if not check_scenario_prerequisites(args.scenario):
         console.print("\n[red]Prérequis non satisfaits, abandon.[/red]\n")
         return
     
+    if args.charge > 0:
+        if not run_load_scenario(args.scenario, work_dir, args.charge, args.duree, args.rampe, args.reflexion):
+            console.print("\n[red bold]Aucune itération réussie[/red bold]\n")
+            exit(1)
+        return
+    
     is_success = run_scenario(args.scenario, work_dir, args.exadata)
     
     if not is_success:
@@ -472,7 +869,10 @@ elif args.all:
         print_error(f"Répertoire de scénarios introuvable: {scenarios_dir}")
         return
     
-    run_multi_scenarios(scenarios_dir)
+    if args.moteur_async > 0:
+        run_multi_scenarios_async(scenarios_dir, args.moteur_async, args.gouverneur)
+    else:
+        run_multi_scenarios(scenarios_dir, args.pool)
 
 else:
     parser.print_help()
@@ -6,9 +6,12 @@ Migré le: 2025-01-XX
 """
 
 import pytest
-from playwright.sync_api import expect
 from src.core import ScenarioPage, StepResult
 from commun import comm_portail_applicatif
+from cache_session import identification_avec_cache
+from registre_locators import expect
+
+IFRAME_PRINCIPALE = 'iframe[name="iframe_principale"]'
 
 
 class TestAAI2ConsultationDemande:
@@ -24,14 +27,20 @@ class TestAAI2ConsultationDemande:
         6. Retour au portail
     """
 
-    def test_identification(self, page: ScenarioPage, step_result: StepResult):
+    def test_identification(self, page: ScenarioPage, step_result: StepResult, execution, etape):
         """
         Identification sur le portail applicatif.
         
-        Étape commune réutilisée pour l'authentification.
+        Étape commune réutilisée pour l'authentification, court-circuitée
+        par la session en cache si elle est encore valide (cache_session).
         """
         # Délégation vers module commun avec nouvelles signatures
-        comm_portail_applicatif.EtapesCommunes().identification(page, step_result)
+        identification_avec_cache(
+            page,
+            etape,
+            execution.config,
+            lambda: comm_portail_applicatif.EtapesCommunes().identification(page, step_result),
+        )
 
     def test_portail_applicatif(self, page: ScenarioPage, step_result: StepResult):
         """
@@ -41,79 +50,72 @@ class TestAAI2ConsultationDemande:
         """
         # Localisation et clic sur lien AAI2
         aai2_link = page.get_by_role("link", name="AAI2")
-        expect(aai2_link).to_be_visible(timeout=30000)
+        expect(aai2_link).to_be_visible()
         
         page.screenshot("portail_avant_clic_aai2")
         aai2_link.click()
         
         # SUCCESS automatique si pas d'exception
 
-    def test_accueil_aai2(self, page: ScenarioPage, step_result: StepResult):
+    def test_accueil_aai2(self, page: ScenarioPage, step_result: StepResult, registre_locators):
         """
         Navigation dans l'accueil AAI2 vers la consultation des demandes.
         
         Utilise les iframes pour accéder aux fonctionnalités de l'application.
         """
-        # Accès à l'iframe principale de l'application
-        iframe_principale = page.frame_locator('iframe[name="iframe_principale"]')
-        
-        # Clic sur menu Demandes
-        menu_demandes = iframe_principale.get_by_text("Demandes", exact=True)
-        expect(menu_demandes).to_be_visible(timeout=30000)
+        # Locators de l'iframe principale, mis en cache par le registre de la page
+        menu_demandes = registre_locators.par_texte("Demandes", frame=IFRAME_PRINCIPALE, exact=True)
+        expect(menu_demandes).to_be_visible()
         menu_demandes.click()
         
         # Clic sur sous-menu "Consulter une demande"
-        lien_consulter = iframe_principale.get_by_role("link", name="Consulter une demande")
-        expect(lien_consulter).to_be_visible(timeout=30000)
+        lien_consulter = registre_locators.par_role("link", frame=IFRAME_PRINCIPALE, name="Consulter une demande")
+        expect(lien_consulter).to_be_visible()
         
         page.screenshot("aai2_avant_clic_consulter")
         lien_consulter.click()
 
-    def test_liste_demandes(self, page: ScenarioPage, step_result: StepResult):
+    def test_liste_demandes(self, page: ScenarioPage, step_result: StepResult, registre_locators):
         """
         Recherche d'une demande par nom.
         
         Saisie des critères de recherche et lancement de la recherche.
         """
-        iframe_principale = page.frame_locator('iframe[name="iframe_principale"]')
-        
         # Saisie du nom à rechercher
-        champ_nom = iframe_principale.get_by_role("textbox", name="Nom")
+        champ_nom = registre_locators.par_role("textbox", frame=IFRAME_PRINCIPALE, name="Nom")
         champ_nom.fill("test")
         
         # Clic sur bouton rechercher
-        bouton_rechercher = iframe_principale.get_by_role("button", name="Rechercher")
-        expect(bouton_rechercher).to_be_visible(timeout=30000)
+        bouton_rechercher = registre_locators.par_role("button", frame=IFRAME_PRINCIPALE, name="Rechercher")
+        expect(bouton_rechercher).to_be_visible()
         
         page.screenshot("recherche_avant_execution")
         bouton_rechercher.click()
 
-    def test_resultat_recherche(self, page: ScenarioPage, step_result: StepResult):
+    def test_resultat_recherche(self, page: ScenarioPage, step_result: StepResult, registre_locators):
         """
         Sélection d'une demande dans les résultats de recherche.
         
         Accès au détail d'une demande depuis la liste des résultats.
         """
-        iframe_principale = page.frame_locator('iframe[name="iframe_principale"]')
-        
         # Clic sur lien de visualisation de la demande
-        lien_visualisation = iframe_principale.get_by_role("link", name="Visualisation de la demande")
-        expect(lien_visualisation).to_be_visible(timeout=30000)
+        lien_visualisation = registre_locators.par_role(
+            "link", frame=IFRAME_PRINCIPALE, name="Visualisation de la demande"
+        )
+        expect(lien_visualisation).to_be_visible()
         
         page.screenshot("resultats_avant_selection")
         lien_visualisation.click()
 
-    def test_detail_demande(self, page: ScenarioPage, step_result: StepResult):
+    def test_detail_demande(self, page: ScenarioPage, step_result: StepResult, registre_locators):
         """
         Vérification de l'affichage du détail de la demande.
         
         Contrôle que la page de détail s'affiche correctement avec les informations.
         """
-        iframe_principale = page.frame_locator('iframe[name="iframe_principale"]')
-        
         # Vérification de la présence du titre de la page de détail
-        titre_detail = iframe_principale.get_by_role("heading", name="Détail de la demande")
-        expect(titre_detail).to_be_visible(timeout=30000)
+        titre_detail = registre_locators.par_role("heading", frame=IFRAME_PRINCIPALE, name="Détail de la demande")
+        expect(titre_detail).to_be_visible()
         
         page.screenshot("detail_demande_affiche")
 
@@ -125,11 +127,11 @@ class TestAAI2ConsultationDemande:
         """
         # Clic sur lien de retour (en dehors de l'iframe)
         lien_retour = page.get_by_role("link", name="Retour vers la page d'accueil")
-        expect(lien_retour).to_be_visible(timeout=30000)
+        expect(lien_retour).to_be_visible()
         lien_retour.click()
         
         # Vérification du retour sur le portail
         titre_portail = page.get_by_role("heading", name="Mes applications")
-        expect(titre_portail).to_be_visible(timeout=30000)
+        expect(titre_portail).to_be_visible()
         
         page.screenshot("retour_portail_confirme")
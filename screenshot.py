@@ -9,11 +9,19 @@
 import time
 from datetime import datetime
 import logging
-import inspect
 import pytest
 from playwright.sync_api import sync_playwright
 
-from src.utils.utils import contexte_actuel
+from enregistrements import EnregistrementEtape, StatutEtape
+from chronometrage import (
+    HARNAIS,
+    Chronometre,
+    activer_chronometre,
+    chronometrer,
+    desactiver_chronometre,
+    instrumenter_playwright,
+)
+from traces import fermer_span, ouvrir_span
 
 LOGGER = logging.getLogger(**name**)
 
@@ -26,22 +34,17 @@ def __init__(self, request):
 
     LOGGER.info("Etape [%s] ---- DEBUT ----", request.node.name[5:])
     # TODO Gestion du numero d'etape
-    self.etape = {
-        "nom": request.node.name[5:],
-        "ordre": "",
-        "date": datetime.now().isoformat(),  # '%Y-%m-%dT%H:%M:%S'
-        "duree": 0,
-        "status": 3,
-        "url": "",
-        "commentaire": "",
-        "start": time.time(),  # Pour calculer la duree
-    }
+    self.etape = EnregistrementEtape(request.node.name[5:])
+    # Début de l'étape sur horloge monotone (pour calculer la duree)
+    self.debut = time.perf_counter()
+    # Répartition du temps de l'étape (locators, actions, réseau, harnais)
+    self.chronometre = Chronometre()
     
     # NOUVEAU : Compteur de screenshot pour cette étape
     self.compteur_screenshot = 0
     
     LOGGER.debug(
-        "[%s] etape créée => %s", inspect.currentframe().f_code.co_name, self.etape
+        "[Etape.__init__] etape créée => %s", self.etape
     )
 
 def __str__(self):
@@ -58,7 +61,7 @@ def incrementer_screenshot(self):
     LOGGER.debug(
         "[Etape.incrementer_screenshot] Screenshot #%d pour l'étape '%s'", 
         self.compteur_screenshot, 
-        self.etape['nom']
+        self.etape.nom
     )
     return self.compteur_screenshot
 
@@ -73,25 +76,26 @@ def get_compteur_screenshot(self):
 
 def set_ordre(self, ordre):
     """Récupération du numéro de l'étape"""
-    self.etape["ordre"] = ordre
+    self.etape.ordre = ordre
 
 def set_duree(self):
     """Calcul de la durée de l'étape"""
-    duree = time.time() - self.etape["start"]
-    # enregiste la duree sous forme de chaine (seconde avec précision au milieme)
-    self.etape["duree"] = f"{duree:.3f}"
+    duree = time.perf_counter() - self.debut
+    # enregiste la duree en secondes (précision au millième)
+    self.etape.duree = round(duree, 3)
+    self.etape["repartition"] = self.chronometre.repartition(duree)
 
 def set_status(self, status):
     """Récupération du statut de l'étape"""
-    self.etape["status"] = status
+    self.etape.status = StatutEtape(status)
 
 def set_url(self, url):
     """Récupération de l'url de l'étape"""
-    self.etape["url"] = url
+    self.etape.url = url
 
 def set_commentaire(self, commentaire):
     """Récupération du commentaire de l'étape"""
-    self.etape["commentaire"] = commentaire
+    self.etape.commentaire = commentaire
 
 def finalise(self, ordre, status, url, commentaire, etape_scenario=True):
     """Calculs d'une fin d'étape"""
@@ -107,17 +111,17 @@ def finalise(self, ordre, status, url, commentaire, etape_scenario=True):
     if self.compteur_screenshot > 0:
         LOGGER.info(
             "[Etape.finalise] Étape '%s' terminée avec %d screenshot(s)", 
-            self.etape['nom'], 
+            self.etape.nom, 
             self.compteur_screenshot
         )
     
-    if self.etape["status"] == 0:
+    if self.etape.status == StatutEtape.SUCCES:
         LOGGER.info("✅ %s", commentaire)
-    elif self.etape["status"] == 1:
+    elif self.etape.status == StatutEtape.AVERTISSEMENT:
         LOGGER.warning("⚠️ %s", commentaire)
     else:
         LOGGER.error("❌ %s", commentaire)
-    LOGGER.info("Etape [%s] ----  FIN  ----", self.etape["nom"])
+    LOGGER.info("Etape [%s] ----  FIN  ----", self.etape.nom)
 ```
 
 @pytest.fixture(scope=“function”)
@@ -125,23 +129,25 @@ def etape(execution, request):
 “””
 Pemret de générer la page à partir du contexte
 “””
-fixture_name = inspect.currentframe().f_code.co_name
-LOGGER.debug(”[Fixture SETUP %s] ––  DEBUT  ––”, fixture_name)
+fixture_name = "etape"
 etape = Etape(request)
 execution.compteur_etape += 1
-LOGGER.debug(”[Fixture SETUP %s] ––   FIN  ––”, fixture_name)
+# Span de l'étape : parent des spans pris pendant le test (captures, ajoute_etape...)
+span_etape = ouvrir_span(f"Etape.{etape.etape.nom}", numero=execution.compteur_etape)
+instrumenter_playwright()
+jeton_chronometre = activer_chronometre(etape.chronometre)
 
 ```
 yield etape
 
-LOGGER.debug("[Fixture FINAL %s] ----  DEBUT ----", fixture_name)
+desactiver_chronometre(jeton_chronometre)
 
 # NOUVEAU : Log détaillé du nombre de screenshots
 LOGGER.info(
     "[Fixture FINAL %s] Étape %d '%s' : %d screenshot(s) pris", 
     fixture_name,
     execution.compteur_etape,
-    etape.etape['nom'],
+    etape.etape.nom,
     etape.compteur_screenshot
 )
 
@@ -152,7 +158,8 @@ LOGGER.debug(
     type(execution.etapes),
     execution.etapes,
 )
-LOGGER.debug("[Fixture FINAL %s] ----   FIN  ----", fixture_name)
+span_etape.attribut("status", int(etape.etape.status))
+fermer_span(span_etape)
 ```
 
 # ==========================================
@@ -163,10 +170,12 @@ LOGGER.debug("[Fixture FINAL %s] ----   FIN  ----", fixture_name)
 
 import logging
 from datetime import datetime
-from src.utils.utils import contexte_actuel
+from traces import attribuer, tracer
 
 LOGGER = logging.getLogger(**name**)
 
+@tracer()
+@chronometrer(HARNAIS)
 def take_screenshot(
 execution, etape, page, erreur=False, curseur_element=None, elts_flous=None, decoration=True
 ):
@@ -186,9 +195,7 @@ Args:
 Returns:
     str: Chemin relatif vers la capture d'écran
 """
-methode_name = contexte_actuel()
-LOGGER.debug("[%s] ---- DEBUT ----", methode_name)
-start = datetime.now()
+methode_name = "take_screenshot"
 LOGGER.debug("[%s] curseur_element => %s", methode_name, curseur_element)
 
 if execution.config["screenshot_dir"] is None:
@@ -203,18 +210,19 @@ else:
     # Construction du nom de fichier avec le compteur
     if erreur:
         screenshot_basename = (
-            f"{execution.compteur_etape:02d}_{numero_screenshot:02d}_Erreur_{etape.etape['nom']}"
+            f"{execution.compteur_etape:02d}_{numero_screenshot:02d}_Erreur_{etape.etape.nom}"
         )
         screenshot_title = f"❗{screenshot_basename}"
     else:
         screenshot_basename = (
-            f"{execution.compteur_etape:02d}_{numero_screenshot:02d}_{etape.etape['nom']}"
+            f"{execution.compteur_etape:02d}_{numero_screenshot:02d}_{etape.etape.nom}"
         )
         screenshot_title = f"✅{screenshot_basename}"
         
     screenshot_path = (
         f"{execution.config['screenshot_dir']}/{screenshot_basename}.png"
     )
+    attribuer(capture=screenshot_basename, decoration=decoration)
     
     LOGGER.info(
         "[%s] Prise du screenshot #%d pour l'étape %d : %s", 
@@ -265,8 +273,6 @@ else:
                 "() => { const el = document.getElementById('screenshot-mouse-pointer'); if (el) el.remove(); }"
             )
 
-duree_ms = (int)((datetime.now() - start).total_seconds() * 1000)
-LOGGER.debug("[%s]⏱️ ----  FIN  ---- (durée : %.2f ms)", methode_name, duree_ms)
 return str(screenshot_path)
 ```
 
@@ -282,7 +288,7 @@ Returns:
     dict: Informations sur les screenshots
 """
 return {
-    "nom_etape": etape.etape['nom'],
+    "nom_etape": etape.etape.nom,
     "nombre_screenshots": etape.compteur_screenshot,
     "prochain_numero": etape.compteur_screenshot + 1
 }
@@ -290,6 +296,7 @@ return {
 
 # NOUVEAU : Fonction utilitaire pour decorator_avant_screenshot (pas de changement)
 
+@tracer()
 def decoration_avant_screenshot(page, titre_page, curseur_element=None, elts_flous=[]):
 “””
 Ajout des décorations (banières, pointeur de souris, floutage des éléments)
@@ -303,8 +310,7 @@ Args:
     curseur_element: Element sur lequel dessiner le curseur
     elts_flous : elements à flouter
 """
-methode_name = contexte_actuel()
-LOGGER.debug("[%s] ---- DEBUT ----", methode_name)
+methode_name = "decoration_avant_screenshot"
 LOGGER.debug("[%s] curseur_element => %s", methode_name, curseur_element)
 
 if elts_flous is not None:
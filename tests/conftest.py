@@ -0,0 +1,10 @@
+"""Tests unitaires des modules sans dépendance au navigateur ni à l'API"""
+
+import sys
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RACINE))
+
+# Exécution de scénarios factices avec les fixtures du simulateur
+pytest_plugins = ["pytester"]
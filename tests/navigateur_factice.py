@@ -0,0 +1,135 @@
+"""Doubles de test du pool de navigateurs et des objets Playwright (sync) utilisés par les fixtures"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+COOKIE_SESSION = "session_portail"
+
+
+class ReponseFactice:
+    def __init__(self, status: int):
+        self.status = status
+
+
+class RequeteContexteFactice:
+    """`context.request` : la sonde répond 200 si le cookie de session est présent, 302 sinon"""
+
+    def __init__(self, context: "ContexteFactice"):
+        self._context = context
+
+    def get(self, url: str, **options) -> ReponseFactice:
+        self._context.evenements.append(f"sonde:{url}")
+        connecte = any(cookie["name"] == COOKIE_SESSION for cookie in self._context.cookies)
+        return ReponseFactice(200 if connecte else 302)
+
+
+class FrameFactice:
+    """Frame principale : le relevé n'existe que si les observateurs ont été injectés avant la navigation"""
+
+    name = ""
+    parent_frame = None
+
+    def __init__(self, page: "PageFactice"):
+        self._page = page
+
+    @property
+    def url(self) -> str:
+        return self._page.url
+
+    def evaluate(self, expression: str, *args):
+        if not self._page.observee:
+            return None
+        return {"lcp": 1200.0, "cls": 0.0}
+
+
+class PageFactice:
+    def __init__(self, context: "ContexteFactice"):
+        self.context = context
+        self.url = "about:blank"
+        self.observee = False
+        self.frames = [FrameFactice(self)]
+
+    def goto(self, url: str, **options) -> None:
+        self.context.evenements.append(f"goto:{url}")
+        self.url = url
+        self.observee = self.context.scripts_initialisation > 0
+
+    def screenshot(self, **options) -> bytes:
+        self.context.evenements.append(f"screenshot:{options.get('path')}")
+        return b""
+
+    def evaluate(self, expression: str, *args):
+        self.context.evenements.append("evaluate")
+
+    def is_closed(self) -> bool:
+        return False
+
+
+class ContexteFactice:
+    """BrowserContext minimal : enregistre les installations et navigations dans l'ordre"""
+
+    def __init__(self, evenements: List[str], storage_state: Optional[Dict] = None):
+        self.evenements = evenements
+        self.cookies: List[Dict] = list((storage_state or {}).get("cookies", []))
+        self.pages: List[PageFactice] = []
+        self.scripts_initialisation = 0
+        self.request = RequeteContexteFactice(self)
+
+    def route(self, motif, handler) -> None:
+        self.evenements.append("route")
+
+    def on(self, evenement: str, handler) -> None:
+        self.evenements.append(f"on:{evenement}")
+
+    def add_init_script(self, script: str) -> None:
+        self.evenements.append("add_init_script")
+        self.scripts_initialisation += 1
+
+    def new_page(self) -> PageFactice:
+        self.evenements.append("new_page")
+        page = PageFactice(self)
+        self.pages.append(page)
+        return page
+
+    def clear_cookies(self) -> None:
+        self.cookies = []
+
+    def storage_state(self) -> Dict:
+        return {"cookies": list(self.cookies), "origins": []}
+
+
+class PoolFactice:
+    """PoolNavigateurs sans navigateur : un ContexteFactice par scénario"""
+
+    def __init__(self):
+        self.evenements: List[str] = []
+        self.options_contextes: List[Dict] = []
+
+    @contextmanager
+    def contexte(self, navigateur: str, **options_contexte):
+        self.options_contextes.append(options_contexte)
+        yield ContexteFactice(self.evenements, options_contexte.get("storage_state"))
+
+
+class EtapeFactice:
+    """Etape minimale (rapport `etape` et setters utilisés par les étapes communes)"""
+
+    def __init__(self, nom: str):
+        self.etape: Dict = {"nom": nom, "status": None, "commentaire": ""}
+
+    def set_status(self, status) -> None:
+        self.etape["status"] = status
+
+    def set_commentaire(self, commentaire: str) -> None:
+        self.etape["commentaire"] = commentaire
+
+
+def execution_factice(**config) -> SimpleNamespace:
+    """Execution minimale lue par les fixtures de contexte et de page"""
+    return SimpleNamespace(
+        config=config,
+        navigateur="chromium",
+        compteur_etape=0,
+        donnees_scenario_api=None,
+    )
@@ -0,0 +1,47 @@
+"""Tests de detection_erreurs.py sur le corpus des benchmarks (benchmarks/corpus/attendus.yaml)"""
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+from detection_erreurs import DetecteurErreursPage
+
+CORPUS = Path(__file__).resolve().parent.parent / "benchmarks" / "corpus"
+ATTENDUS = yaml.safe_load((CORPUS / "attendus.yaml").read_text(encoding="utf-8"))
+
+
+@pytest.fixture(scope="module")
+def detecteur():
+    return DetecteurErreursPage()
+
+
+@pytest.mark.parametrize("fichier, type_attendu", sorted(ATTENDUS.items()))
+def test_corpus(detecteur, fichier, type_attendu):
+    erreur = detecteur.analyser_texte((CORPUS / fichier).read_text(encoding="utf-8"))
+
+    assert (erreur and erreur["type"]) == type_attendu
+
+
+@pytest.mark.parametrize(
+    "fichier, erreur_navigateur",
+    [("neterror_dns.html", "dnsNotFound"), ("neterror_connexion_refusee.html", "connectionFailure")],
+)
+def test_pages_neterror_firefox(detecteur, fichier, erreur_navigateur):
+    erreur = detecteur.analyser_texte((CORPUS / fichier).read_text(encoding="utf-8"))
+
+    assert erreur["erreur_navigateur"] == erreur_navigateur
+    assert erreur["description"] == "Erreur réseau"
+
+
+def test_page_neterror_chromium(detecteur):
+    html = '<html><body id="t" class="neterror" jstcache="0"><div class="error-code">ERR_CONNECTION_REFUSED</div>'
+
+    erreur = detecteur.analyser_texte(html)
+
+    assert (erreur["type"], erreur["erreur_navigateur"]) == ("reseau", "ERR_CONNECTION_REFUSED")
+
+
+def test_not_found_dans_un_identifiant_ignore(detecteur):
+    assert detecteur.analyser_texte('<div class="dnsNotFound">Bienvenue</div>') is None
+    assert detecteur.analyser_texte("<p>Page not found</p>")["type"] == "4xx"
@@ -0,0 +1,96 @@
+"""Tests de detection_reseau.py : erreurs bloquantes et attentes interrompues"""
+
+import time
+
+import pytest
+
+import detection_reseau
+from detection_reseau import DetecteurErreursReseau, ErreurReseauCritique, attente_interruptible
+
+
+class FrameFactice:
+    parent_frame = None
+
+
+class RequeteFactice:
+    def __init__(self, url: str, navigation: bool = True, failure: str = "net::ERR_NAME_NOT_RESOLVED"):
+        self.url = url
+        self.failure = failure
+        self.frame = FrameFactice()
+        self._navigation = navigation
+
+    def is_navigation_request(self) -> bool:
+        return self._navigation
+
+
+@pytest.fixture
+def detecteur():
+    detecteur = DetecteurErreursReseau(None, {"urls_critiques": [r"/api/"]}, descriptions_codes={})
+    jeton = detection_reseau._detecteur_courant.set(detecteur)
+    yield detecteur
+    detection_reseau._detecteur_courant.reset(jeton)
+
+
+def test_echec_navigation_principale_bloquant(detecteur):
+    detecteur._sur_echec_requete(RequeteFactice("https://portail.test/"))
+
+    with pytest.raises(ErreurReseauCritique, match="ERR_NAME_NOT_RESOLVED"):
+        detecteur.verifier()
+
+
+def test_echec_ressource_non_critique(detecteur):
+    detecteur._sur_echec_requete(RequeteFactice("https://cdn.test/logo.png", navigation=False))
+
+    detecteur.verifier()
+    assert detecteur.erreurs[0]["critique"] is False
+
+
+def test_attente_sans_detecteur_en_une_fois():
+    tranches = []
+    assert attente_interruptible(lambda tranche: tranches.append(tranche) or "ok", 30000) == "ok"
+    assert tranches == [30000]
+
+
+def test_attente_interrompue_par_une_erreur_bloquante(detecteur, monkeypatch):
+    monkeypatch.setattr(detection_reseau, "TRANCHE_ATTENTE_MS", 20)
+    tranches = []
+
+    def attendre(tranche_ms):
+        tranches.append(tranche_ms)
+        if len(tranches) == 3:
+            # Erreur reçue pendant la 3e tranche (handler Playwright)
+            detecteur._sur_echec_requete(RequeteFactice("https://portail.test/api/demandes", navigation=False))
+        time.sleep(tranche_ms / 1000)
+        raise AssertionError("élément absent")
+
+    debut = time.monotonic()
+    with pytest.raises(ErreurReseauCritique):
+        attente_interruptible(attendre, 30000)
+
+    assert time.monotonic() - debut < 1
+    assert tranches == [20, 20, 20]
+
+
+def test_attente_reussie_apres_plusieurs_tranches(detecteur, monkeypatch):
+    monkeypatch.setattr(detection_reseau, "TRANCHE_ATTENTE_MS", 10)
+    tranches = []
+
+    def attendre(tranche_ms):
+        tranches.append(tranche_ms)
+        if len(tranches) < 3:
+            raise AssertionError("élément absent")
+        return "visible"
+
+    assert attente_interruptible(attendre, 5000) == "visible"
+    assert len(tranches) == 3
+
+
+def test_attente_expiree_leve_l_assertion(detecteur, monkeypatch):
+    monkeypatch.setattr(detection_reseau, "TRANCHE_ATTENTE_MS", 10)
+
+    def attendre(tranche_ms):
+        time.sleep(tranche_ms / 1000)
+        raise AssertionError("élément absent")
+
+    with pytest.raises(AssertionError, match="élément absent"):
+        attente_interruptible(attendre, 35)
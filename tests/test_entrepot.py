@@ -0,0 +1,120 @@
+"""Tests de entrepot.py : format COPY et avancée de la marque d'ingestion"""
+
+from entrepot import MAJ_MARQUE, EntrepotResultats, ligne_copy, lignes_rapport, valeur_copy
+
+
+class CurseurFactice:
+    """Curseur psycopg2 minimal : mémorise les COPY et les requêtes exécutées"""
+
+    def __init__(self):
+        self.copies = {}
+        self.requetes = []
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, requete, parametres=None):
+        self.requetes.append((requete, parametres))
+
+    def copy_expert(self, requete, fichier):
+        self.copies[requete.split()[1]] = fichier.read()
+
+
+class ConnexionFactice:
+    def __init__(self):
+        self.curseur = CurseurFactice()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self.curseur
+
+    def marques(self):
+        return [parametres for requete, parametres in self.curseur.requetes if requete == MAJ_MARQUE]
+
+
+def rapport(nom="s"):
+    return {"scenario": nom, "date": "2026-01-01T10:00:00", "duree": 1.5, "status": 0, "briques": []}
+
+
+# === FORMAT COPY ===
+
+
+def test_valeur_copy_null_et_chaine_vide():
+    assert valeur_copy(None) == "\\N"
+    assert valeur_copy("") == ""
+
+
+def test_valeur_copy_echappements():
+    assert valeur_copy("a\tb\nc\\d\re") == "a\\tb\\nc\\\\d\\re"
+
+
+def test_valeur_copy_json():
+    assert valeur_copy({"cle": "é", "liste": [1, 2]}) == '{"cle":"é","liste":[1,2]}'
+
+
+def test_ligne_copy():
+    assert ligne_copy(("a", None, "", 3)) == "a\t\\N\t\t3\n"
+
+
+def test_lignes_rapport_nom_etape_vide_non_null():
+    chemin = "/r/app/scenario/2026-01-01/10h00/scenario.json"
+    brique = {"nom": "", "ordre": 1, "date": "", "duree": "", "status": 0, "url": "", "commentaire": ""}
+    _, etapes = lignes_rapport(chemin, "app", 0.0, {**rapport(), "briques": [brique]})
+
+    champs = etapes[0].rstrip("\n").split("\t")
+    # nom (NOT NULL) reste une chaîne vide ; date et duree vides deviennent NULL
+    assert champs[2] == ""
+    assert champs[3] == "\\N"
+    assert champs[4] == "\\N"
+
+
+# === MARQUE D'INGESTION ===
+
+
+def test_marque_avance_jusqu_au_dernier_rapport():
+    connexion = ConnexionFactice()
+    lot = [(1.0, "a", "app"), (2.0, "b", "app")]
+
+    _, bloquee = EntrepotResultats(connexion)._charger_lot("racine", lot, [rapport(), rapport()])
+
+    assert not bloquee
+    assert connexion.marques() == [("racine", 2.0, "b")]
+
+
+def test_marque_arretee_avant_le_premier_rapport_illisible():
+    connexion = ConnexionFactice()
+    lot = [(1.0, "a", "app"), (2.0, "b", "app"), (3.0, "c", "app")]
+
+    _, bloquee = EntrepotResultats(connexion)._charger_lot("racine", lot, [rapport(), None, rapport()])
+
+    assert bloquee
+    assert connexion.marques() == [("racine", 1.0, "a")]
+    # Les rapports lisibles suivants sont tout de même chargés
+    assert connexion.curseur.copies["tmp_executions"].count("\n") == 2
+
+
+def test_marque_inchangee_si_le_premier_rapport_est_illisible():
+    connexion = ConnexionFactice()
+
+    _, bloquee = EntrepotResultats(connexion)._charger_lot("racine", [(1.0, "a", "app")], [None])
+
+    assert bloquee
+    assert connexion.marques() == []
+
+
+def test_marque_bloquee_par_un_lot_precedent():
+    connexion = ConnexionFactice()
+
+    _, bloquee = EntrepotResultats(connexion)._charger_lot("racine", [(4.0, "d", "app")], [rapport()], True)
+
+    assert bloquee
+    assert connexion.marques() == []
@@ -0,0 +1,129 @@
+"""
+Tests de entrepot.py contre un serveur PostgreSQL réel : DDL du schéma et des index, COPY des lots.
+
+Connexion via les variables PGHOST, PGPORT, PGDATABASE, PGUSER, PGPASSWORD ; les tests sont
+ignorés sans psycopg2 ou sans serveur joignable. Chaque test travaille dans un schéma dédié,
+supprimé en fin de test.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from entrepot import EntrepotResultats  # noqa: E402
+
+INDEX_ATTENDUS = {
+    "idx_executions_scenario_date",
+    "idx_executions_application_date",
+    "idx_etapes_execution",
+    "idx_etapes_nom_date",
+}
+
+
+@pytest.fixture
+def connexion():
+    try:
+        connexion = psycopg2.connect(
+            host=os.environ.get("PGHOST", "localhost"),
+            port=os.environ.get("PGPORT", "5432"),
+            dbname=os.environ.get("PGDATABASE", "resultats"),
+            user=os.environ.get("PGUSER", "simulateur"),
+            password=os.environ.get("PGPASSWORD"),
+            connect_timeout=3,
+        )
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Serveur PostgreSQL indisponible: {e}")
+    schema = f"test_entrepot_{os.getpid()}"
+    with connexion, connexion.cursor() as curseur:
+        curseur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        curseur.execute(f"CREATE SCHEMA {schema}")
+        curseur.execute(f"SET search_path TO {schema}")
+    yield connexion
+    connexion.rollback()
+    with connexion, connexion.cursor() as curseur:
+        curseur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    connexion.close()
+
+
+def ecrire_rapport(racine, application, scenario, heure, rapport, age=60):
+    """Écrit rapports/<application>/<scenario>/<date>/<heure>/scenario.json, daté de age secondes"""
+    # Répertoire du jour : la reprise ne parcourt pas les dates antérieures à la veille de la marque
+    repertoire = racine / application / scenario / datetime.now().date().isoformat() / heure
+    repertoire.mkdir(parents=True)
+    chemin = repertoire / "scenario.json"
+    chemin.write_text(json.dumps(rapport), encoding="utf-8")
+    mtime = time.time() - age
+    os.utime(chemin, (mtime, mtime))
+    return chemin
+
+
+def requete(connexion, sql, parametres=None):
+    with connexion, connexion.cursor() as curseur:
+        curseur.execute(sql, parametres)
+        return curseur.fetchall()
+
+
+def test_creer_schema_idempotent_et_index(connexion):
+    entrepot = EntrepotResultats(connexion)
+    entrepot.creer_schema()
+    entrepot.creer_schema()
+
+    tables = {ligne[0] for ligne in requete(
+        connexion, "SELECT tablename FROM pg_tables WHERE schemaname = current_schema()"
+    )}
+    assert tables == {"executions", "etapes", "ingestion_marques"}
+    index = {ligne[0] for ligne in requete(
+        connexion, "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()"
+    )}
+    assert INDEX_ATTENDUS <= index
+
+
+def test_ingerer_copy_et_reprise(connexion, tmp_path):
+    entrepot = EntrepotResultats(connexion)
+    entrepot.creer_schema()
+    ecrire_rapport(tmp_path, "portail", "connexion", "10h00", {
+        "scenario": "connexion",
+        "date": "2026-01-01T10:00:00",
+        "duree": 12.5,
+        "status": 0,
+        "commentaire": "ligne 1\nligne 2\tchemin C:\\temp",
+        "briques": [
+            {"nom": "accueil", "ordre": 1, "date": "2026-01-01T10:00:01", "duree": 2.0, "status": 0,
+             "url": "https://portail/accueil", "commentaire": "", "reseau": {"requetes": 12}},
+            {"nom": "", "ordre": 2, "date": "", "duree": 0.5, "status": 2},
+        ],
+    }, age=120)
+    ecrire_rapport(tmp_path, "portail", "recherche", "10h05", {
+        "scenario": "recherche", "date": "2026-01-01T10:05:00", "duree": 3.0, "status": 0, "briques": [],
+    }, age=60)
+
+    resultat = entrepot.ingerer(tmp_path)
+
+    assert (resultat["rapports"], resultat["illisibles"], resultat["etapes"]) == (2, 0, 2)
+    executions = requete(connexion, "SELECT scenario, application, duree, commentaire FROM executions ORDER BY date")
+    assert executions == [
+        ("connexion", "portail", 12.5, "ligne 1\nligne 2\tchemin C:\\temp"),
+        ("recherche", "portail", 3.0, None),
+    ]
+    etapes = requete(connexion, "SELECT ordre, nom, date, commentaire, sections FROM etapes ORDER BY ordre")
+    assert etapes[0] == (1, "accueil", datetime(2026, 1, 1, 10, 0, 1), "", {"reseau": {"requetes": 12}})
+    # Chaîne vide conservée pour le texte, NULL pour les colonnes non texte
+    assert etapes[1] == (2, "", None, None, None)
+
+    marque = entrepot.marque(str(tmp_path.resolve()))
+    assert marque is not None and marque[1].endswith(os.path.join("10h05", "scenario.json"))
+
+    # Reprise : rien de nouveau, puis seul le rapport ajouté est chargé
+    assert entrepot.ingerer(tmp_path)["rapports"] == 0
+    ecrire_rapport(tmp_path, "portail", "recherche", "10h10", {
+        "scenario": "recherche", "date": "2026-01-01T10:10:00", "status": 0, "briques": [{"nom": "resultats"}],
+    }, age=10)
+    resultat = entrepot.ingerer(tmp_path)
+    assert (resultat["rapports"], resultat["etapes"]) == (1, 1)
+    assert requete(connexion, "SELECT count(*) FROM executions") == [(3,)]
+    assert entrepot.marque(str(tmp_path.resolve()))[1].endswith(os.path.join("10h10", "scenario.json"))
@@ -0,0 +1,79 @@
+"""Tests de journal_reseau.py : enregistrements compacts et agrégat d'étape"""
+
+import gzip
+import json
+
+from journal_reseau import JournalReseau, modele_url
+
+
+class RequeteFactice:
+    method = "GET"
+    resource_type = "document"
+
+    def __init__(self, url: str, failure=None):
+        self.url = url
+        self.failure = failure
+        self.timing = {
+            "startTime": 1700000000000.0,
+            "domainLookupStart": 1.0,
+            "domainLookupEnd": 3.0,
+            "connectStart": 3.0,
+            "secureConnectionStart": 5.0,
+            "connectEnd": 9.0,
+            "requestStart": 10.0,
+            "responseStart": 40.0,
+            "responseEnd": 55.0,
+        }
+
+    def sizes(self):
+        raise AssertionError("aller-retour au navigateur inattendu")
+
+
+class ReponseFactice:
+    def __init__(self, request, status: int, headers):
+        self.request = request
+        self.status = status
+        self.headers = headers
+
+
+def lire_journal(chemin):
+    with gzip.open(chemin, "rt", encoding="utf-8") as fichier:
+        return [json.loads(ligne) for ligne in fichier]
+
+
+def test_modele_url_remplace_les_segments_variables():
+    assert modele_url("https://a.test/demandes/12345/pieces?x=1") == "https://a.test/demandes/{id}/pieces?x"
+
+
+def test_taille_issue_du_content_length(tmp_path):
+    chemin = tmp_path / "reseau.ndjson.gz"
+    journal = JournalReseau(str(chemin))
+    journal.debuter_etape("recherche")
+
+    avec_taille = RequeteFactice("https://a.test/recherche")
+    chunked = RequeteFactice("https://a.test/resultats")
+    journal._sur_reponse(ReponseFactice(avec_taille, 200, {"content-length": "2048"}))
+    journal._sur_reponse(ReponseFactice(chunked, 200, {"transfer-encoding": "chunked"}))
+    journal._sur_fin_requete(avec_taille)
+    journal._sur_fin_requete(chunked)
+    journal.fermer()
+
+    premier, second = lire_journal(chemin)
+    assert (premier["etape"], premier["status"], premier["taille"]) == ("recherche", 200, 2048)
+    assert (premier["dns"], premier["tls"], premier["ttfb"], premier["duree"]) == (2.0, 4.0, 30.0, 55.0)
+    assert second["taille"] is None
+    agregat = journal.relever_agregat()
+    assert (agregat["nb_requetes"], agregat["octets"]) == (2, 2048)
+
+
+def test_requete_en_echec(tmp_path):
+    chemin = tmp_path / "reseau.ndjson.gz"
+    journal = JournalReseau(str(chemin))
+
+    journal._sur_fin_requete(RequeteFactice("https://a.test/api", failure="net::ERR_CONNECTION_REFUSED"))
+    journal.fermer()
+
+    (enregistrement,) = lire_journal(chemin)
+    assert enregistrement["status"] is None
+    assert enregistrement["echec"] == "net::ERR_CONNECTION_REFUSED"
+    assert journal.relever_agregat()["nb_erreurs"] == 1
@@ -0,0 +1,138 @@
+"""Tests de moteur_async.py : API d'étape et exécution de scenario_exemple par le moteur"""
+
+import sys
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from enregistrements import StatutEtape
+from moteur_async import EtapeAsync, ScenarioAsync, charger_etapes
+
+SCENARIO_EXEMPLE = Path(__file__).resolve().parent.parent / "scenario_exemple.py"
+
+# === SITE AAI2 LOCAL ===
+
+PAGES = {
+    "/": """<h1>Mes applications</h1><a href="/aai2">AAI2</a>""",
+    "/aai2": """<a href="/">Retour vers la page d'accueil</a>
+<iframe name="iframe_principale" src="/aai2/menu" width="800" height="400"></iframe>""",
+    "/aai2/menu": """<nav><span>Demandes</span> <a href="/aai2/recherche">Consulter une demande</a></nav>""",
+    "/aai2/recherche": """<form action="/aai2/resultats"><label>Nom <input name="nom"></label>
+<button type="submit">Rechercher</button></form>""",
+    "/aai2/resultats": """<table><tr><td><a href="/aai2/detail">Visualisation de la demande</a></td></tr></table>""",
+    "/aai2/detail": """<h1>Détail de la demande</h1><p>Demande test</p>""",
+}
+
+
+class GestionnaireAai2(BaseHTTPRequestHandler):
+    def do_GET(self):
+        contenu = PAGES.get(self.path.split("?")[0])
+        corps = f"<!DOCTYPE html><html lang='fr'><meta charset='utf-8'><body>{contenu}</body></html>".encode()
+        self.send_response(200 if contenu else 404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site_aai2():
+    serveur = ThreadingHTTPServer(("127.0.0.1", 0), GestionnaireAai2)
+    thread = threading.Thread(target=serveur.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{serveur.server_address[1]}"
+    serveur.shutdown()
+    serveur.server_close()
+
+
+# === MODULES EXTERNES DU SCÉNARIO (src.core, commun) ===
+
+
+@pytest.fixture
+def modules_scenario(monkeypatch):
+    """src.core et commun.comm_portail_applicatif remplacés : identification = ouverture du portail"""
+    src = types.ModuleType("src")
+    core = types.ModuleType("src.core")
+    core.ScenarioPage = core.StepResult = object
+    src.core = core
+
+    class EtapesCommunes:
+        def identification(self, page, step_result):
+            page.goto(page.url.split("/aai2")[0].rstrip("/") + "/")
+            step_result.set_commentaire("Identification effectuée")
+
+    commun = types.ModuleType("commun")
+    portail = types.ModuleType("commun.comm_portail_applicatif")
+    portail.EtapesCommunes = EtapesCommunes
+    commun.comm_portail_applicatif = portail
+
+    for nom, module in {"src": src, "src.core": core, "commun": commun, "commun.comm_portail_applicatif": portail}.items():
+        monkeypatch.setitem(sys.modules, nom, module)
+
+
+def test_etapes_du_scenario_exemple_toutes_fournies(modules_scenario):
+    scenario = ScenarioAsync(SCENARIO_EXEMPLE, {})
+    etapes = charger_etapes(SCENARIO_EXEMPLE)
+    registre = object()
+
+    assert [fonction.__name__ for fonction in etapes][:2] == ["test_identification", "test_portail_applicatif"]
+    for ordre, fonction in enumerate(etapes, start=1):
+        arguments = scenario._arguments(fonction, "page", EtapeAsync(fonction.__name__[5:], ordre), registre)
+        if "registre_locators" in arguments:
+            assert arguments["registre_locators"] is registre
+
+
+def test_parametre_inconnu_signale():
+    def test_etape(page, fixture_inconnue):
+        pass
+
+    with pytest.raises(TypeError, match="fixture_inconnue"):
+        ScenarioAsync(SCENARIO_EXEMPLE, {})._arguments(test_etape, "page", EtapeAsync("etape", 1))
+
+
+def test_etape_conserve_commentaire_et_statut_positionnes():
+    etape = EtapeAsync("identification", 1)
+    etape.set_commentaire("Session réutilisée")
+    etape.finalise(StatutEtape.SUCCES, "https://portail.test/", "")
+    assert (etape.etape.status, etape.etape.commentaire) == (StatutEtape.SUCCES, "Session réutilisée")
+
+    etape = EtapeAsync("recherche", 2)
+    etape.set_status(StatutEtape.ERREUR)
+    etape.finalise(StatutEtape.SUCCES, "https://portail.test/", "")
+    assert etape.etape.status == StatutEtape.ERREUR
+
+    etape = EtapeAsync("detail", 3)
+    etape.finalise(StatutEtape.ERREUR, "https://portail.test/", "Timeout")
+    assert (etape.etape.status, etape.etape.commentaire) == (StatutEtape.ERREUR, "Timeout")
+
+
+def test_scenario_exemple_execute_par_le_moteur(modules_scenario, site_aai2, tmp_path):
+    pytest.importorskip("playwright")
+    from moteur_async import executer_scenarios
+
+    config = {
+        "url_initiale": f"{site_aai2}/",
+        "nom_scenario": "aai2_consultation_demande",
+        "output_path": str(tmp_path),
+        "apprentissage_locators": True,
+        "screenshot_dir": None,
+    }
+    try:
+        (rapport,) = executer_scenarios(
+            [ScenarioAsync(SCENARIO_EXEMPLE, config)],
+            navigateur="chromium",
+            nb_navigateurs=1,
+            options_lancement={"headless": True},
+        )
+    except Exception as e:
+        pytest.skip(f"Navigateur Playwright indisponible: {e}")
+
+    assert [brique["status"] for brique in rapport["briques"]] == [0] * 7, rapport
+    assert rapport["briques"][0]["commentaire"] == "Identification effectuée"
+    assert (tmp_path / "apprentissage_locators" / "aai2_consultation_demande.json").exists()
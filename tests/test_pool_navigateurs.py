@@ -0,0 +1,213 @@
+"""Tests de pool_navigateurs.py : page des scénarios ouverte sur le contexte du pool"""
+
+import json
+
+import pytest
+
+from cache_session import COMMENTAIRE_SESSION_REUTILISEE
+from navigateur_factice import EtapeFactice, PoolFactice, execution_factice
+from pool_navigateurs import PageScenario
+
+CONFTEST_SCENARIO = """
+from journal_reseau import journal_reseau
+from politique_routage import politique_routage
+from pool_navigateurs import contexte_navigateur, page
+"""
+
+
+class PluginScenarioFactice:
+    """Fixtures fournies par le runner et src.core, remplacées par des doubles"""
+
+    def __init__(self, pool, execution):
+        self.pool = pool
+        self.execution_scenario = execution
+        self.etapes = []
+
+    @pytest.fixture(scope="session")
+    def pool_navigateurs(self):
+        return self.pool
+
+    @pytest.fixture(scope="session")
+    def execution(self):
+        return self.execution_scenario
+
+    @pytest.fixture
+    def etape(self, request):
+        etape = EtapeFactice(request.node.name)
+        self.etapes.append(etape)
+        return etape
+
+
+def executer_scenario(pytester, pool, execution, scenario: str, conftest: str = CONFTEST_SCENARIO):
+    pytester.makeconftest(conftest)
+    pytester.makepyfile(scenario)
+    plugin = PluginScenarioFactice(pool, execution)
+    return pytester.runpytest_inprocess(plugins=[plugin]), plugin
+
+
+def test_page_ouverte_sur_le_contexte_du_pool(pytester):
+    pool = PoolFactice()
+    execution = execution_factice(url_initiale="https://portail.test/", mesures_navigateur=False)
+
+    resultat, _ = executer_scenario(
+        pytester,
+        pool,
+        execution,
+        """
+        def test_etape_1(page):
+            assert page.url == "https://portail.test/"
+
+        def test_etape_2(page, pool_navigateurs):
+            # Même page d'une étape à l'autre
+            assert page.context.pages == [page._page]
+        """,
+    )
+
+    resultat.assert_outcomes(passed=2)
+    assert len(pool.options_contextes) == 1
+    assert pool.evenements == ["new_page", "goto:https://portail.test/"]
+
+
+def test_screenshot_nomme_par_etape(tmp_path):
+    pool = PoolFactice()
+    execution = execution_factice(screenshot_dir=str(tmp_path))
+    with pool.contexte("chromium") as context:
+        page = PageScenario(context.new_page(), execution)
+
+        execution.compteur_etape = 1
+        premier = page.screenshot("avant_clic")
+        second = page.screenshot("apres_clic")
+        execution.compteur_etape = 2
+        troisieme = page.screenshot("detail")
+
+    assert premier == f"{tmp_path}/01_01_avant_clic.png"
+    assert second == f"{tmp_path}/01_02_apres_clic.png"
+    assert troisieme == f"{tmp_path}/02_01_detail.png"
+    assert pool.evenements[-1] == f"screenshot:{troisieme}"
+
+
+def test_screenshot_sans_repertoire():
+    pool = PoolFactice()
+    with pool.contexte("chromium") as context:
+        page = PageScenario(context.new_page(), execution_factice(screenshot_dir=None))
+
+        assert page.screenshot("avant_clic") is None
+    assert pool.evenements == ["new_page"]
+
+
+def test_routage_installe_avant_la_premiere_navigation(pytester):
+    pool = PoolFactice()
+    execution = execution_factice(
+        url_initiale="https://portail.test/",
+        mesures_navigateur=False,
+        routage={"bloquer_types": ["image", "font"]},
+    )
+
+    resultat, _ = executer_scenario(pytester, pool, execution, "def test_etape(page):\n    pass\n")
+
+    resultat.assert_outcomes(passed=1)
+    assert pool.evenements == ["route", "new_page", "goto:https://portail.test/"]
+
+
+def test_journal_reseau_installe_avant_la_premiere_navigation(pytester, tmp_path):
+    pool = PoolFactice()
+    execution = execution_factice(
+        url_initiale="https://portail.test/",
+        mesures_navigateur=False,
+        generer_har=True,
+        mode_har="timings",
+        report_dir=str(tmp_path),
+    )
+
+    resultat, _ = executer_scenario(pytester, pool, execution, "def test_etape(page):\n    pass\n")
+
+    resultat.assert_outcomes(passed=1)
+    assert pool.evenements == [
+        "on:response",
+        "on:requestfinished",
+        "on:requestfailed",
+        "new_page",
+        "goto:https://portail.test/",
+    ]
+
+
+def test_mesures_releves_sur_la_page_de_l_etape(pytester):
+    pool = PoolFactice()
+    execution = execution_factice(url_initiale="https://portail.test/")
+
+    resultat, plugin = executer_scenario(
+        pytester,
+        pool,
+        execution,
+        "def test_etape(page):\n    pass\n",
+        conftest=CONFTEST_SCENARIO + "from mesures_navigateur import mesures_etape\n",
+    )
+
+    resultat.assert_outcomes(passed=1)
+    assert pool.evenements == ["add_init_script", "new_page", "goto:https://portail.test/"]
+    (etape,) = plugin.etapes
+    assert etape.etape["mesures"] == [{"lcp": 1200.0, "cls": 0.0, "frame": "principale"}]
+
+
+SCENARIO_IDENTIFICATION = """
+from cache_session import identification_avec_cache
+from navigateur_factice import COOKIE_SESSION
+
+
+def test_identification(page, etape, execution):
+    def identification():
+        page.goto("https://portail.test/connexion")
+        page.context.cookies.append({"name": COOKIE_SESSION, "value": "jeton"})
+
+    identification_avec_cache(page, etape, execution.config, identification)
+"""
+
+
+def test_seconde_execution_reutilise_la_session(pytester, tmp_path):
+    config = dict(
+        url_initiale="https://portail.test/",
+        mesures_navigateur=False,
+        cache_session=True,
+        output_path=str(tmp_path),
+    )
+
+    # 1re exécution : identification complète, session mise en cache
+    pool = PoolFactice()
+    resultat, plugin = executer_scenario(pytester, pool, execution_factice(**config), SCENARIO_IDENTIFICATION)
+    resultat.assert_outcomes(passed=1)
+    assert pool.options_contextes == [{}]
+    assert "goto:https://portail.test/connexion" in pool.evenements
+    assert plugin.etapes[0].etape["session_reutilisee"] is False
+
+    # 2e exécution : contexte créé avec la session en cache, acceptée par la sonde
+    pool = PoolFactice()
+    resultat, plugin = executer_scenario(pytester, pool, execution_factice(**config), SCENARIO_IDENTIFICATION)
+    resultat.assert_outcomes(passed=1)
+    assert pool.options_contextes[0]["storage_state"]["cookies"][0]["value"] == "jeton"
+    assert "sonde:https://portail.test/" in pool.evenements
+    assert "goto:https://portail.test/connexion" not in pool.evenements
+    assert plugin.etapes[0].etape["session_reutilisee"] is True
+    assert plugin.etapes[0].etape["commentaire"] == COMMENTAIRE_SESSION_REUTILISEE
+
+
+def test_session_refusee_identification_complete(pytester, tmp_path):
+    config = dict(
+        url_initiale="https://portail.test/",
+        mesures_navigateur=False,
+        cache_session=True,
+        output_path=str(tmp_path),
+    )
+    executer_scenario(pytester, PoolFactice(), execution_factice(**config), SCENARIO_IDENTIFICATION)
+
+    # Session expirée côté portail : le cookie en cache n'est plus accepté par la sonde
+    (fichier_cache,) = (tmp_path / "cache_sessions").glob("*.json")
+    fichier_cache.write_text(json.dumps({"cookies": [{"name": "expire", "value": "jeton"}], "origins": []}))
+
+    pool = PoolFactice()
+    resultat, plugin = executer_scenario(pytester, pool, execution_factice(**config), SCENARIO_IDENTIFICATION)
+
+    resultat.assert_outcomes(passed=1)
+    assert "sonde:https://portail.test/" in pool.evenements
+    assert "goto:https://portail.test/connexion" in pool.evenements
+    assert plugin.etapes[0].etape["session_reutilisee"] is False
+    assert json.loads(fichier_cache.read_text())["cookies"] == [{"name": "session_portail", "value": "jeton"}]
@@ -0,0 +1,159 @@
+"""Tests de progression.py contre l'endpoint local benchmarks/stub_progression.py"""
+
+import importlib.util
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests")
+
+import progression  # noqa: E402
+from enregistrements import EnregistrementEtape, StatutEtape  # noqa: E402
+from progression import FluxProgression  # noqa: E402
+
+FICHIER_STUB = Path(__file__).resolve().parent.parent / "benchmarks" / "stub_progression.py"
+_spec = importlib.util.spec_from_file_location("stub_progression", FICHIER_STUB)
+stub_progression = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(stub_progression)
+
+ENTETE = {"scenario": "aai2_consultation_demande", "identifiant": "test"}
+
+
+class Endpoint:
+    """Endpoint de progression du stub, lancé sur un port libre ; lots reçus relus depuis sa sortie"""
+
+    def __init__(self, sortie: Path, latence: float = 0.0, taux_echec: float = 0.0):
+        gestionnaire = type(
+            "Gestionnaire",
+            (stub_progression.GestionnaireProgression,),
+            {"latence": latence, "taux_echec": taux_echec, "sortie": str(sortie)},
+        )
+        self.sortie = sortie
+        self.serveur = ThreadingHTTPServer(("127.0.0.1", 0), gestionnaire)
+        self.url = f"http://127.0.0.1:{self.serveur.server_address[1]}/progression"
+        threading.Thread(target=self.serveur.serve_forever, daemon=True).start()
+
+    def lots(self):
+        if not self.sortie.exists():
+            return []
+        return [json.loads(ligne) for ligne in self.sortie.read_text(encoding="utf-8").splitlines()]
+
+    def evenements(self):
+        return [evenement for lot in self.lots() for evenement in lot["evenements"]]
+
+    def fermer(self):
+        self.serveur.shutdown()
+        self.serveur.server_close()
+
+
+@pytest.fixture
+def endpoint(tmp_path):
+    endpoints = []
+
+    def creer(**options):
+        endpoints.append(Endpoint(tmp_path / f"lots_{len(endpoints)}.ndjson", **options))
+        return endpoints[-1]
+
+    yield creer
+    for point in endpoints:
+        point.fermer()
+
+
+def fin(nom: str, ordre: int) -> EnregistrementEtape:
+    return EnregistrementEtape(nom, ordre, duree=0.5, status=StatutEtape.SUCCES)
+
+
+def test_envoi_par_lots(endpoint):
+    point = endpoint()
+    flux = FluxProgression(point.url, ENTETE, intervalle=10)
+    flux.start()
+
+    for numero in range(120):
+        flux.debut_etape(f"etape_{numero}")
+    flux.arreter(status=0)
+
+    lots = point.lots()
+    assert all(len(lot["evenements"]) <= progression.TAILLE_LOT for lot in lots)
+    assert len(lots) == 3
+    assert [evenement["nom"] for evenement in point.evenements()[:-1]] == [f"etape_{numero}" for numero in range(120)]
+    assert point.evenements()[-1]["type"] == "fin_scenario"
+    assert lots[0]["scenario"] == ENTETE["scenario"]
+    assert (flux.envoyes, flux.abandonnes) == (121, 0)
+
+
+def test_coalescence_d_une_meme_etape(endpoint):
+    point = endpoint()
+    flux = FluxProgression(point.url, ENTETE, intervalle=10)
+    flux.start()
+
+    flux.debut_etape("identification")
+    flux.fin_etape(fin("identification", 1))
+    flux.debut_etape("portail")
+    flux.arreter(status=0)
+
+    assert [(evenement["type"], evenement.get("nom")) for evenement in point.evenements()] == [
+        ("fin", "identification"),
+        ("debut", "portail"),
+        ("fin_scenario", None),
+    ]
+
+
+def test_tampon_plein_abandonne(endpoint):
+    point = endpoint()
+    flux = FluxProgression(point.url, ENTETE, intervalle=10, capacite=5)
+    flux.start()
+
+    for numero in range(10):
+        flux.debut_etape(f"etape_{numero}")
+    flux.arreter(status=0)
+
+    # 5 étapes en trop, puis la fin de scénario (tampon toujours plein)
+    assert (flux.envoyes, flux.abandonnes) == (5, 6)
+    assert len(point.evenements()) == 5
+
+
+def test_endpoint_en_echec_abandonne(endpoint):
+    point = endpoint(taux_echec=1.0)
+    flux = FluxProgression(point.url, ENTETE, intervalle=0.05)
+    flux.start()
+
+    flux.debut_etape("identification")
+    time.sleep(0.3)
+    flux.fin_etape(fin("identification", 1))
+    flux.arreter(status=2)
+
+    assert point.lots() == []
+    assert (flux.envoyes, flux.abandonnes) == (0, 3)
+
+
+def test_endpoint_injoignable_abandonne():
+    flux = FluxProgression("http://127.0.0.1:9/progression", ENTETE, intervalle=0.05)
+    flux.start()
+
+    flux.debut_etape("identification")
+    flux.arreter(status=0)
+
+    assert (flux.envoyes, flux.abandonnes) == (0, 2)
+
+
+def test_thread_du_test_jamais_bloque(endpoint):
+    # Endpoint lent : chaque lot met 200 ms à être accepté
+    point = endpoint(latence=200)
+    flux = FluxProgression(point.url, ENTETE, intervalle=0.01)
+    flux.start()
+
+    flux.debut_etape("etape_0")
+    time.sleep(0.1)  # un envoi est en cours
+    debut = time.perf_counter()
+    for numero in range(1, 200):
+        flux.debut_etape(f"etape_{numero}")
+        flux.fin_etape(fin(f"etape_{numero}", numero))
+    duree = time.perf_counter() - debut
+    flux.arreter(status=0)
+
+    assert duree < 0.1
+    assert flux.envoyes + flux.abandonnes == 201
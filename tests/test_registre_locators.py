@@ -0,0 +1,119 @@
+"""Tests de registre_locators.py : cache des locators et proxy des locators appris"""
+
+from registre_locators import ApprentissageCss, LocatorDiffere, RegistreLocators, resoudre_locator
+
+
+class LocatorFactice:
+    def __init__(self, racine: "RacineFactice", requete: str):
+        self.racine = racine
+        self.requete = requete
+        self.clics = 0
+
+    def evaluate_all(self, script: str, argument):
+        if "parties" in script:
+            return ["#menu > a:nth-of-type(2)", "Consulter une demande"]
+        # Vérification d'un chemin appris
+        return self.requete in self.racine.chemins_valides
+
+    def click(self) -> None:
+        self.clics += 1
+
+
+class RacineFactice:
+    """Page ou frame locator : enregistre les requêtes construites"""
+
+    def __init__(self, chemins_valides=()):
+        self.chemins_valides = set(chemins_valides)
+        self.requetes = []
+
+    def get_by_role(self, role: str, **options) -> LocatorFactice:
+        self.requetes.append(f"role={role}")
+        return LocatorFactice(self, f"role={role}")
+
+    def get_by_text(self, texte: str, exact=None) -> LocatorFactice:
+        self.requetes.append(f"texte={texte}")
+        return LocatorFactice(self, f"texte={texte}")
+
+    def locator(self, chemin_css: str) -> LocatorFactice:
+        self.requetes.append(f"css={chemin_css}")
+        return LocatorFactice(self, chemin_css)
+
+
+class PageFactice(RacineFactice):
+    def __init__(self, chemins_valides=()):
+        super().__init__(chemins_valides)
+        self.handlers = {}
+        self.frames = {}
+
+    def on(self, evenement: str, handler) -> None:
+        self.handlers[evenement] = handler
+
+    def frame_locator(self, selecteur: str) -> RacineFactice:
+        return self.frames.setdefault(selecteur, RacineFactice(self.chemins_valides))
+
+    def naviguer(self, parent_frame=None) -> None:
+        self.handlers["framenavigated"](type("Frame", (), {"parent_frame": parent_frame})())
+
+
+def test_locators_mis_en_cache_jusqu_a_la_navigation():
+    page = PageFactice()
+    registre = RegistreLocators(page)
+
+    premier = registre.par_role("link", frame="iframe", name="Consulter")
+    assert registre.par_role("link", frame="iframe", name="Consulter") is premier
+    premier.click()
+    premier.click()
+    assert page.frame_locator("iframe").requetes == ["role=link"]
+
+    page.naviguer()
+    assert registre.par_role("link", frame="iframe", name="Consulter") is not premier
+
+
+def test_proxy_resolu_a_la_premiere_utilisation(tmp_path):
+    page = PageFactice()
+    registre = RegistreLocators(page, ApprentissageCss(str(tmp_path / "appris.json")))
+
+    lien = registre.par_role("link", name="Consulter une demande")
+    assert isinstance(lien, LocatorDiffere)
+    assert page.requetes == []
+
+    lien.click()
+    assert page.requetes == ["role=link"]
+    assert resoudre_locator(lien).clics == 1
+    assert resoudre_locator(page) is page
+
+
+def test_chemin_appris_utilise_puis_reverifie_apres_navigation(tmp_path):
+    apprentissage = ApprentissageCss(str(tmp_path / "appris.json"))
+    page = PageFactice()
+    registre = RegistreLocators(page, apprentissage)
+
+    # 1re exécution : requête d'origine, chemin CSS appris en fin d'étape
+    registre.par_role("link", name="Consulter une demande").click()
+    registre.apprendre()
+    apprentissage.enregistrer()
+
+    # 2e exécution : le chemin appris est vérifié puis utilisé
+    page = PageFactice(chemins_valides={"#menu > a:nth-of-type(2)"})
+    registre = RegistreLocators(page, ApprentissageCss(str(tmp_path / "appris.json")).charger())
+    lien = registre.par_role("link", name="Consulter une demande")
+    assert resoudre_locator(lien).requete == "#menu > a:nth-of-type(2)"
+
+    # Après une navigation, le chemin n'est plus valide : requête d'origine
+    page.chemins_valides.clear()
+    page.naviguer()
+    assert resoudre_locator(lien).requete == "role=link"
+
+
+def test_cle_stable_quelle_que_soit_la_strategie(tmp_path):
+    apprentissage = ApprentissageCss(str(tmp_path / "appris.json"))
+    apprentissage.memoriser("|role=link|name=Consulter une demande", "#menu > a:nth-of-type(2)", "Consulter une demande")
+    page = PageFactice(chemins_valides={"#menu > a:nth-of-type(2)"})
+    registre = RegistreLocators(page, apprentissage)
+
+    lien = registre.par_role("link", name="Consulter une demande")
+    assert resoudre_locator(lien).requete == "#menu > a:nth-of-type(2)"
+    page.chemins_valides.clear()
+    page.naviguer()
+    assert resoudre_locator(lien).requete == "role=link"
+    assert lien.cle == "|role=link|name=Consulter une demande"
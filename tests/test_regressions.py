@@ -0,0 +1,84 @@
+"""Tests de regressions.py : seuils, section regression et escalades"""
+
+from enregistrements import EnregistrementEtape, StatutEtape
+from regressions import (
+    ECART_MIN_MS,
+    ESCALADE_AUCUNE,
+    ESCALADE_ETAPE,
+    ESCALADE_SCENARIO,
+    DetecteurRegressions,
+)
+
+# médiane 1000 ms, MAD 100 ms : seuil = max(1000 + 3 * 1.4826 * 100, 1500, 1000 + 500) = 1500 ms
+REFERENCES = {"recherche": (1000.0, 100.0, 30)}
+
+
+def etape(duree_s, status=StatutEtape.SUCCES, nom="recherche", commentaire="ok"):
+    return EnregistrementEtape(nom, 1, duree=duree_s, status=status, commentaire=commentaire)
+
+
+def test_seuil_plus_grand_des_trois_ecarts():
+    detecteur = DetecteurRegressions({"a": (1000.0, 400.0, 30), "b": (100.0, 0.0, 30)})
+    assert round(detecteur.seuils["a"][0], 1) == round(1000 + 3 * 1.4826 * 400, 1)
+    assert detecteur.seuils["b"][0] == 100 + ECART_MIN_MS
+
+
+def test_references_insuffisantes_ignorees():
+    detecteur = DetecteurRegressions({"recherche": (1000.0, 100.0, 5)})
+    assert detecteur.verifier(etape(10.0)) is None
+
+
+def test_sous_le_seuil_pas_de_regression():
+    enregistrement = etape(1.4)
+    assert DetecteurRegressions(REFERENCES).verifier(enregistrement) is None
+    assert "regression" not in enregistrement
+
+
+def test_regression_section_et_statut_inchange_en_escalade_scenario():
+    detecteur = DetecteurRegressions(REFERENCES, escalade=ESCALADE_SCENARIO)
+    enregistrement = etape(3.0)
+
+    regression = detecteur.verifier(enregistrement)
+
+    assert regression == {"duree_ms": 3000.0, "mediane_ms": 1000.0, "seuil_ms": 1500.0, "rapport": 3.0}
+    assert enregistrement["regression"] is regression
+    assert enregistrement.status == StatutEtape.SUCCES
+    assert detecteur.regressions == ["recherche"]
+
+
+def test_etape_en_erreur_non_verifiee():
+    assert DetecteurRegressions(REFERENCES).verifier(etape(3.0, status=StatutEtape.ERREUR)) is None
+
+
+def test_escalade_etape_garde_le_statut_initial():
+    detecteur = DetecteurRegressions(REFERENCES, escalade=ESCALADE_ETAPE)
+    enregistrement = etape(3.0)
+
+    detecteur.verifier(enregistrement)
+
+    assert enregistrement.status == StatutEtape.AVERTISSEMENT
+    assert enregistrement.commentaire == "ok - dégradation de performance"
+    assert DetecteurRegressions.statut_initial(enregistrement) == (int(StatutEtape.SUCCES), "ok")
+
+
+def test_statut_initial_sans_escalade():
+    enregistrement = etape(1.0, status=StatutEtape.ERREUR, commentaire="ko")
+    assert DetecteurRegressions.statut_initial(enregistrement) == (int(StatutEtape.ERREUR), "ko")
+
+
+def test_escalader_scenario():
+    detecteur = DetecteurRegressions(REFERENCES)
+    detecteur.verifier(etape(3.0))
+
+    assert detecteur.escalader(int(StatutEtape.SUCCES), "ok") == (
+        int(StatutEtape.AVERTISSEMENT),
+        "ok - Dégradation de performance : recherche",
+    )
+    assert detecteur.escalader(int(StatutEtape.ERREUR), "ko") == (int(StatutEtape.ERREUR), "ko")
+
+
+def test_escalader_aucune_ou_sans_regression():
+    aucune = DetecteurRegressions(REFERENCES, escalade=ESCALADE_AUCUNE)
+    aucune.verifier(etape(3.0))
+    assert aucune.escalader(int(StatutEtape.SUCCES), "ok") == (int(StatutEtape.SUCCES), "ok")
+    assert DetecteurRegressions(REFERENCES).escalader(int(StatutEtape.SUCCES), "ok") == (int(StatutEtape.SUCCES), "ok")
@@ -0,0 +1,96 @@
+"""Tests de requete_rapports.py : fusion des partitions, agrégats et conservation des exécutions supprimées"""
+
+import numpy as np
+
+from requete_rapports import COLONNES_TEXTE, TableEtapes, _encoder, conserver_executions_supprimees
+
+
+def partition(lignes, chemins):
+    """Partition à partir de lignes (application, scenario, etape, status, duree_ms, execution)"""
+    colonnes = list(zip(*lignes))
+    resultat = {}
+    for position, colonne in enumerate(COLONNES_TEXTE):
+        resultat[f"dict_{colonne}"], resultat[colonne] = _encoder(list(colonnes[position]))
+    resultat["status"] = np.array(colonnes[3], dtype=np.int8)
+    resultat["instant"] = np.full(len(lignes), 1_760_000_000.0)
+    resultat["duree"] = np.array(colonnes[4], dtype=np.float32)
+    resultat["execution"] = np.array(colonnes[5], dtype=np.int32)
+    resultat["chemins"] = np.array(chemins, dtype=np.str_)
+    return resultat
+
+
+def table():
+    # Deux partitions aux dictionnaires différents : les codes doivent être recodés à la fusion
+    jour_1 = partition(
+        [("AAI2", "consultation", "recherche", 0, 100.0, 0), ("AAI2", "consultation", "detail", 0, 50.0, 0)],
+        ["/r/a.json"],
+    )
+    jour_2 = partition(
+        [
+            ("AAI2", "consultation", "recherche", 0, 300.0, 0),
+            ("AAI2", "consultation", "recherche", 2, 200.0, 1),
+            ("BTP", "saisie", "recherche", 0, 400.0, 2),
+        ],
+        ["/r/b.json", "/r/c.json", "/r/d.json"],
+    )
+    return TableEtapes.fusionner([jour_1, jour_2])
+
+
+def test_fusionner_recode_les_dictionnaires():
+    fusion = table()
+    assert len(fusion) == 5
+    assert fusion.dictionnaires["etape"].tolist() == ["detail", "recherche"]
+    etapes = fusion.dictionnaires["etape"][fusion.colonnes["etape"]].tolist()
+    assert etapes == ["recherche", "detail", "recherche", "recherche", "recherche"]
+
+
+def test_agreger_par_etape():
+    fusion = table()
+    agregats = {ligne["etape"]: ligne for ligne in fusion.agreger(fusion.masque(), ["etape"])}
+
+    recherche = agregats["recherche"]
+    assert recherche["nombre"] == 4
+    assert recherche["erreurs"] == 1
+    assert recherche["moyenne"] == 250.0
+    # Percentiles par rang le plus proche sur [100, 200, 300, 400]
+    assert (recherche["p50"], recherche["p95"], recherche["p99"], recherche["max"]) == (200.0, 400.0, 400.0, 400.0)
+    assert agregats["detail"]["nombre"] == 1
+    assert agregats["detail"]["p50"] == 50.0
+
+
+def test_agreger_sans_groupe_et_masque_filtre():
+    fusion = table()
+
+    (global_,) = fusion.agreger(fusion.masque(), [])
+    assert global_["nombre"] == 5
+    assert global_["max"] == 400.0
+
+    agregats = fusion.agreger(fusion.masque(application="AAI2", etape="rech*"), ["application", "status"])
+    assert [(ligne["application"], ligne["status"], ligne["nombre"]) for ligne in agregats] == [
+        ("AAI2", 0, 2),
+        ("AAI2", 2, 1),
+    ]
+
+
+def test_agreger_masque_vide():
+    fusion = table()
+    assert fusion.agreger(fusion.masque(scenario="inexistant"), ["etape"]) == []
+
+
+def test_conserver_executions_supprimees(tmp_path):
+    present = tmp_path / "present.json"
+    present.write_text("{}")
+    supprime = str(tmp_path / "supprime.json")
+
+    ancienne = partition(
+        [("AAI2", "s", "e1", 0, 10.0, 0), ("AAI2", "s", "e2", 2, 20.0, 1)],
+        [str(present), supprime],
+    )
+    nouvelle = partition([("AAI2", "s", "e3", 0, 30.0, 0)], [str(present)])
+
+    fusion = conserver_executions_supprimees(ancienne, nouvelle)
+
+    assert fusion["chemins"].tolist() == [str(present), supprime]
+    assert fusion["dict_etape"][fusion["etape"]].tolist() == ["e3", "e2"]
+    assert fusion["execution"].tolist() == [0, 1]
+    assert fusion["duree"].tolist() == [30.0, 20.0]
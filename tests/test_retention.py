@@ -0,0 +1,42 @@
+"""Tests de retention.py : politiques de conservation"""
+
+from retention import DEFAUT_POLITIQUE, PolitiquesRetention
+
+
+def test_politique_par_defaut():
+    politiques = PolitiquesRetention()
+    assert politiques.politique("AAI2") == DEFAUT_POLITIQUE
+    assert politiques.delai_minimal("AAI2") == DEFAUT_POLITIQUE["succes"]
+
+
+def test_politique_application_surcharge_le_defaut():
+    politiques = PolitiquesRetention({"succes": 5}, {"AAI2": {"erreur": 60, "archive": 0}})
+
+    assert politiques.politique("AAI2") == {**DEFAUT_POLITIQUE, "succes": 5, "erreur": 60, "archive": 0}
+    assert politiques.politique("BTP") == {**DEFAUT_POLITIQUE, "succes": 5}
+
+
+def test_delai_minimal_ignore_le_delai_d_archive():
+    politiques = PolitiquesRetention(
+        {"succes": 10, "avertissement": 12, "erreur": 30, "inconnu": 30, "archive": 1}
+    )
+    assert politiques.delai_minimal("AAI2") == 10
+
+
+def test_charger_yaml(tmp_path):
+    chemin = tmp_path / "retention.yaml"
+    chemin.write_text("defaut:\n  succes: 3\napplications:\n  AAI2:\n    erreur: 60\n", encoding="utf-8")
+
+    politiques = PolitiquesRetention.charger(chemin)
+
+    assert politiques.politique("AAI2")["succes"] == 3
+    assert politiques.politique("AAI2")["erreur"] == 60
+    assert politiques.politique("BTP")["erreur"] == DEFAUT_POLITIQUE["erreur"]
+
+
+def test_charger_fichier_absent_ou_vide(tmp_path):
+    assert PolitiquesRetention.charger(tmp_path / "absent.yaml").defaut == DEFAUT_POLITIQUE
+
+    vide = tmp_path / "vide.yaml"
+    vide.write_text("", encoding="utf-8")
+    assert PolitiquesRetention.charger(vide).defaut == DEFAUT_POLITIQUE
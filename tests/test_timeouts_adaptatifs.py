@@ -0,0 +1,30 @@
+"""Tests de timeouts_adaptatifs.py : clé d'historique et timeout appris"""
+
+from timeouts_adaptatifs import HistoriqueAttentes, PolitiqueTimeouts, cle_locator
+
+
+class AssertionsFactices:
+    """LocatorAssertions : seule la clé rattachée par l'expect du registre est lue"""
+
+
+def test_cle_du_registre():
+    assertions = AssertionsFactices()
+    assertions.cle_registre = "iframe|role=link|name=Consulter"
+
+    assert cle_locator("accueil_aai2", assertions) == "accueil_aai2|iframe|role=link|name=Consulter"
+
+
+def test_cle_de_l_etape_hors_registre():
+    assert cle_locator("accueil_aai2", AssertionsFactices()) == "accueil_aai2"
+
+
+def test_timeout_appris_borne(tmp_path):
+    historique = HistoriqueAttentes(str(tmp_path / "historique.json"))
+    for _ in range(30):
+        historique.ajouter("accueil_aai2", 400.0)
+    politique = PolitiqueTimeouts(historique, plancher_ms=2000, plafond_ms=30000)
+
+    # p99 400 ms + 50 % + 1 s de marge = 1,6 s, relevé au plancher
+    assert politique.timeout("accueil_aai2") == 2000
+    # Sans échantillons : plafond
+    assert politique.timeout("inconnue") == 30000
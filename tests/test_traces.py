@@ -0,0 +1,95 @@
+"""Tests de traces.py : spans, export Chrome trace et activation"""
+
+import json
+
+import pytest
+
+import traces
+from traces import SPAN_NUL, Span, Traceur, attribuer, demarrer_traces, span, terminer_traces, tracer
+
+
+@pytest.fixture(autouse=True)
+def traces_desactivees():
+    """Chaque test part de traces désactivées et les désactive en sortie"""
+    traces._traceur = None
+    yield
+    traces._traceur = None
+
+
+def test_chrome_trace_evenements_et_parents():
+    traceur = Traceur()
+    with Span(traceur, "Execution.finalise", {"etapes": 3}) as parent:
+        with Span(traceur, "Execution.save_to_json", {}):
+            pass
+
+    trace = traceur.chrome_trace()
+
+    assert trace["otherData"]["spans"] == 2
+    assert trace["otherData"]["abandonnes"] == 0
+    premier, second = trace["traceEvents"]
+    assert premier["name"] == "Execution.finalise"
+    assert premier["cat"] == "Execution"
+    assert premier["ph"] == "X"
+    assert premier["args"] == {"id": parent.identifiant, "parent": None, "etapes": 3}
+    assert second["args"]["parent"] == parent.identifiant
+    # L'enfant est contenu dans le parent
+    assert premier["ts"] <= second["ts"]
+    assert second["ts"] + second["dur"] <= premier["ts"] + premier["dur"] + 0.001
+    json.dumps(trace)
+
+
+def test_capacite_bornee():
+    traceur = Traceur(capacite=2)
+    for _ in range(5):
+        with Span(traceur, "s", {}):
+            pass
+
+    assert len(traceur.chrome_trace()["traceEvents"]) == 2
+    assert traceur.abandonnes == 3
+
+
+def test_exception_enregistree_et_propagee():
+    traceur = Traceur()
+    with pytest.raises(ValueError):
+        with Span(traceur, "s", {}):
+            raise ValueError("boum")
+
+    (evenement,) = traceur.chrome_trace()["traceEvents"]
+    assert evenement["args"]["erreur"] == "ValueError: boum"
+
+
+def test_traces_desactivees_sans_effet():
+    @tracer()
+    def double(valeur):
+        attribuer(ignore=True)
+        return valeur * 2
+
+    assert double(21) == 42
+    assert span("s", cle=1) is SPAN_NUL
+
+
+def test_demarrer_et_terminer(tmp_path):
+    assert demarrer_traces({}) is None
+    traceur = demarrer_traces({"traces": True, "traces_capacite": 10})
+    assert traceur is not None and traceur.capacite == 10
+
+    @tracer("Etape.calcul")
+    def calcul():
+        attribuer(resultat=1)
+
+    with span("Etape.bloc", numero=1):
+        calcul()
+
+    chemin = terminer_traces(str(tmp_path))
+
+    with open(chemin, encoding="utf-8") as fichier:
+        evenements = json.load(fichier)["traceEvents"]
+    assert [evenement["name"] for evenement in evenements] == ["Etape.bloc", "Etape.calcul"]
+    assert evenements[1]["args"]["resultat"] == 1
+    assert evenements[1]["args"]["parent"] == evenements[0]["args"]["id"]
+    assert not traces.traces_actives()
+
+
+def test_activation_par_environnement(monkeypatch):
+    monkeypatch.setenv(traces.VARIABLE_ENVIRONNEMENT, "oui")
+    assert demarrer_traces() is not None
@@ -0,0 +1,219 @@
+"""
+timeouts_adaptatifs.py
+
+Timeouts des assertions `expect(locator)` appris à partir de l'historique.
+
+Pour chaque (étape, locator du registre) d'un scénario, la durée des attentes
+réussies est historisée ; les assertions sur un locator construit hors du registre
+partagent la clé de leur étape. Lorsqu'une assertion est appelée sans timeout explicite, le timeout
+appliqué vaut p99 des attentes observées + marge, borné par un plancher et un
+plafond. Un scénario sur une application arrêtée échoue ainsi en quelques
+secondes, tandis qu'une lenteur légitime garde de la marge.
+
+Sans historique (politique désactivée ou pas d'output_path), les assertions
+sans timeout explicite reçoivent le plafond, jamais le défaut de Playwright (5 s).
+
+Les assertions sont exécutées par tranches (detection_reseau.attente_interruptible) :
+une erreur réseau bloquante les interrompt avant la fin de leur timeout.
+
+Configuration (config scénario) :
+- timeouts_adaptatifs : active la politique (défaut True)
+- timeout_plancher_ms / timeout_plafond_ms : bornes (défaut 2000 / 30000)
+"""
+
+import functools
+import json
+import logging
+import math
+import os
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from detection_reseau import attente_interruptible
+
+LOGGER = logging.getLogger(__name__)
+
+SOUS_REPERTOIRE_HISTORIQUE = "historique_timeouts"
+MAX_ECHANTILLONS = 200
+MIN_ECHANTILLONS = 20
+MARGE_RELATIVE = 0.5
+MARGE_FIXE_MS = 1000
+DEFAUT_PLANCHER_MS = 2000
+DEFAUT_PLAFOND_MS = 30000
+
+# (politique, nom de l'étape) en cours
+_contexte_courant: ContextVar[Optional[Tuple["PolitiqueTimeouts", str]]] = ContextVar(
+    "timeouts_contexte_courant", default=None
+)
+_installation_faite = False
+
+
+def percentile(echantillons: List[float], rang: float) -> float:
+    """Percentile par rang le plus proche"""
+    tries = sorted(echantillons)
+    return tries[max(0, math.ceil(rang / 100 * len(tries)) - 1)]
+
+
+class HistoriqueAttentes:
+    """Dernières durées d'attente (ms) par clé, persistées dans un fichier JSON par scénario"""
+
+    def __init__(self, chemin_fichier: str, max_echantillons: int = MAX_ECHANTILLONS):
+        self.chemin_fichier = Path(chemin_fichier)
+        self.max_echantillons = max_echantillons
+        self.echantillons: Dict[str, List[float]] = {}
+        self._modifie = False
+
+    def charger(self) -> "HistoriqueAttentes":
+        try:
+            with open(self.chemin_fichier, encoding="utf-8") as fichier:
+                self.echantillons = json.load(fichier)
+        except FileNotFoundError:
+            self.echantillons = {}
+        except (OSError, ValueError) as e:
+            LOGGER.warning("[HistoriqueAttentes] ⚠️ Historique illisible, ignoré: %s", e)
+            self.echantillons = {}
+        return self
+
+    def ajouter(self, cle: str, duree_ms: float) -> None:
+        echantillons = self.echantillons.setdefault(cle, [])
+        echantillons.append(round(duree_ms, 1))
+        if len(echantillons) > self.max_echantillons:
+            del echantillons[: len(echantillons) - self.max_echantillons]
+        self._modifie = True
+
+    def enregistrer(self) -> None:
+        """Écriture atomique (plusieurs exécutions d'un même scénario peuvent se chevaucher)"""
+        if not self._modifie:
+            return
+        self.chemin_fichier.parent.mkdir(parents=True, exist_ok=True)
+        temporaire = self.chemin_fichier.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporaire, "w", encoding="utf-8") as fichier:
+            json.dump(self.echantillons, fichier, separators=(",", ":"))
+        os.replace(temporaire, self.chemin_fichier)
+        self._modifie = False
+
+
+class PolitiqueTimeouts:
+    """Calcul du timeout d'une attente à partir de son historique"""
+
+    def __init__(
+        self,
+        historique: Optional[HistoriqueAttentes],
+        plancher_ms: float = DEFAUT_PLANCHER_MS,
+        plafond_ms: float = DEFAUT_PLAFOND_MS,
+        marge_relative: float = MARGE_RELATIVE,
+        marge_fixe_ms: float = MARGE_FIXE_MS,
+        min_echantillons: int = MIN_ECHANTILLONS,
+    ):
+        self.historique = historique
+        self.plancher_ms = plancher_ms
+        self.plafond_ms = plafond_ms
+        self.marge_relative = marge_relative
+        self.marge_fixe_ms = marge_fixe_ms
+        self.min_echantillons = min_echantillons
+
+    def timeout(self, cle: str) -> float:
+        """Timeout en ms (le plafond sans historique ou tant qu'il est insuffisant)"""
+        if self.historique is None:
+            return self.plafond_ms
+        echantillons = self.historique.echantillons.get(cle)
+        if not echantillons or len(echantillons) < self.min_echantillons:
+            return self.plafond_ms
+        p99 = percentile(echantillons, 99)
+        budget = p99 * (1 + self.marge_relative) + self.marge_fixe_ms
+        return round(min(self.plafond_ms, max(self.plancher_ms, budget)))
+
+
+def cle_locator(nom_etape: str, assertions) -> str:
+    """Clé d'historique : étape + clé du registre du locator vérifié (expect de registre_locators), sinon étape"""
+    cle_registre = getattr(assertions, "cle_registre", None)
+    return nom_etape if cle_registre is None else f"{nom_etape}|{cle_registre}"
+
+
+def _avec_timeout_adaptatif(methode):
+    """Enveloppe une assertion : timeout appris si absent, historisation des attentes réussies"""
+
+    @functools.wraps(methode)
+    def enveloppe(self, *args, **kwargs):
+        contexte = _contexte_courant.get()
+        if contexte is None:
+            return methode(self, *args, **kwargs)
+
+        timeout = kwargs.pop("timeout", None)
+
+        def attendre(tranche_ms: float):
+            return methode(self, *args, timeout=tranche_ms, **kwargs)
+
+        if timeout is not None:
+            return attente_interruptible(attendre, timeout)
+
+        politique, nom_etape = contexte
+        cle = cle_locator(nom_etape, self)
+        timeout = politique.timeout(cle)
+        if politique.historique is None:
+            return attente_interruptible(attendre, timeout)
+
+        debut = time.perf_counter()
+        resultat = attente_interruptible(attendre, timeout)
+        politique.historique.ajouter(cle, (time.perf_counter() - debut) * 1000)
+        return resultat
+
+    enveloppe.__timeout_adaptatif__ = True
+    return enveloppe
+
+
+def installer_timeouts_adaptatifs() -> None:
+    """Enveloppe les assertions LocatorAssertions.to_* / not_to_* (idempotent)"""
+    global _installation_faite
+    if _installation_faite:
+        return
+
+    from playwright.sync_api._generated import LocatorAssertions
+
+    for nom in dir(LocatorAssertions):
+        methode = getattr(LocatorAssertions, nom)
+        if nom.startswith(("to_", "not_to_")) and not getattr(methode, "__timeout_adaptatif__", False):
+            setattr(LocatorAssertions, nom, _avec_timeout_adaptatif(methode))
+
+    _installation_faite = True
+
+
+# === FIXTURES PYTEST ===
+
+
+@pytest.fixture(scope="session")
+def politique_timeouts(execution) -> PolitiqueTimeouts:
+    """Politique de timeouts du scénario, historique enregistré en fin de scénario"""
+    config = execution.config
+    installer_timeouts_adaptatifs()
+    if not config.get("timeouts_adaptatifs", True) or not config.get("output_path"):
+        # Sans historique : plafond pour toutes les assertions sans timeout explicite
+        yield PolitiqueTimeouts(None, plafond_ms=config.get("timeout_plafond_ms", DEFAUT_PLAFOND_MS))
+        return
+
+    historique = HistoriqueAttentes(
+        f"{config['output_path']}/{SOUS_REPERTOIRE_HISTORIQUE}/{config.get('nom_scenario', 'inconnu')}.json"
+    ).charger()
+
+    yield PolitiqueTimeouts(
+        historique,
+        plancher_ms=config.get("timeout_plancher_ms", DEFAUT_PLANCHER_MS),
+        plafond_ms=config.get("timeout_plafond_ms", DEFAUT_PLAFOND_MS),
+    )
+
+    try:
+        historique.enregistrer()
+    except OSError as e:
+        LOGGER.warning("[politique_timeouts] ⚠️ Enregistrement de l'historique impossible: %s", e)
+
+
+@pytest.fixture(scope="function", autouse=True)
+def timeouts_etape(politique_timeouts, etape):
+    """Rend la politique active pour les assertions de l'étape"""
+    jeton = _contexte_courant.set((politique_timeouts, etape.etape.nom))
+    yield
+    _contexte_courant.reset(jeton)
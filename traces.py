@@ -0,0 +1,238 @@
+"""
+traces.py
+
+Traces d'exécution par spans (intervalles nommés et imbriqués).
+
+Un span garde son nom, son parent, son début et sa fin (horloge monotone) et
+des attributs. Les spans terminés vont dans un tampon borné (au-delà de la
+capacité ils sont comptés, pas gardés), exporté en fin d'exécution au format
+Chrome trace : report_dir/trace.json, lisible dans Perfetto ou chrome://tracing.
+
+Traces désactivées (cas par défaut), le décorateur `tracer` appelle la
+fonction après un seul test sur une globale, `span` retourne un contexte nul
+partagé et `attribuer` ne fait rien : ni introspection de pile, ni formatage
+de log. Le nom d'un span décoré est calculé une fois, à la décoration.
+
+Configuration :
+- traces (config scénario) : active les traces une fois l'initialisation terminée
+- SIMULATEUR_TRACES=1 (environnement) : active les traces dès le démarrage,
+  initialisation comprise
+- traces_capacite (config scénario) : nombre maximal de spans gardés (défaut 20000)
+"""
+
+import functools
+import itertools
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from encodage_rapport import ecrire_json
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAUT_CAPACITE = 20000
+NOM_FICHIER = "trace.json"
+VARIABLE_ENVIRONNEMENT = "SIMULATEUR_TRACES"
+
+_traceur: Optional["Traceur"] = None
+
+_span_courant: ContextVar[Optional["Span"]] = ContextVar("span_courant", default=None)
+
+
+# === SPANS ===
+
+
+class Span:
+    """Intervalle nommé ; gestionnaire de contexte, devient le span courant pendant le bloc"""
+
+    __slots__ = ("traceur", "nom", "identifiant", "parent", "attributs", "debut", "_jeton")
+
+    def __init__(self, traceur: "Traceur", nom: str, attributs: Dict[str, Any]):
+        self.traceur = traceur
+        self.nom = nom
+        self.identifiant = next(traceur.compteur)
+        self.attributs = attributs
+        self.parent: Optional[int] = None
+        self.debut = 0
+        self._jeton = None
+
+    def attribut(self, cle: str, valeur: Any) -> None:
+        self.attributs[cle] = valeur
+
+    def __enter__(self) -> "Span":
+        parent = _span_courant.get()
+        self.parent = parent.identifiant if parent is not None else None
+        self._jeton = _span_courant.set(self)
+        self.debut = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, type_exception, exception, trace) -> bool:
+        fin = time.perf_counter_ns()
+        _span_courant.reset(self._jeton)
+        if exception is not None:
+            self.attributs["erreur"] = f"{type_exception.__name__}: {exception}"
+        self.traceur.enregistrer(self, fin)
+        return False
+
+
+class _SpanNul:
+    """Span des traces désactivées : aucun effet"""
+
+    __slots__ = ()
+
+    def attribut(self, cle: str, valeur: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_SpanNul":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+SPAN_NUL = _SpanNul()
+
+
+class Traceur:
+    """Tampon borné des spans terminés d'une exécution"""
+
+    def __init__(self, capacite: int = DEFAUT_CAPACITE):
+        self.capacite = capacite
+        self.spans: List[Tuple] = []
+        self.abandonnes = 0
+        self.compteur = itertools.count(1)
+        self.origine_ns = time.perf_counter_ns()
+        self.origine = datetime.now()
+
+    def enregistrer(self, span: Span, fin: int) -> None:
+        if len(self.spans) >= self.capacite:
+            self.abandonnes += 1
+            return
+        self.spans.append(
+            (span.nom, span.identifiant, span.parent, threading.get_ident(), span.debut, fin, span.attributs)
+        )
+
+    def chrome_trace(self) -> Dict:
+        """Spans au format Chrome trace (événements complets "X", temps en µs depuis l'origine)"""
+        pid = os.getpid()
+        evenements = [
+            {
+                "name": nom,
+                "cat": nom.split(".", 1)[0],
+                "ph": "X",
+                "ts": round((debut - self.origine_ns) / 1000, 3),
+                "dur": round((fin - debut) / 1000, 3),
+                "pid": pid,
+                "tid": tid,
+                "args": {"id": identifiant, "parent": parent, **attributs},
+            }
+            for nom, identifiant, parent, tid, debut, fin, attributs in self.spans
+        ]
+        evenements.sort(key=lambda evenement: evenement["ts"])
+        return {
+            "traceEvents": evenements,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "origine": self.origine.isoformat(),
+                "spans": len(self.spans),
+                "abandonnes": self.abandonnes,
+            },
+        }
+
+
+# === API ===
+
+
+def tracer(nom: Optional[str] = None) -> Callable:
+    """Décorateur : un span par appel de la fonction (nom par défaut : nom qualifié de la fonction)"""
+
+    def decorateur(fonction: Callable) -> Callable:
+        nom_span = nom or fonction.__qualname__
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            traceur = _traceur
+            if traceur is None:
+                return fonction(*args, **kwargs)
+            with Span(traceur, nom_span, {}):
+                return fonction(*args, **kwargs)
+
+        return enveloppe
+
+    return decorateur
+
+
+def span(nom: str, /, **attributs):
+    """Gestionnaire de contexte : span du bloc (SPAN_NUL si les traces sont désactivées)"""
+    traceur = _traceur
+    if traceur is None:
+        return SPAN_NUL
+    return Span(traceur, nom, attributs)
+
+
+def ouvrir_span(nom: str, /, **attributs):
+    """Ouvre un span à fermer par fermer_span (blocs à cheval sur un yield de fixture)"""
+    return span(nom, **attributs).__enter__()
+
+
+def fermer_span(span_ouvert, exception: Optional[BaseException] = None) -> None:
+    span_ouvert.__exit__(type(exception) if exception is not None else None, exception, None)
+
+
+def attribuer(**attributs) -> None:
+    """Ajoute des attributs au span courant"""
+    if _traceur is None:
+        return
+    courant = _span_courant.get()
+    if courant is not None:
+        courant.attributs.update(attributs)
+
+
+def traces_actives() -> bool:
+    return _traceur is not None
+
+
+def demarrer_traces(config: Optional[Dict] = None) -> Optional[Traceur]:
+    """
+    Active les traces si la config (traces) ou l'environnement (SIMULATEUR_TRACES)
+    le demande ; sans effet si elles sont déjà actives.
+
+    Returns:
+        Optional[Traceur]: le traceur actif ou None
+    """
+    global _traceur
+    if _traceur is not None:
+        return _traceur
+    config = config or {}
+    if not config.get("traces") and os.getenv(VARIABLE_ENVIRONNEMENT, "").lower() not in ("1", "true", "oui"):
+        return None
+    _traceur = Traceur(config.get("traces_capacite", DEFAUT_CAPACITE))
+    LOGGER.info("[demarrer_traces] Traces activées (capacité %d spans)", _traceur.capacite)
+    return _traceur
+
+
+def terminer_traces(repertoire: Optional[str]) -> Optional[str]:
+    """
+    Désactive les traces et écrit repertoire/trace.json (erreurs journalisées, jamais levées).
+
+    Returns:
+        Optional[str]: chemin du fichier écrit ou None
+    """
+    global _traceur
+    traceur, _traceur = _traceur, None
+    if traceur is None or not repertoire:
+        return None
+    chemin = os.path.join(repertoire, NOM_FICHIER)
+    try:
+        ecrire_json(chemin, traceur.chrome_trace())
+    except (OSError, TypeError, ValueError) as e:
+        LOGGER.warning("[terminer_traces] ⚠️ Trace non écrite: %s", e)
+        return None
+    if traceur.abandonnes:
+        LOGGER.warning("[terminer_traces] ⚠️ %d span(s) au-delà de la capacité non gardé(s)", traceur.abandonnes)
+    LOGGER.info("[terminer_traces] Trace écrite: %s (%d spans)", chemin, len(traceur.spans))
+    return chemin